@@ -1,26 +1,98 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, Query, Request, UploadFile, File
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-import sqlite3
+import asyncio
+import json
 import os
-from typing import List, Optional
+import re
+import sqlite3
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Annotated, List, Literal, Optional
 from pydantic import BaseModel
 from resume_parser import ResumeParser
-from automation.job_automation import JobAutomation
+from response_cache import ResponseCache, etag_matches
+from matching import MAX_TOP_K, JobMatcher
+import events
+from automation import runs
+from db import bulk, queries
+from db.connection import PoolTimeout, connect, get_pool
+from db.init_db import create_tables
+from db.pagination import decode_cursor, page_size, split_page
+from db.replica import READ_REPLICA_ENABLED, SnapshotReplica
+from db.retention import run_retention
+from db.search import match_expression
+from scrapers.classifier import extract_skills, normalize_skill
 
-app = FastAPI(title="Job Automation API", version="1.0.0")
+# A single NDJSON line longer than this is rejected rather than buffered
+MAX_IMPORT_LINE_BYTES = 1024 * 1024
+# Invalid lines reported back from an import; the rest are only counted
+MAX_IMPORT_ERRORS = 20
 
-# Enable CORS for frontend integration
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# How often finished jobs are moved to the archive tables; 0 turns it off
+RETENTION_INTERVAL_HOURS = float(os.getenv("RETENTION_INTERVAL_HOURS", "24"))
+
+async def retention_loop():
+    """Archive closed and stale jobs in the background, off the event loop"""
+    while True:
+        # Not at boot: a restart loop would otherwise archive on every start
+        await asyncio.sleep(RETENTION_INTERVAL_HOURS * 3600)
+        try:
+            result = await db_pool.run(run_retention)
+            print(f"Retention: archived {result['jobs']} jobs and {result['applications']} applications, "
+                  f"pruned {result['events']} events")
+        except Exception as e:
+            print(f"Retention error: {str(e)}")
+
+# Seconds between comments sent on an idle /events stream so proxies keep it open
+EVENT_KEEPALIVE_SECONDS = 15
+
+async def relay_events():
+    """Hand rows other processes append to the events table to this process's subscribers"""
+    while True:
+        # With no /events stream open there is nobody to relay to, so leave the database alone
+        await event_bus.wait_for_subscribers()
+        try:
+            batch = await db_pool.run(events.events_after, event_bus.last_id)
+            for event in batch:
+                event_bus.publish(event)
+        except Exception as e:
+            print(f"Event relay error: {str(e)}")
+            batch = []
+        if len(batch) < events.RELAY_BATCH_SIZE:
+            await asyncio.sleep(events.EVENT_POLL_SECONDS)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if replica is not None:
+        # Takes the first snapshot before serving, so reads never see an empty replica
+        await asyncio.get_running_loop().run_in_executor(None, replica.start)
+    retention = asyncio.create_task(retention_loop()) if RETENTION_INTERVAL_HOURS > 0 else None
+    relay = asyncio.create_task(relay_events())
+    yield
+    relay.cancel()
+    if retention:
+        retention.cancel()
+    if replica is not None:
+        replica.stop()
+    version_conn.close()
+
+app = FastAPI(title="Job Automation API", version="1.0.0", lifespan=lifespan)
 
 DB_PATH = os.getenv("DB_PATH", "jobs.db")
+# Bring an existing database up to the current schema before serving from it
+create_tables(DB_PATH)
+db_pool = get_pool(DB_PATH)
+# With DB_READ_REPLICA set, read endpoints are served from a periodically
+# refreshed snapshot so they never contend with scrapers writing to DB_PATH
+replica = SnapshotReplica(DB_PATH) if READ_REPLICA_ENABLED else None
+# Only used to read PRAGMA data_version, which moves on every commit made by
+# any other connection: the pool, scrapers, automation or another process
+version_conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+response_cache = ResponseCache()
+job_matcher = JobMatcher()
+event_bus = events.EventBus()
 resume_parser = ResumeParser()
-job_automation = JobAutomation(db_path=DB_PATH)
 
 # Pydantic models
 class Job(BaseModel):
@@ -33,12 +105,21 @@ class Job(BaseModel):
     date_posted: str
     last_checked: str
 
+class JobSearchResult(Job):
+    rank: float
+    title_highlight: str
+    snippet: str
+
 class JobFilter(BaseModel):
     company: Optional[str] = None
     location: Optional[str] = None
     status: Optional[str] = None
-    skills: Optional[List[str]] = None
+    # Repeated (?skills=python&skills=aws) or comma-separated
+    skills: List[str] = []
+    skills_mode: Literal["all", "any"] = "all"
     limit: Optional[int] = 50
+    cursor: Optional[str] = None
+    include_archived: bool = False
 
 class Application(BaseModel):
     id: int
@@ -47,51 +128,202 @@ class Application(BaseModel):
     status: str
     notes: Optional[str] = None
 
+class JobMatch(Job):
+    score: float
+    matched_skills: List[str]
+
+class MatchRequest(BaseModel):
+    # A resume stored by /upload-resume, or parsed skills (and optionally its text) inline
+    resume_id: Optional[int] = None
+    skills: List[str] = []
+    text: Optional[str] = None
+    limit: int = 20
+
+class JobPage(BaseModel):
+    items: List[Job]
+    next_cursor: Optional[str] = None
+
+class ApplicationPage(BaseModel):
+    items: List[Application]
+    next_cursor: Optional[str] = None
+
+def read_pool():
+    """Where read-only endpoints query: the snapshot replica once it is running"""
+    if replica is not None and replica.pool is not None:
+        return replica
+    return db_pool
+
+def cursor_key(cursor: Optional[str]) -> Optional[list]:
+    """Decode a (date, id) page cursor from a request, rejecting tampered ones"""
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor, 2)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+# Read endpoints whose responses depend only on the request and the database
+CACHED_PATHS = {"/jobs", "/jobs/search", "/companies", "/applications", "/automation/status"}
+CACHED_PATH_PATTERN = re.compile(r"/jobs/\d+")
+
+def data_version():
+    """Changes whenever the data behind the read endpoints may have changed"""
+    if replica is not None and replica.pool is not None:
+        # Reads only see new data when the snapshot is refreshed
+        return ("replica", replica.refreshes)
+    return ("primary", version_conn.execute("PRAGMA data_version").fetchone()[0])
+
+@app.exception_handler(PoolTimeout)
+async def database_busy(request: Request, exc: PoolTimeout):
+    """Every pooled connection stayed busy; ask the client to retry instead of queueing forever"""
+    return JSONResponse(status_code=503, content={"detail": "Database busy, try again shortly"},
+                        headers={"Retry-After": "1"})
+
+@app.middleware("http")
+async def cache_responses(request: Request, call_next):
+    """Serve repeated reads from memory until the database changes, with ETag revalidation"""
+    path = request.url.path
+    if request.method != "GET" or not (path in CACHED_PATHS or CACHED_PATH_PATTERN.fullmatch(path)):
+        return await call_next(request)
+
+    key = (path, tuple(sorted(request.query_params.multi_items())))
+    # Taken before the handler runs, so a commit made meanwhile invalidates what it stores
+    version = data_version()
+    entry = response_cache.get(key, version)
+    cache_status = "hit"
+    if entry is None:
+        response = await call_next(request)
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        if response.status_code != 200:
+            return Response(body, status_code=response.status_code, headers=dict(response.headers))
+        # Everything but the body framing, which Response sets again
+        handler_headers = [(name, value) for name, value in response.raw_headers
+                           if name not in (b"content-length", b"content-type")]
+        entry = response_cache.put(key, version, body, response.media_type or response.headers.get("content-type"),
+                                   handler_headers)
+        cache_status = "miss"
+
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache", "X-Cache": cache_status}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        cached = Response(status_code=304, headers=headers)
+    else:
+        cached = Response(entry.body, media_type=entry.media_type, headers=headers)
+    cached.raw_headers.extend(entry.headers)
+    return cached
+
+# Enable CORS for frontend integration. Added after cache_responses so it wraps it:
+# CORS headers depend on the request's Origin and must not come from the cache.
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
 @app.get("/")
 async def root():
     return {"message": "Job Automation API", "version": "1.0.0"}
 
-@app.get("/jobs", response_model=List[Job])
-async def get_jobs(filter: JobFilter = JobFilter()):
-    """Get jobs with optional filtering"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    
-    query = "SELECT * FROM jobs WHERE 1=1"
-    params = []
-    
-    if filter.company:
-        query += " AND company = ?"
-        params.append(filter.company)
-    
-    if filter.location:
-        query += " AND location LIKE ?"
-        params.append(f"%{filter.location}%")
+@app.get("/jobs", response_model=JobPage)
+async def get_jobs(filter: Annotated[JobFilter, Query()]):
+    """Get jobs with optional filtering, newest first, one page per call"""
+    after = cursor_key(filter.cursor)
+    limit = page_size(filter.limit)
+    location_match = match_expression(filter.location, column="location") if filter.location else None
+    skills = list(dict.fromkeys(normalize_skill(name) for value in filter.skills
+                                for name in value.split(",") if name.strip()))
     
-    if filter.status:
-        query += " AND status = ?"
-        params.append(filter.status)
+    rows = await read_pool().run(queries.list_jobs, filter.company, location_match, filter.status,
+                             after, limit + 1, filter.include_archived, skills,
+                             filter.skills_mode == "all")
     
-    query += " ORDER BY date_posted DESC LIMIT ?"
-    params.append(filter.limit)
-    
-    c.execute(query, params)
-    rows = c.fetchall()
-    conn.close()
-    
-    return [Job(**dict(row)) for row in rows]
+    rows, next_cursor = split_page(rows, limit, lambda row: (row["posted_at"], row["id"]))
+    return JobPage(items=[Job(**dict(row)) for row in rows], next_cursor=next_cursor)
+
+@app.get("/jobs/search", response_model=List[JobSearchResult])
+async def search_jobs(q: str, company: Optional[str] = None, status: Optional[str] = None, limit: int = 20):
+    """Full-text search over job titles, companies and locations, best matches first"""
+    expression = match_expression(q)
+    if not expression:
+        raise HTTPException(status_code=400, detail="Search query must contain at least one word")
+
+    rows = await read_pool().run(queries.search_jobs, expression, company, status, max(1, min(limit, 100)))
+
+    return [JobSearchResult(**dict(row)) for row in rows]
+
+def export_stream(fmt: str, company: Optional[str], status: Optional[str], include_archived: bool):
+    """Read the export on its own connection to the primary, closed when the stream ends
+
+    A download lasts as long as the client takes to read it, so it must not
+    hold one of the pool's connections. In WAL mode the long read transaction
+    does not block writers. Starlette pulls chunks on a worker thread.
+    """
+    conn = connect(DB_PATH)
+    try:
+        yield from bulk.export_jobs(conn, fmt, company, status, include_archived)
+    finally:
+        conn.close()
+
+@app.get("/jobs/export")
+async def export_jobs(format: str = "ndjson", company: Optional[str] = None, status: Optional[str] = None,
+                      include_archived: bool = False):
+    """Stream every matching job as NDJSON or CSV, without loading them into memory"""
+    if format not in bulk.EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(bulk.EXPORT_FORMATS)}")
+
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/csv"
+    return StreamingResponse(
+        export_stream(format, company, status, include_archived),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="jobs.{format}"'},
+    )
+
+async def body_lines(request: Request):
+    """Lines of a streamed request body, without reading it all first"""
+    pending = b""
+    async for chunk in request.stream():
+        *lines, pending = (pending + chunk).split(b"\n")
+        for line in lines:
+            yield line
+        if len(pending) > MAX_IMPORT_LINE_BYTES:
+            raise HTTPException(status_code=413, detail="Import line too long")
+    if pending:
+        yield pending
+
+@app.post("/jobs/import")
+async def import_jobs(request: Request):
+    """Upsert jobs by URL from an NDJSON body, in batched transactions as it arrives
+
+    Takes the same fields /jobs/export writes; ids are not imported. Invalid
+    lines are skipped and reported, so a batch written before one is kept.
+    """
+    batch = []
+    imported = skipped = 0
+    errors = []
+    line_number = 0
+    async for line in body_lines(request):
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            batch.append(bulk.parse_job(json.loads(line)))
+        except ValueError as e:
+            skipped += 1
+            if len(errors) < MAX_IMPORT_ERRORS:
+                errors.append({"line": line_number, "error": str(e)})
+            continue
+        if len(batch) >= bulk.IMPORT_BATCH_SIZE:
+            imported += await db_pool.run(bulk.import_jobs, batch)
+            batch = []
+    imported += await db_pool.run(bulk.import_jobs, batch)
+
+    return {"imported": imported, "skipped": skipped, "errors": errors}
 
 @app.get("/jobs/{job_id}", response_model=Job)
-async def get_job(job_id: int):
+async def get_job(job_id: int, include_archived: bool = False):
     """Get a specific job by ID"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    
-    c.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
-    row = c.fetchone()
-    conn.close()
+    row = await read_pool().run(queries.get_job, job_id, include_archived)
     
     if not row:
         raise HTTPException(status_code=404, detail="Job not found")
@@ -101,12 +333,7 @@ async def get_job(job_id: int):
 @app.get("/companies")
 async def get_companies():
     """Get list of companies with job counts"""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    
-    c.execute("SELECT company, COUNT(*) as count FROM jobs GROUP BY company ORDER BY count DESC")
-    rows = c.fetchall()
-    conn.close()
+    rows = await read_pool().run(queries.company_counts)
     
     return [{"company": row[0], "count": row[1]} for row in rows]
 
@@ -130,92 +357,158 @@ async def upload_resume(file: UploadFile = File(...)):
     if result['status'] == 'error':
         raise HTTPException(status_code=400, detail=result['error'])
     
+    # Keep it for /match; the full text is stored but not echoed back
+    text = result.pop('text')
+    resume_id = await db_pool.run(queries.save_resume, filename, result['skills'],
+                                  result['experience_years'], text)
+    
     return {
         "message": "Resume parsed successfully",
         "filename": file.filename,
         "size": len(file_content),
+        "resume_id": resume_id,
         "parsed_data": result
     }
 
+@app.post("/match", response_model=List[JobMatch])
+async def match_jobs(request: MatchRequest):
+    """Rank active jobs by similarity to a resume's skills and text, best match first"""
+    skills, text = request.skills, request.text
+    if request.resume_id is not None:
+        resume = await db_pool.run(queries.get_resume, request.resume_id)
+        if resume is None:
+            raise HTTPException(status_code=404, detail="Resume not found")
+        skills = skills or resume["skills"]
+        text = text or resume["text"]
+    if not skills and not text:
+        raise HTTPException(status_code=400, detail="Provide a resume_id, skills or text to match")
+
+    # Only re-vectorizes jobs that changed since the last match
+    pool = read_pool()
+    await pool.run(job_matcher.refresh)
+    ranked = await asyncio.get_running_loop().run_in_executor(
+        None, job_matcher.top_k, skills, text, max(1, min(request.limit, MAX_TOP_K)))
+
+    rows = {row["id"]: row for row in await pool.run(queries.jobs_by_id, [job_id for job_id, _ in ranked])}
+    wanted = {normalize_skill(skill) for skill in skills}
+    return [
+        JobMatch(**dict(rows[job_id]), score=round(score, 4),
+                 matched_skills=[skill for skill in extract_skills(rows[job_id]["title"]) if skill in wanted])
+        for job_id, score in ranked if job_id in rows
+    ]
+
 @app.post("/jobs/{job_id}/apply")
 async def apply_to_job(job_id: int, notes: Optional[str] = None):
     """Mark a job as applied to"""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    
-    # Check if job exists
-    c.execute("SELECT id FROM jobs WHERE id = ?", (job_id,))
-    if not c.fetchone():
-        conn.close()
+    applied_date = datetime.now().strftime("%Y-%m-%d")
+
+    try:
+        await db_pool.run(queries.apply_to_job, job_id, applied_date, notes)
+    except queries.JobNotFound:
         raise HTTPException(status_code=404, detail="Job not found")
-    
-    # Check if already applied
-    c.execute("SELECT id FROM applications WHERE job_id = ?", (job_id,))
-    if c.fetchone():
-        conn.close()
+    except queries.AlreadyApplied:
         raise HTTPException(status_code=400, detail="Already applied to this job")
     
-    # Create application record
-    from datetime import datetime
-    applied_date = datetime.now().strftime("%Y-%m-%d")
-    c.execute("""
-        INSERT INTO applications (job_id, applied_date, status, notes)
-        VALUES (?, ?, 'applied', ?)
-    """, (job_id, applied_date, notes))
-    
-    # Update job status
-    c.execute("UPDATE jobs SET status = 'applied' WHERE id = ?", (job_id,))
-    conn.commit()
-    conn.close()
-    
     return {"message": f"Job {job_id} marked as applied"}
 
-@app.get("/applications", response_model=List[Application])
-async def get_applications():
-    """Get all applications"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    
-    c.execute("""
-        SELECT a.*, j.title, j.company 
-        FROM applications a
-        JOIN jobs j ON a.job_id = j.id
-        ORDER BY a.applied_date DESC
-    """)
-    rows = c.fetchall()
-    conn.close()
+@app.get("/applications", response_model=ApplicationPage)
+async def get_applications(limit: int = 50, cursor: Optional[str] = None, include_archived: bool = False):
+    """Get applications, most recent first, one page per call"""
+    after = cursor_key(cursor)
+    limit = page_size(limit)
+    rows = await read_pool().run(queries.list_applications, after, limit + 1, include_archived)
     
-    return [Application(**dict(row)) for row in rows]
+    rows, next_cursor = split_page(rows, limit, lambda row: (row["applied_date"], row["id"]))
+    return ApplicationPage(items=[Application(**dict(row)) for row in rows], next_cursor=next_cursor)
 
-@app.post("/automation/run")
+@app.post("/automation/run", status_code=202)
 async def run_automation(max_applications: int = 3):
-    """Run job application automation"""
+    """Queue a job application automation run for automation.worker"""
     try:
         # Get pending applications
-        pending_jobs = job_automation.get_pending_applications()
+        pending_count = await db_pool.run(queries.pending_count)
         
-        if not pending_jobs:
+        if not pending_count:
             return {"message": "No pending applications found", "count": 0}
         
-        # Run automation
-        await job_automation.run_automation(max_applications)
+        # Returns at once; poll /automation/runs/{run_id} for progress
+        run_id = await db_pool.run(runs.enqueue_run, max_applications)
         
         return {
-            "message": f"Automation completed for up to {max_applications} applications",
-            "pending_jobs": len(pending_jobs)
+            "message": f"Automation queued for up to {max_applications} applications",
+            "run_id": run_id,
+            "pending_jobs": pending_count
         }
+    except PoolTimeout:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Automation error: {str(e)}")
 
+@app.get("/automation/runs/{run_id}")
+async def get_automation_run(run_id: int):
+    """Progress of a queued automation run, with each job's outcome and timing"""
+    # From the primary, not the replica, so progress is never behind
+    run = await db_pool.run(runs.get_run, run_id)
+    
+    if not run:
+        raise HTTPException(status_code=404, detail="Run not found")
+    
+    return run
+
+@app.get("/events")
+async def stream_events(request: Request, types: Optional[str] = None):
+    """Server-sent events for scrape and automation progress
+
+    types keeps only events whose type starts with one of the given
+    comma-separated prefixes, e.g. ?types=automation,job.inserted. A client
+    reconnecting with Last-Event-ID first gets the events it missed.
+    """
+    prefixes = tuple(t.strip() for t in types.split(",") if t.strip()) if types else ()
+    last_event_id = request.headers.get("last-event-id", "")
+    replay = last_event_id.isdigit()
+    # Only new events are streamed live; reconnecting clients replay history with Last-Event-ID
+    after = int(last_event_id) if replay else await db_pool.run(events.latest_event_id)
+    # Subscribe before replaying so nothing published in between is lost
+    queue = event_bus.subscribe(after)
+
+    async def stream():
+        try:
+            sent = after
+            if replay:
+                while True:
+                    missed = await db_pool.run(events.events_after, sent)
+                    for event in missed:
+                        if not prefixes or event.type.startswith(prefixes):
+                            yield event.to_sse()
+                        sent = event.id
+                    if len(missed) < events.RELAY_BATCH_SIZE:
+                        break
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), EVENT_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if event.id <= sent or (prefixes and not event.type.startswith(prefixes)):
+                    continue
+                sent = event.id
+                yield event.to_sse()
+        finally:
+            event_bus.unsubscribe(queue)
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @app.get("/automation/status")
-async def get_automation_status():
-    """Get automation status and pending applications"""
+async def get_automation_status(limit: int = 20):
+    """Get automation status and the newest pending applications"""
     try:
-        pending_jobs = job_automation.get_pending_applications()
+        # The count comes from a trigger-maintained counter; only `limit` jobs are listed
+        pending_count = await read_pool().run(queries.pending_count)
+        pending_jobs = await read_pool().run(queries.pending_applications, page_size(limit))
         
         return {
-            "pending_applications": len(pending_jobs),
+            "pending_applications": pending_count,
             "jobs": [
                 {
                     "id": job[0],
@@ -226,6 +519,8 @@ async def get_automation_status():
                 for job in pending_jobs
             ]
         }
+    except PoolTimeout:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting status: {str(e)}")
 
@@ -2,9 +2,12 @@ import os
 import json
 from playwright.async_api import async_playwright
 from datetime import datetime
-import sqlite3
 import asyncio
 import sys
+import time
+import events
+from db import queries
+from db.connection import get_pool
 
 if sys.platform == "win32":
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
@@ -14,21 +17,18 @@ class JobAutomation:
         self.resume_data = resume_data or {}
         default_db_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "jobs.db")
         self.db_path = db_path or os.getenv("DB_PATH", default_db_path)
+        self.pool = get_pool(self.db_path)
+        # Last (status, notes) saved for each job, reported to progress callbacks
+        self.results = {}
         
-    def save_application_result(self, job_id, status, notes=""):
+    async def save_application_result(self, job_id, status, notes=""):
         """Save application result to database"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        
-        # Update application status
-        c.execute("""
-            UPDATE applications 
-            SET status = ?, notes = ?
-            WHERE job_id = ?
-        """, (status, notes, job_id))
-        
-        conn.commit()
-        conn.close()
+        self.results[job_id] = (status, notes)
+        await self.pool.run(queries.update_application_status, job_id, status, notes)
+    
+    async def publish(self, type, **payload):
+        """Send a progress event to /events subscribers"""
+        await self.pool.run(events.publish, type, payload)
     
     async def apply_to_uber_job(self, job_url, job_id):
         """Automate application to Uber job"""
@@ -43,6 +43,7 @@ class JobAutomation:
                     # Navigate to job page
                     await page.goto(job_url)
                     await page.wait_for_timeout(3000)
+                    await self.publish("automation.step", job_id=job_id, step="opened")
                     
                     # Look for apply button
                     apply_button = await page.query_selector("button:has-text('Apply')")
@@ -55,36 +56,38 @@ class JobAutomation:
                         
                         # Fill out application form
                         await self._fill_uber_form(page)
+                        await self.publish("automation.step", job_id=job_id, step="form_filled")
                         
                         # Submit application
                         submit_button = await page.query_selector("button:has-text('Submit')")
                         if submit_button:
                             await submit_button.click()
                             await page.wait_for_timeout(3000)
+                            await self.publish("automation.step", job_id=job_id, step="submitted")
                             
                             # Check for success
                             content = await page.content()
                             if "thank you" in content.lower() or "submitted" in content.lower():
-                                self.save_application_result(job_id, "applied", "Successfully applied via automation")
+                                await self.save_application_result(job_id, "applied", "Successfully applied via automation")
                                 return True
                             else:
-                                self.save_application_result(job_id, "failed", "Application submitted but confirmation unclear")
+                                await self.save_application_result(job_id, "failed", "Application submitted but confirmation unclear")
                                 return False
                         else:
-                            self.save_application_result(job_id, "failed", "Submit button not found")
+                            await self.save_application_result(job_id, "failed", "Submit button not found")
                             return False
                     else:
-                        self.save_application_result(job_id, "failed", "Apply button not found")
+                        await self.save_application_result(job_id, "failed", "Apply button not found")
                         return False
                         
                 except Exception as e:
-                    self.save_application_result(job_id, "failed", f"Error: {str(e)}")
+                    await self.save_application_result(job_id, "failed", f"Error: {str(e)}")
                     return False
                 finally:
                     await browser.close()
         except Exception as e:
             print(f"Playwright error: {str(e)}")
-            self.save_application_result(job_id, "failed", f"Playwright error: {str(e)}")
+            await self.save_application_result(job_id, "failed", f"Playwright error: {str(e)}")
             return False
     
     async def _fill_uber_form(self, page):
@@ -140,44 +143,53 @@ class JobAutomation:
             return await self.apply_to_uber_job(job_url, job_id)
         else:
             # For other companies, we'll implement later
-            self.save_application_result(job_id, "pending", f"Automation not yet implemented for {company}")
+            await self.save_application_result(job_id, "pending", f"Automation not yet implemented for {company}")
             return False
     
-    def get_pending_applications(self):
+    async def get_pending_applications(self, limit=None):
         """Get jobs that need to be applied to"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        
-        c.execute("""
-            SELECT j.id, j.title, j.url, j.company
-            FROM jobs j
-            LEFT JOIN applications a ON j.id = a.job_id
-            WHERE j.status = 'active' AND a.id IS NULL
-            ORDER BY j.date_posted DESC
-        """)
-        
-        jobs = c.fetchall()
-        conn.close()
-        
-        return jobs
+        return await self.pool.run(queries.pending_applications, limit)
     
-    async def run_automation(self, max_applications=5):
-        """Run automation for pending applications"""
+    async def run_automation(self, max_applications=5, progress=None):
+        """Run automation for pending applications
+
+        progress, if given, is awaited as progress(event, **fields) with
+        "planned" (jobs), "started" (job_id) and "finished" (job_id, success,
+        status, notes, seconds) events. Returns the number of successful
+        applications.
+        """
         try:
-            pending_jobs = self.get_pending_applications()
+            pending_count = await self.pool.run(queries.pending_count)
             
-            if not pending_jobs:
+            if not pending_count:
                 print("No pending applications found.")
-                return
+                if progress:
+                    await progress("planned", jobs=[])
+                return 0
+            
+            print(f"Found {pending_count} pending applications. Processing up to {max_applications}...")
             
-            print(f"Found {len(pending_jobs)} pending applications. Processing up to {max_applications}...")
+            jobs = await self.get_pending_applications(max_applications)
+            if progress:
+                await progress("planned", jobs=jobs)
             
             successful_applications = 0
-            for job_id, title, url, company in pending_jobs[:max_applications]:
+            for job_id, title, url, company in jobs:
                 print(f"\nApplying to: {title} at {company}")
                 print(f"URL: {url}")
                 
+                if progress:
+                    await progress("started", job_id=job_id)
+                await self.publish("automation.job_started", job_id=job_id, title=title, company=company, url=url)
+                started = time.monotonic()
                 success = await self.apply_to_job(url, job_id, company)
+                seconds = time.monotonic() - started
+                status, notes = self.results.get(job_id, ("applied" if success else "failed", ""))
+                if progress:
+                    await progress("finished", job_id=job_id, success=success, status=status, notes=notes,
+                                   seconds=seconds)
+                await self.publish("automation.job_finished", job_id=job_id, success=success, status=status,
+                                   notes=notes, seconds=round(seconds, 3))
                 if success:
                     successful_applications += 1
                     print("✅ Application successful!")
@@ -188,6 +200,7 @@ class JobAutomation:
                 await asyncio.sleep(5)
             
             print(f"\nAutomation complete! {successful_applications}/{max_applications} applications successful.")
+            return successful_applications
         except Exception as e:
             print(f"Automation error: {str(e)}")
             raise Exception(f"Automation error: {str(e)}")
@@ -0,0 +1,137 @@
+"""Persistent queue of automation runs and their per-job outcomes
+
+The API enqueues a run and returns straight away; automation.worker claims
+queued runs one at a time and records progress here as it goes, so
+/automation/runs/{id} can report on a run from any process.
+"""
+import os
+import sqlite3
+import time
+from typing import List, Optional, Sequence
+
+RUN_QUEUED, RUN_RUNNING, RUN_FINISHED, RUN_FAILED = "queued", "running", "finished", "failed"
+ITEM_QUEUED, ITEM_RUNNING = "queued", "running"
+
+# A running run whose worker has not reported for this long is handed to another worker
+STALE_RUN_SECONDS = 15 * 60
+
+INSERT_RUN = f"""
+    INSERT INTO automation_runs (status, max_applications, created_at) VALUES ('{RUN_QUEUED}', ?, ?)
+    RETURNING id
+"""
+# Atomic claim: concurrent workers can never take the same run
+CLAIM_RUN = f"""
+    UPDATE automation_runs
+    SET status = '{RUN_RUNNING}', worker = ?, started_at = ?, heartbeat_at = ?
+    WHERE id = (SELECT id FROM automation_runs WHERE status = '{RUN_QUEUED}' ORDER BY id LIMIT 1)
+    RETURNING id, max_applications
+"""
+REQUEUE_STALE_RUNS = f"""
+    UPDATE automation_runs SET status = '{RUN_QUEUED}', worker = NULL
+    WHERE status = '{RUN_RUNNING}' AND heartbeat_at < ?
+"""
+SELECT_RUNNING_WORKERS = f"SELECT DISTINCT worker FROM automation_runs WHERE status = '{RUN_RUNNING}'"
+REQUEUE_WORKER_RUNS = f"""
+    UPDATE automation_runs SET status = '{RUN_QUEUED}', worker = NULL
+    WHERE status = '{RUN_RUNNING}' AND worker = ?
+"""
+SELECT_RUN = "SELECT * FROM automation_runs WHERE id = ?"
+SELECT_RUN_ITEMS = "SELECT * FROM automation_run_items WHERE run_id = ? ORDER BY id"
+
+
+def enqueue_run(conn: sqlite3.Connection, max_applications: int) -> int:
+    with conn:
+        return conn.execute(INSERT_RUN, (max_applications, int(time.time()))).fetchone()[0]
+
+
+def claim_run(conn: sqlite3.Connection, worker: str) -> Optional[sqlite3.Row]:
+    """Take the oldest queued run, or None if the queue is empty"""
+    now = int(time.time())
+    with conn:
+        # Runs left behind by a crashed worker go back to the front of the queue
+        conn.execute(REQUEUE_STALE_RUNS, (now - STALE_RUN_SECONDS,))
+        return conn.execute(CLAIM_RUN, (worker, now, now)).fetchone()
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Alive, but owned by another user
+        pass
+    return True
+
+
+def requeue_orphaned_runs(conn: sqlite3.Connection, worker: str) -> int:
+    """Put runs left running by dead workers on this worker's host back on the queue
+
+    Workers are named "host:pid". On startup nothing can still be running
+    under this worker's own name (a restarted container reuses pids), nor
+    under a pid on this host that no longer exists, so those runs need not
+    wait STALE_RUN_SECONDS to be picked up again.
+    """
+    host, _, pid = worker.rpartition(":")
+    with conn:
+        orphaned = []
+        for name, in conn.execute(SELECT_RUNNING_WORKERS).fetchall():
+            other_host, _, other_pid = (name or "").rpartition(":")
+            if other_host == host and other_pid.isdigit() and (
+                    other_pid == pid or not _process_alive(int(other_pid))):
+                orphaned.append((name,))
+        conn.executemany(REQUEUE_WORKER_RUNS, orphaned)
+    return len(orphaned)
+
+
+def plan_run(conn: sqlite3.Connection, run_id: int, jobs: Sequence[Sequence]):
+    """Record the (id, title, url, company) jobs a run is going to work through"""
+    with conn:
+        # A requeued run starts its plan over
+        conn.execute("DELETE FROM automation_run_items WHERE run_id = ?", (run_id,))
+        conn.executemany(f"""
+            INSERT INTO automation_run_items (run_id, job_id, title, url, company, status)
+            VALUES (?, ?, ?, ?, ?, '{ITEM_QUEUED}')
+        """, [(run_id, job_id, title, url, company) for job_id, title, url, company in jobs])
+        conn.execute("UPDATE automation_runs SET total = ?, completed = 0, succeeded = 0 WHERE id = ?",
+                     (len(jobs), run_id))
+
+
+def start_item(conn: sqlite3.Connection, run_id: int, job_id: int):
+    now = int(time.time())
+    with conn:
+        conn.execute(f"""
+            UPDATE automation_run_items SET status = '{ITEM_RUNNING}', started_at = ?
+            WHERE run_id = ? AND job_id = ?
+        """, (now, run_id, job_id))
+        conn.execute("UPDATE automation_runs SET heartbeat_at = ? WHERE id = ?", (now, run_id))
+
+
+def finish_item(conn: sqlite3.Connection, run_id: int, job_id: int, status: str, notes: str,
+                success: bool, seconds: float):
+    now = int(time.time())
+    with conn:
+        conn.execute("""
+            UPDATE automation_run_items SET status = ?, notes = ?, finished_at = ?, duration_seconds = ?
+            WHERE run_id = ? AND job_id = ?
+        """, (status, notes, now, round(seconds, 3), run_id, job_id))
+        conn.execute("""
+            UPDATE automation_runs
+            SET completed = completed + 1, succeeded = succeeded + ?, heartbeat_at = ?
+            WHERE id = ?
+        """, (int(success), now, run_id))
+
+
+def finish_run(conn: sqlite3.Connection, run_id: int, error: Optional[str] = None):
+    with conn:
+        conn.execute("UPDATE automation_runs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                     (RUN_FAILED if error else RUN_FINISHED, error, int(time.time()), run_id))
+
+
+def get_run(conn: sqlite3.Connection, run_id: int) -> Optional[dict]:
+    """A run with its items, or None"""
+    run = conn.execute(SELECT_RUN, (run_id,)).fetchone()
+    if run is None:
+        return None
+    items: List[dict] = [dict(item) for item in conn.execute(SELECT_RUN_ITEMS, (run_id,))]
+    return {**dict(run), "items": items}
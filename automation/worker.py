@@ -0,0 +1,84 @@
+"""Execute automation runs queued by the API
+
+Usage:
+    python -m automation.worker [--poll 2] [--once]
+
+Claims the oldest queued run, works through its jobs with JobAutomation and
+records each job's outcome and timing as it finishes. Several workers can
+share one database; each run is claimed by exactly one of them.
+"""
+import argparse
+import asyncio
+import os
+import socket
+
+from automation import runs
+from automation.job_automation import JobAutomation
+from db.init_db import create_tables
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "jobs.db")
+POLL_SECONDS = float(os.getenv("AUTOMATION_WORKER_POLL", "2"))
+
+
+async def execute_run(automation: JobAutomation, run_id: int, max_applications: int):
+    """Run one claimed run to completion, recording progress as it goes"""
+    pool = automation.pool
+
+    async def progress(event, **fields):
+        if event == "planned":
+            await pool.run(runs.plan_run, run_id, fields["jobs"])
+        elif event == "started":
+            await pool.run(runs.start_item, run_id, fields["job_id"])
+        elif event == "finished":
+            await pool.run(runs.finish_item, run_id, fields["job_id"], fields["status"], fields["notes"],
+                           fields["success"], fields["seconds"])
+
+    await automation.publish("automation.run_started", run_id=run_id, max_applications=max_applications)
+    error = None
+    try:
+        await automation.run_automation(max_applications, progress=progress)
+    except Exception as e:
+        error = str(e)
+    await pool.run(runs.finish_run, run_id, error)
+
+    run = await pool.run(runs.get_run, run_id)
+    if run is None:
+        # Deleted while it was running; there is nothing left to report
+        return
+    await automation.publish("automation.run_finished", run_id=run_id, status=run["status"], total=run["total"],
+                             completed=run["completed"], succeeded=run["succeeded"], error=error)
+
+
+async def work(db_path: str, poll: float = POLL_SECONDS, once: bool = False):
+    create_tables(db_path)
+    automation = JobAutomation(db_path=db_path)
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    # A run this host's previous worker died in the middle of is picked up straight away
+    requeued = await automation.pool.run(runs.requeue_orphaned_runs, worker)
+    if requeued:
+        print(f"Requeued {requeued} runs left running by a stopped worker")
+    while True:
+        claimed = await automation.pool.run(runs.claim_run, worker)
+        if claimed is None:
+            if once:
+                return
+            await asyncio.sleep(poll)
+            continue
+        run_id, max_applications = claimed
+        print(f"Run {run_id}: applying to up to {max_applications} jobs")
+        await execute_run(automation, run_id, max_applications)
+        print(f"Run {run_id}: done")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Execute queued automation runs")
+    parser.add_argument("db_path", nargs="?", default=os.getenv("DB_PATH", DEFAULT_DB_PATH))
+    parser.add_argument("--poll", type=float, default=POLL_SECONDS, help="Seconds between checks of an empty queue")
+    parser.add_argument("--once", action="store_true", help="Exit once the queue is empty")
+    args = parser.parse_args(argv)
+
+    asyncio.run(work(args.db_path, args.poll, args.once))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Bulk export and import of jobs in the job_listing column shape
+
+Exports walk a single query with fetchmany, so memory stays at one chunk of
+rows however large the table is. Imports upsert by URL in one transaction per
+batch, resolving names through the lookup tables the same way the scrapers do.
+"""
+import csv
+import io
+import json
+import sqlite3
+import time
+from datetime import date, datetime, timezone
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from db.migrations import JOB_STATUSES, STATUS_ACTIVE
+from db.queries import COMPANY_ID, STATUS_CODE
+from db.skills import index_skills, job_ids, lookup_ids
+from scrapers.classifier import extract_skills
+from scrapers.job_sink import content_hash
+
+EXPORT_FORMATS = ("ndjson", "csv")
+EXPORT_COLUMNS = ("id", "title", "location", "company", "url", "status", "date_posted", "last_checked")
+EXPORT_CHUNK_ROWS = 1000
+IMPORT_BATCH_SIZE = 500
+
+UPSERT_IMPORTED_JOB = """
+    INSERT INTO jobs (title, location_id, company_id, url, status, posted_at, checked_at, content_hash)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(url) DO UPDATE SET
+        title=excluded.title,
+        location_id=excluded.location_id,
+        company_id=excluded.company_id,
+        status=excluded.status,
+        posted_at=excluded.posted_at,
+        checked_at=excluded.checked_at,
+        content_hash=excluded.content_hash
+"""
+
+
+def export_query(company: Optional[str] = None, status: Optional[str] = None,
+                 include_archived: bool = False) -> Tuple[str, list]:
+    """SQL and parameters for an export, in id order so no sort is needed"""
+    query = (f"SELECT {', '.join(EXPORT_COLUMNS)} "
+             f"FROM {'all_job_listing' if include_archived else 'job_listing'} WHERE 1=1")
+    params: list = []
+    if company:
+        query += f" AND company_id = {COMPANY_ID}"
+        params.append(company)
+    if status:
+        query += f" AND status_code = {STATUS_CODE}"
+        params.append(status)
+    return query + " ORDER BY id", params
+
+
+def _ndjson_chunk(rows: List[sqlite3.Row]) -> bytes:
+    return "".join(json.dumps(dict(zip(EXPORT_COLUMNS, row))) + "\n" for row in rows).encode("utf-8")
+
+
+def _csv_chunk(rows: Iterable) -> bytes:
+    out = io.StringIO()
+    csv.writer(out).writerows(rows)
+    return out.getvalue().encode("utf-8")
+
+
+def export_jobs(conn: sqlite3.Connection, fmt: str = "ndjson", company: Optional[str] = None,
+                status: Optional[str] = None, include_archived: bool = False,
+                chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """Yield the matching jobs as NDJSON or CSV, one encoded chunk of rows at a time
+
+    The whole export reads from one statement, so it is a consistent snapshot
+    even while scrapers keep writing.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    encode = _ndjson_chunk if fmt == "ndjson" else _csv_chunk
+    if fmt == "csv":
+        yield _csv_chunk([EXPORT_COLUMNS])
+
+    query, params = export_query(company, status, include_archived)
+    cursor = conn.execute(query, params)
+    try:
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows:
+                break
+            yield encode(rows)
+    finally:
+        cursor.close()
+
+
+def _epoch(value: Optional[str], default: int) -> int:
+    """Unix time of a YYYY-MM-DD (UTC) date or ISO timestamp"""
+    if not value:
+        return default
+    if len(value) == 10:
+        day = date.fromisoformat(value)
+        return int(datetime(day.year, day.month, day.day, tzinfo=timezone.utc).timestamp())
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp())
+
+
+def parse_job(record) -> tuple:
+    """Validate one imported record; ValueError describes what is wrong with it"""
+    if not isinstance(record, dict):
+        raise ValueError("Expected a JSON object")
+    for field in ("title", "company", "url"):
+        if not isinstance(record.get(field), str) or not record[field].strip():
+            raise ValueError(f"Missing {field}")
+    # Same placeholder the scrapers store for listings without a location
+    location = record.get("location") or "N/A"
+    if not isinstance(location, str):
+        raise ValueError("location must be a string")
+    status = record.get("status") or JOB_STATUSES[STATUS_ACTIVE]
+    if status not in JOB_STATUSES:
+        raise ValueError(f"Unknown status: {status}")
+
+    now = int(time.time())
+    try:
+        posted_at = _epoch(record.get("date_posted"), now)
+        checked_at = _epoch(record.get("last_checked"), now)
+    except (TypeError, ValueError):
+        raise ValueError("Dates must be YYYY-MM-DD or ISO 8601")
+    return (record["title"], location, record["company"], record["url"],
+            status, posted_at, checked_at)
+
+
+def import_jobs(conn: sqlite3.Connection, jobs: List[tuple]) -> int:
+    """Upsert jobs from parse_job() by URL in a single transaction; returns rows written
+
+    Ids are not carried over: a URL already present keeps its id, new ones get
+    the next free id, so imports never collide with existing applications.
+    """
+    if not jobs:
+        return 0
+    with conn:
+        companies = lookup_ids(conn, "companies", (job[2] for job in jobs))
+        locations = lookup_ids(conn, "locations", (job[1] for job in jobs if job[1] is not None))
+        conn.executemany(UPSERT_IMPORTED_JOB, [
+            (title, locations.get(location), companies[company], url, JOB_STATUSES.index(status),
+             posted_at, checked_at, content_hash(title, location, company))
+            for title, location, company, url, status, posted_at, checked_at in jobs
+        ])
+        ids = job_ids(conn, [job[3] for job in jobs])
+        index_skills(conn, {ids[job[3]]: extract_skills(job[0]) for job in jobs})
+    return len(jobs)
@@ -0,0 +1,140 @@
+"""Assert that the hot queries are served by indexes rather than full scans
+
+Usage:
+    python -m db.check_plans [path/to/jobs.db]
+
+Without a path the check runs against a fresh database built by the migrations
+and seeded with representative rows, so the planner has real statistics to
+work from rather than the guesses it makes for empty tables.
+Exits non-zero if any query scans a table without an index or sorts with a
+temporary b-tree.
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+
+from automation import runs
+from db import queries
+from db.bulk import import_jobs
+from db.migrations import STATUS_ACTIVE, migrate
+from db.retention import SELECT_ARCHIVE_BATCH
+from db.search import SEARCH_JOBS
+
+SEED_JOBS = 2000
+SEED_COMPANIES = ("Google", "Amazon", "Microsoft", "Meta", "Apple", "Netflix", "Stripe", "Morningstar")
+SEED_LOCATIONS = ("Seattle, WA", "New York, NY", "Austin, TX", "Chicago, IL", "Remote")
+SEED_TITLES = ("Software Engineer", "Senior Python Developer", "Data Scientist", "AWS Cloud Engineer",
+               "Frontend Engineer (React)", "DevOps Engineer, Kubernetes", "Machine Learning Engineer",
+               "Engineering Manager")
+
+# (description, query, parameters) for the queries the API and automation run most
+QUERIES = [
+    ("jobs by status", f"SELECT * FROM job_listing WHERE 1=1 AND status_code = {queries.STATUS_CODE} "
+     "ORDER BY posted_at DESC, id DESC LIMIT ?", ("active", 51)),
+    ("jobs by company", f"SELECT * FROM job_listing WHERE 1=1 AND company_id = {queries.COMPANY_ID} "
+     "ORDER BY posted_at DESC, id DESC LIMIT ?", ("Google", 51)),
+    ("latest jobs", "SELECT * FROM job_listing WHERE 1=1 ORDER BY posted_at DESC, id DESC LIMIT ?", (51,)),
+    ("jobs page by status", f"SELECT * FROM job_listing WHERE 1=1 AND status_code = {queries.STATUS_CODE} "
+     "AND (posted_at, id) < (?, ?) ORDER BY posted_at DESC, id DESC LIMIT ?", ("active", 1735689600, 100, 51)),
+    ("latest jobs page", "SELECT * FROM job_listing WHERE 1=1 AND (posted_at, id) < (?, ?) "
+     "ORDER BY posted_at DESC, id DESC LIMIT ?", (1735689600, 100, 51)),
+    ("job by id", queries.SELECT_JOB, (1,)),
+    # Reads the per company/status counters; the ORDER BY sorts one row per company
+    ("company counts", queries.SELECT_COMPANY_COUNTS, ()),
+    ("application for job", queries.SELECT_APPLICATION_FOR_JOB, (1,)),
+    ("applications page", queries.SELECT_APPLICATIONS + """
+        WHERE (a.applied_date, a.id) < (?, ?)
+        ORDER BY a.applied_date DESC, a.id DESC LIMIT ?
+    """, ("2025-01-01", 100, 51)),
+    ("pending applications", queries.SELECT_PENDING_APPLICATIONS, (20,)),
+    ("pending count", queries.SELECT_PENDING_COUNT, ()),
+    ("close unseen jobs", f"SELECT id FROM jobs WHERE company_id = ? AND status = {STATUS_ACTIVE}", (1,)),
+    ("retention batch", SELECT_ARCHIVE_BATCH, (1735689600, "pending", "2025-01-01", 500)),
+    ("job search", SEARCH_JOBS + " ORDER BY rank LIMIT ?", ('"eng"*', 20)),
+    ("jobs by location", "SELECT * FROM job_listing WHERE 1=1 AND id IN "
+     "(SELECT rowid FROM jobs_fts WHERE jobs_fts MATCH ?) ORDER BY posted_at DESC, id DESC LIMIT ?",
+     ('location : ("seattle"*)', 51)),
+    ("claim automation run", runs.CLAIM_RUN, ("worker", 0, 0)),
+    ("jobs with all skills", "SELECT * FROM job_listing WHERE 1=1 AND id IN "
+     f"({queries.SKILL_JOB_IDS} INTERSECT {queries.SKILL_JOB_IDS}) ORDER BY posted_at DESC, id DESC LIMIT ?",
+     ("python", "aws", 51)),
+    ("jobs with any skill", "SELECT * FROM job_listing WHERE 1=1 AND id IN (SELECT job_id FROM job_skills "
+     "WHERE skill_id IN (SELECT id FROM skills WHERE name IN (?, ?))) ORDER BY posted_at DESC, id DESC LIMIT ?",
+     ("python", "aws", 51)),
+]
+
+
+# Queries that sort an aggregated or full-text matched result rather than reading in index order
+SORTED_AFTER_MATCH = {"company counts", "job search", "jobs by location",
+                      "jobs with all skills", "jobs with any skill"}
+
+
+# Queries that scan a summary table, which holds one row per company and status
+SUMMARY_SCANS = {"company counts"}
+
+
+def plan_problems(name: str, detail: str):
+    problems = []
+    # "SCAN jobs USING INDEX ..." walks an index in order and is fine
+    # "SCAN jobs_fts VIRTUAL TABLE ..." is an FTS5 index lookup
+    if (detail.startswith("SCAN ") and " USING " not in detail and "VIRTUAL TABLE" not in detail
+            and name not in SUMMARY_SCANS):
+        problems.append("full table scan")
+    if "TEMP B-TREE FOR ORDER BY" in detail and name not in SORTED_AFTER_MATCH:
+        problems.append("sort without an index")
+    return problems
+
+
+def check(conn: sqlite3.Connection, queries=QUERIES) -> bool:
+    ok = True
+    for name, query, params in queries:
+        rows = conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+        details = [row[3] for row in rows]
+        failures = [p for d in details for p in plan_problems(name, d)]
+        status = "FAIL" if failures else "ok"
+        print(f"[{status}] {name}: {'; '.join(details)}")
+        for failure in failures:
+            print(f"       {failure}")
+        ok = ok and not failures
+    return ok
+
+
+def seed(conn: sqlite3.Connection, jobs: int = SEED_JOBS):
+    """Fill a fresh database with jobs, applications and runs in realistic proportions, then ANALYZE"""
+    day = 24 * 60 * 60
+    start = 1735689600
+    statuses = ("active",) * 6 + ("applied", "closed")
+    import_jobs(conn, [
+        (f"{SEED_TITLES[n % len(SEED_TITLES)]} {n}", SEED_LOCATIONS[n % len(SEED_LOCATIONS)],
+         SEED_COMPANIES[n % len(SEED_COMPANIES)], f"https://jobs.example.com/{n}",
+         statuses[n % len(statuses)], start + (n % 365) * day, start + (n % 365) * day)
+        for n in range(jobs)
+    ])
+    with conn:
+        # About one job in four has been applied to
+        conn.executemany("INSERT INTO applications (job_id, applied_date, notes) VALUES (?, date(?, 'unixepoch'), '')",
+                         [(job_id, start + (job_id % 365) * day)
+                          for job_id, in conn.execute("SELECT id FROM jobs WHERE id % 4 = 0")])
+    for _ in range(20):
+        runs.finish_run(conn, runs.enqueue_run(conn, 10))
+    conn.execute("ANALYZE")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    with tempfile.TemporaryDirectory() as scratch:
+        db_path = argv[0] if argv else os.path.join(scratch, "plans.db")
+        conn = sqlite3.connect(db_path)
+        try:
+            migrate(conn)
+            if not argv:
+                seed(conn)
+            ok = check(conn)
+        finally:
+            conn.close()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
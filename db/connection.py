@@ -0,0 +1,145 @@
+import asyncio
+import os
+import queue
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from typing import Callable, Dict, Optional, TypeVar
+from urllib.request import pathname2url
+
+T = TypeVar("T")
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "jobs.db")
+
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+# Negative cache_size is in KiB
+CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_KB", "16384"))
+MMAP_SIZE = int(os.getenv("SQLITE_MMAP_BYTES", str(256 * 1024 * 1024)))
+BUSY_TIMEOUT_SECONDS = 30
+# Compiled statements kept per connection, keyed by SQL text
+STATEMENT_CACHE_SIZE = 256
+# Seconds a caller waits for a connection while every one is in use
+ACQUIRE_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+
+
+class PoolTimeout(Exception):
+    """No pooled connection came free within the pool's timeout"""
+
+
+def connect(db_path: str, read_only: bool = False) -> sqlite3.Connection:
+    """Open a connection with the pragmas every reader and writer should use"""
+    conn = sqlite3.connect(
+        f"file:{pathname2url(os.path.abspath(db_path))}?mode=ro" if read_only else db_path,
+        timeout=BUSY_TIMEOUT_SECONDS,
+        check_same_thread=False,
+        cached_statements=STATEMENT_CACHE_SIZE,
+        uri=read_only,
+    )
+    conn.row_factory = sqlite3.Row
+    if not read_only:
+        # WAL lets readers carry on while a scraper holds the write lock
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+class ConnectionPool:
+    """Reuse tuned connections so their page cache and prepared statements stay warm
+
+    Connections are handed out one thread at a time; check_same_thread is off
+    so a connection can move between worker threads between uses. Async code
+    uses run(), which executes the query on the pool's own threads so a slow
+    query or a lock wait never blocks the event loop.
+    """
+
+    def __init__(self, db_path: str, size: int = POOL_SIZE, read_only: bool = False,
+                 timeout: float = ACQUIRE_TIMEOUT_SECONDS):
+        self.db_path = db_path
+        self.size = max(1, size)
+        self.read_only = read_only
+        self.timeout = timeout
+        self._closed = False
+        # LIFO keeps the most recently used (warmest) connections in play
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        # One thread per connection, so a worker never waits for a free connection
+        # unless synchronous callers are holding some of them
+        self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="sqlite")
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+        if create:
+            try:
+                return connect(self.db_path, self.read_only)
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise PoolTimeout(f"No database connection came free within {self.timeout:g}s") from None
+
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            # Never hand the next caller a half-finished transaction
+            if conn.in_transaction:
+                conn.rollback()
+            if self._closed:
+                conn.close()
+            else:
+                self._idle.put(conn)
+
+    def _call(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        with self.connection() as conn:
+            return fn(conn, *args, **kwargs)
+
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """Await fn(conn, *args, **kwargs) run on a pool thread with a pooled connection"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(self._call, fn, *args, **kwargs))
+
+    def close(self):
+        """Close idle connections now and in-use ones as they are returned"""
+        self._closed = True
+        self._executor.shutdown(wait=True)
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: Optional[str] = None) -> ConnectionPool:
+    """Process-wide pool for a database file"""
+    path = os.path.abspath(db_path or os.getenv("DB_PATH", DEFAULT_DB_PATH))
+    with _pools_lock:
+        if path not in _pools:
+            _pools[path] = ConnectionPool(path)
+        return _pools[path]
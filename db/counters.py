@@ -0,0 +1,74 @@
+"""Summary counters kept current by triggers on jobs and applications
+
+Usage:
+    python -m db.counters [path/to/jobs.db]          # rebuild from the base tables
+    python -m db.counters --check [path/to/jobs.db]  # report drift, exit 1 if any
+
+The triggers keep company_job_counts and job_counters exact as rows are
+written, so the dashboard reads a handful of rows instead of counting the
+jobs table. A rebuild is only needed if rows were changed with the triggers
+missing, e.g. by restoring an old backup over part of the data.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+from typing import Any, Dict, Tuple
+
+from db.migrations import COUNT_JOBS_BY_COMPANY, COUNT_PENDING, migrate
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "jobs.db")
+
+PENDING_APPLICATIONS = "pending_applications"
+
+
+def rebuild(conn: sqlite3.Connection):
+    """Recompute every counter from the base tables; run inside a transaction"""
+    conn.execute("DELETE FROM company_job_counts")
+    conn.execute(f"INSERT INTO company_job_counts (company_id, status, count) {COUNT_JOBS_BY_COMPANY}")
+    conn.execute(
+        f"INSERT OR REPLACE INTO job_counters (name, value) VALUES (?, ({COUNT_PENDING}))",
+        (PENDING_APPLICATIONS,),
+    )
+
+
+def drift(conn: sqlite3.Connection) -> Dict[Tuple[Any, ...], Tuple[int, int]]:
+    """Counters whose stored value differs from a fresh count, as {key: (stored, actual)}"""
+    actual = {(company_id, status): count for company_id, status, count in conn.execute(COUNT_JOBS_BY_COMPANY)}
+    stored = {(company_id, status): count for company_id, status, count in conn.execute(
+        "SELECT company_id, status, count FROM company_job_counts WHERE count != 0")}
+    differences: Dict[Tuple[Any, ...], Tuple[int, int]] = {
+        key: (stored.get(key, 0), actual.get(key, 0))
+        for key in set(actual) | set(stored) if stored.get(key, 0) != actual.get(key, 0)
+    }
+
+    pending = conn.execute(COUNT_PENDING).fetchone()[0]
+    row = conn.execute("SELECT value FROM job_counters WHERE name = ?", (PENDING_APPLICATIONS,)).fetchone()
+    if (row[0] if row else 0) != pending:
+        differences[(PENDING_APPLICATIONS,)] = (row[0] if row else 0, pending)
+    return differences
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild or check the summary counters")
+    parser.add_argument("db_path", nargs="?", default=os.getenv("DB_PATH", DEFAULT_DB_PATH))
+    parser.add_argument("--check", action="store_true", help="Only report counters that have drifted")
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db_path, timeout=30)
+    try:
+        migrate(conn)
+        differences = drift(conn)
+        for key, (stored, actual) in sorted(differences.items(), key=str):
+            print(f"{key}: stored {stored}, actual {actual}")
+        if args.check:
+            sys.exit(1 if differences else 0)
+        with conn:
+            rebuild(conn)
+        print(f"Rebuilt counters ({len(differences)} had drifted)")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
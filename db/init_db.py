@@ -1,37 +1,19 @@
 import sqlite3
 
-def create_tables():
-    conn = sqlite3.connect("jobs.db")
-    c = conn.cursor()
+from db.migrations import migrate
 
-    c.execute("""
-CREATE TABLE IF NOT EXISTS jobs (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    title TEXT,
-    location TEXT,
-    company TEXT,
-    url TEXT UNIQUE,   -- make URL unique
-    status TEXT,
-    date_posted TEXT,
-    last_checked TEXT
-)
-""")
-
-    c.execute("""
-CREATE TABLE IF NOT EXISTS applications (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    job_id INTEGER,
-    applied_date TEXT,
-    status TEXT DEFAULT 'applied',
-    notes TEXT,
-    FOREIGN KEY (job_id) REFERENCES jobs (id)
-)
-""")
-
-
-    conn.commit()
-    conn.close()
+def create_tables(db_path="jobs.db"):
+    """Create the schema, or upgrade an existing database to the latest version"""
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        # auto_vacuum only takes effect before the first table is created; existing
+        # databases are switched over by python -m db.retention --enable-incremental-vacuum
+        if not conn.execute("SELECT 1 FROM sqlite_master").fetchone():
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        return migrate(conn)
+    finally:
+        conn.close()
 
 if __name__ == "__main__":
-    create_tables()
-    print("Database initialized: jobs.db")
+    applied = create_tables()
+    print(f"Database initialized: jobs.db ({applied} migrations applied)")
@@ -0,0 +1,590 @@
+import logging
+import sqlite3
+from typing import Callable, List, Tuple, Union
+
+from db.skills import index_skills
+
+logger = logging.getLogger(__name__)
+
+# Each migration is SQL text or a function taking the connection. The
+# database's PRAGMA user_version records how many have been applied, so only
+# the new ones run when an existing jobs.db is opened.
+Migration = Union[str, Callable[[sqlite3.Connection], None]]
+
+# jobs.status codes, seeded into job_statuses. Other names found in old data
+# are appended there by the normalization migration.
+JOB_STATUSES = ("active", "applied", "closed")
+STATUS_ACTIVE, STATUS_APPLIED, STATUS_CLOSED = range(len(JOB_STATUSES))
+
+# Joins the normalized jobs table back to the shape the API has always
+# returned. Dates come back as YYYY-MM-DD (UTC); the raw ids, status code and
+# epoch seconds are exposed too so filters and sorts can hit the jobs indexes.
+JOB_LISTING_VIEW = """
+    CREATE VIEW IF NOT EXISTS job_listing AS
+    SELECT j.id, j.title, l.name AS location, c.name AS company, j.url, s.name AS status,
+           date(j.posted_at, 'unixepoch') AS date_posted,
+           date(j.checked_at, 'unixepoch') AS last_checked,
+           j.company_id, j.location_id, j.status AS status_code, j.posted_at, j.checked_at,
+           j.content_hash
+    FROM jobs j
+    LEFT JOIN companies c ON c.id = j.company_id
+    LEFT JOIN locations l ON l.id = j.location_id
+    LEFT JOIN job_statuses s ON s.id = j.status
+"""
+
+
+def _add_content_hash(conn: sqlite3.Connection):
+    # Databases created before content_hash existed
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(jobs)")]
+    if "content_hash" not in columns:
+        conn.execute("ALTER TABLE jobs ADD COLUMN content_hash TEXT")
+
+
+def _unique_application_per_job(conn: sqlite3.Connection):
+    # Keep the first application recorded for a job before enforcing uniqueness. The
+    # later ones are set aside in applications_duplicates rather than dropped.
+    duplicates = "SELECT id FROM applications WHERE id NOT IN (SELECT MIN(id) FROM applications GROUP BY job_id)"
+    moved = conn.execute(f"SELECT COUNT(*) FROM ({duplicates})").fetchone()[0]
+    if moved:
+        conn.execute("CREATE TABLE IF NOT EXISTS applications_duplicates AS SELECT * FROM applications WHERE 0")
+        conn.execute(f"INSERT INTO applications_duplicates SELECT * FROM applications WHERE id IN ({duplicates})")
+        conn.execute(f"DELETE FROM applications WHERE id IN ({duplicates})")
+        logger.warning("Moved %d duplicate applications to applications_duplicates", moved)
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_applications_job_id ON applications (job_id)")
+
+
+def _normalize_jobs(conn: sqlite3.Connection):
+    """Move company, location and status into lookup tables and dates to epoch seconds"""
+    conn.execute("CREATE TABLE companies (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)")
+    conn.execute("CREATE TABLE locations (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)")
+    conn.execute("CREATE TABLE job_statuses (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)")
+    conn.executemany("INSERT INTO job_statuses (id, name) VALUES (?, ?)", list(enumerate(JOB_STATUSES)))
+
+    conn.execute("INSERT OR IGNORE INTO companies (name) SELECT DISTINCT company FROM jobs WHERE company IS NOT NULL")
+    conn.execute("INSERT OR IGNORE INTO locations (name) SELECT DISTINCT location FROM jobs WHERE location IS NOT NULL")
+    conn.execute("INSERT OR IGNORE INTO job_statuses (name) SELECT DISTINCT status FROM jobs WHERE status IS NOT NULL")
+
+    # The FTS index reads its text from jobs; rebuild it over the new layout
+    for trigger in ("jobs_fts_insert", "jobs_fts_delete", "jobs_fts_update"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    conn.execute("DROP TABLE IF EXISTS jobs_fts")
+
+    conn.execute(f"""
+        CREATE TABLE jobs_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT,
+            company_id INTEGER REFERENCES companies (id),
+            location_id INTEGER REFERENCES locations (id),
+            url TEXT UNIQUE,
+            status INTEGER NOT NULL DEFAULT {STATUS_ACTIVE} REFERENCES job_statuses (id),
+            posted_at INTEGER,   -- unix epoch seconds
+            checked_at INTEGER,  -- unix epoch seconds
+            content_hash TEXT    -- hash of the scraped fields, used to skip unchanged rows
+        )
+    """)
+    conn.execute(f"""
+        INSERT INTO jobs_new (id, title, company_id, location_id, url, status, posted_at, checked_at, content_hash)
+        SELECT j.id, j.title,
+               (SELECT id FROM companies WHERE name = j.company),
+               (SELECT id FROM locations WHERE name = j.location),
+               j.url,
+               COALESCE((SELECT id FROM job_statuses WHERE name = j.status), {STATUS_ACTIVE}),
+               CAST(strftime('%s', j.date_posted) AS INTEGER),
+               CAST(strftime('%s', j.last_checked) AS INTEGER),
+               j.content_hash
+        FROM jobs j
+    """)
+    conn.execute("DROP TABLE jobs")
+    conn.execute("ALTER TABLE jobs_new RENAME TO jobs")
+
+    conn.execute("CREATE INDEX idx_jobs_status_posted_at ON jobs (status, posted_at)")
+    conn.execute("CREATE INDEX idx_jobs_company_posted_at ON jobs (company_id, posted_at)")
+    conn.execute("CREATE INDEX idx_jobs_posted_at ON jobs (posted_at)")
+    conn.execute(JOB_LISTING_VIEW)
+
+    conn.execute("""
+        CREATE VIEW jobs_fts_content AS
+        SELECT j.id, j.title, c.name AS company, l.name AS location
+        FROM jobs j
+        LEFT JOIN companies c ON c.id = j.company_id
+        LEFT JOIN locations l ON l.id = j.location_id
+    """)
+    conn.execute("""
+        CREATE VIRTUAL TABLE jobs_fts USING fts5(
+            title, company, location,
+            content='jobs_fts_content', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER jobs_fts_insert AFTER INSERT ON jobs BEGIN
+            INSERT INTO jobs_fts (rowid, title, company, location)
+            VALUES (new.id, new.title,
+                    (SELECT name FROM companies WHERE id = new.company_id),
+                    (SELECT name FROM locations WHERE id = new.location_id));
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER jobs_fts_delete AFTER DELETE ON jobs BEGIN
+            INSERT INTO jobs_fts (jobs_fts, rowid, title, company, location)
+            VALUES ('delete', old.id, old.title,
+                    (SELECT name FROM companies WHERE id = old.company_id),
+                    (SELECT name FROM locations WHERE id = old.location_id));
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER jobs_fts_update AFTER UPDATE OF title, company_id, location_id ON jobs
+        WHEN old.title IS NOT new.title OR old.company_id IS NOT new.company_id
+          OR old.location_id IS NOT new.location_id
+        BEGIN
+            INSERT INTO jobs_fts (jobs_fts, rowid, title, company, location)
+            VALUES ('delete', old.id, old.title,
+                    (SELECT name FROM companies WHERE id = old.company_id),
+                    (SELECT name FROM locations WHERE id = old.location_id));
+            INSERT INTO jobs_fts (rowid, title, company, location)
+            VALUES (new.id, new.title,
+                    (SELECT name FROM companies WHERE id = new.company_id),
+                    (SELECT name FROM locations WHERE id = new.location_id));
+        END
+    """)
+    conn.execute("INSERT INTO jobs_fts (jobs_fts) VALUES ('rebuild')")
+
+
+# Whether a job row counts towards pending applications: active and not applied to
+_IS_PENDING = f"""
+    ({{row}}.status = {STATUS_ACTIVE} AND NOT EXISTS (SELECT 1 FROM applications WHERE job_id = {{row}}.id))
+"""
+
+# Fresh counts from the base tables, for seeding the counters and checking them (db.counters)
+COUNT_JOBS_BY_COMPANY = """
+    SELECT company_id, status, COUNT(*) FROM jobs
+    WHERE company_id IS NOT NULL
+    GROUP BY company_id, status
+"""
+COUNT_PENDING = f"""
+    SELECT COUNT(*) FROM jobs j
+    WHERE j.status = {STATUS_ACTIVE}
+      AND NOT EXISTS (SELECT 1 FROM applications a WHERE a.job_id = j.id)
+"""
+
+
+def _summary_counters(conn: sqlite3.Connection):
+    """Per company/status job counts and the pending-application count, kept by triggers"""
+    conn.execute("""
+        CREATE TABLE company_job_counts (
+            company_id INTEGER NOT NULL,
+            status INTEGER NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (company_id, status)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE TABLE job_counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL) WITHOUT ROWID")
+
+    conn.execute(f"""
+        CREATE TRIGGER job_counts_insert AFTER INSERT ON jobs BEGIN
+            INSERT INTO company_job_counts (company_id, status, count)
+            SELECT new.company_id, new.status, 1 WHERE new.company_id IS NOT NULL
+            ON CONFLICT (company_id, status) DO UPDATE SET count = count + 1;
+            UPDATE job_counters SET value = value + 1
+            WHERE name = 'pending_applications' AND {_IS_PENDING.format(row="new")};
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER job_counts_delete AFTER DELETE ON jobs BEGIN
+            UPDATE company_job_counts SET count = count - 1
+            WHERE company_id = old.company_id AND status = old.status;
+            UPDATE job_counters SET value = value - 1
+            WHERE name = 'pending_applications' AND {_IS_PENDING.format(row="old")};
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER job_counts_update AFTER UPDATE OF company_id, status ON jobs
+        WHEN old.company_id IS NOT new.company_id OR old.status IS NOT new.status
+        BEGIN
+            UPDATE company_job_counts SET count = count - 1
+            WHERE company_id = old.company_id AND status = old.status;
+            INSERT INTO company_job_counts (company_id, status, count)
+            SELECT new.company_id, new.status, 1 WHERE new.company_id IS NOT NULL
+            ON CONFLICT (company_id, status) DO UPDATE SET count = count + 1;
+            UPDATE job_counters
+            SET value = value + {_IS_PENDING.format(row="new")} - {_IS_PENDING.format(row="old")}
+            WHERE name = 'pending_applications';
+        END
+    """)
+    # applications.job_id is unique, so an insert or delete always flips its job
+    conn.execute(f"""
+        CREATE TRIGGER application_counts_insert AFTER INSERT ON applications
+        WHEN (SELECT status FROM jobs WHERE id = new.job_id) = {STATUS_ACTIVE}
+        BEGIN
+            UPDATE job_counters SET value = value - 1 WHERE name = 'pending_applications';
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER application_counts_delete AFTER DELETE ON applications
+        WHEN (SELECT status FROM jobs WHERE id = old.job_id) = {STATUS_ACTIVE}
+        BEGIN
+            UPDATE job_counters SET value = value + 1 WHERE name = 'pending_applications';
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER application_counts_update AFTER UPDATE OF job_id ON applications
+        WHEN old.job_id IS NOT new.job_id
+        BEGIN
+            UPDATE job_counters SET value = value
+                + ((SELECT status FROM jobs WHERE id = old.job_id) IS {STATUS_ACTIVE})
+                - ((SELECT status FROM jobs WHERE id = new.job_id) IS {STATUS_ACTIVE})
+            WHERE name = 'pending_applications';
+        END
+    """)
+
+    conn.execute(f"INSERT INTO company_job_counts (company_id, status, count) {COUNT_JOBS_BY_COMPANY}")
+    conn.execute(f"INSERT INTO job_counters (name, value) VALUES ('pending_applications', ({COUNT_PENDING}))")
+
+
+# Archived jobs with the same columns as job_listing, plus when they were archived
+ARCHIVED_JOB_LISTING_VIEW = """
+    CREATE VIEW IF NOT EXISTS archived_job_listing AS
+    SELECT j.id, j.title, l.name AS location, c.name AS company, j.url, s.name AS status,
+           date(j.posted_at, 'unixepoch') AS date_posted,
+           date(j.checked_at, 'unixepoch') AS last_checked,
+           j.company_id, j.location_id, j.status AS status_code, j.posted_at, j.checked_at,
+           j.content_hash
+    FROM jobs_archive j
+    LEFT JOIN companies c ON c.id = j.company_id
+    LEFT JOIN locations l ON l.id = j.location_id
+    LEFT JOIN job_statuses s ON s.id = j.status
+"""
+
+
+def _job_skills(conn: sqlite3.Connection):
+    """Inverted index from skills to the hot jobs whose titles mention them"""
+    conn.execute("CREATE TABLE skills (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)")
+    # Keyed skill first, so one skill's jobs are a contiguous range to intersect or union
+    conn.execute("""
+        CREATE TABLE job_skills (
+            skill_id INTEGER NOT NULL REFERENCES skills (id),
+            job_id INTEGER NOT NULL REFERENCES jobs (id),
+            PRIMARY KEY (skill_id, job_id)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX idx_job_skills_job_id ON job_skills (job_id)")
+    # Covers archiving too: like the full-text index, skills only cover hot jobs
+    conn.execute("""
+        CREATE TRIGGER job_skills_delete AFTER DELETE ON jobs
+        BEGIN
+            DELETE FROM job_skills WHERE job_id = old.id;
+        END
+    """)
+
+    # The skill list is plain data with no database imports, so this does not pull in the scrapers
+    from scrapers.classifier import extract_skills
+    index_skills(conn, {job_id: extract_skills(title) for job_id, title in conn.execute("SELECT id, title FROM jobs")})
+
+
+def _reindex_common_word_skills(conn: sqlite3.Connection):
+    """Re-extract skills for jobs tagged with a common-word skill, which used to
+    match inside hyphenated words such as Go-to-market"""
+    from scrapers.classifier import COMMON_WORD_SKILLS, extract_skills
+    names = sorted(COMMON_WORD_SKILLS)
+    rows = conn.execute(f"""
+        SELECT id, title FROM jobs WHERE id IN (
+            SELECT job_id FROM job_skills WHERE skill_id IN (
+                SELECT id FROM skills WHERE name IN ({','.join('?' * len(names))})))
+    """, names)
+    index_skills(conn, {job_id: extract_skills(title) for job_id, title in rows})
+
+
+MIGRATIONS: List[Tuple[str, List[Migration]]] = [
+    ("base tables", [
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT,
+            location TEXT,
+            company TEXT,
+            url TEXT UNIQUE,   -- make URL unique
+            status TEXT,
+            date_posted TEXT,
+            last_checked TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS applications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id INTEGER,
+            applied_date TEXT,
+            status TEXT DEFAULT 'applied',
+            notes TEXT,
+            FOREIGN KEY (job_id) REFERENCES jobs (id)
+        )
+        """,
+    ]),
+    ("jobs.content_hash", [_add_content_hash]),
+    ("job listing indexes", [
+        # /jobs filters on status or company and sorts newest first
+        "CREATE INDEX IF NOT EXISTS idx_jobs_status_date_posted ON jobs (status, date_posted)",
+        "CREATE INDEX IF NOT EXISTS idx_jobs_company_date_posted ON jobs (company, date_posted)",
+        "CREATE INDEX IF NOT EXISTS idx_jobs_date_posted ON jobs (date_posted)",
+    ]),
+    ("application indexes", [
+        _unique_application_per_job,
+        "CREATE INDEX IF NOT EXISTS idx_applications_applied_date ON applications (applied_date)",
+    ]),
+    ("job search index", [
+        # External-content FTS5 index: the text lives in jobs, the index only holds
+        # tokens. Prefix indexes keep "eng*" style queries from walking the whole index.
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+            title, company, location,
+            content='jobs', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_insert AFTER INSERT ON jobs BEGIN
+            INSERT INTO jobs_fts (rowid, title, company, location)
+            VALUES (new.id, new.title, new.company, new.location);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs BEGIN
+            INSERT INTO jobs_fts (jobs_fts, rowid, title, company, location)
+            VALUES ('delete', old.id, old.title, old.company, old.location);
+        END
+        """,
+        # Scraper upserts rewrite these columns with the same values; only reindex real changes
+        """
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_update AFTER UPDATE OF title, company, location ON jobs
+        WHEN old.title IS NOT new.title OR old.company IS NOT new.company OR old.location IS NOT new.location
+        BEGIN
+            INSERT INTO jobs_fts (jobs_fts, rowid, title, company, location)
+            VALUES ('delete', old.id, old.title, old.company, old.location);
+            INSERT INTO jobs_fts (rowid, title, company, location)
+            VALUES (new.id, new.title, new.company, new.location);
+        END
+        """,
+        "INSERT INTO jobs_fts (jobs_fts) VALUES ('rebuild')",
+    ]),
+    ("normalized jobs", [_normalize_jobs]),
+    ("summary counters", [_summary_counters]),
+    ("job archive", [
+        # Same file as the hot tables, so moving a batch is one atomic transaction.
+        # Ids are never reused (jobs is AUTOINCREMENT), so they stay unique here.
+        """
+        CREATE TABLE jobs_archive (
+            id INTEGER PRIMARY KEY,
+            title TEXT,
+            company_id INTEGER,
+            location_id INTEGER,
+            url TEXT,
+            status INTEGER NOT NULL,
+            posted_at INTEGER,
+            checked_at INTEGER,
+            content_hash TEXT,
+            archived_at INTEGER NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE applications_archive (
+            id INTEGER PRIMARY KEY,
+            job_id INTEGER,
+            applied_date TEXT,
+            status TEXT,
+            notes TEXT,
+            archived_at INTEGER NOT NULL
+        )
+        """,
+        "CREATE INDEX idx_jobs_archive_posted_at ON jobs_archive (posted_at)",
+        "CREATE INDEX idx_jobs_archive_company_posted_at ON jobs_archive (company_id, posted_at)",
+        "CREATE INDEX idx_applications_archive_job_id ON applications_archive (job_id)",
+        "CREATE INDEX idx_applications_archive_applied_date ON applications_archive (applied_date)",
+        # Lets the retention pass find old, finished jobs without scanning active ones
+        "CREATE INDEX idx_jobs_status_checked_at ON jobs (status, checked_at)",
+        ARCHIVED_JOB_LISTING_VIEW,
+        """
+        CREATE VIEW all_job_listing AS
+        SELECT * FROM job_listing
+        UNION ALL
+        SELECT * FROM archived_job_listing
+        """,
+    ]),
+    ("job skills", [_job_skills]),
+    ("resumes", [
+        # Parsed uploads, so /match can rank jobs for a resume by id
+        """
+        CREATE TABLE resumes (
+            id INTEGER PRIMARY KEY,
+            filename TEXT NOT NULL,
+            skills TEXT NOT NULL,  -- JSON array of skill names
+            experience_years INTEGER,
+            text TEXT,
+            uploaded_at INTEGER NOT NULL
+        )
+        """,
+    ]),
+    ("automation runs", [
+        # Queue of runs enqueued by the API and executed by automation.worker
+        """
+        CREATE TABLE automation_runs (
+            id INTEGER PRIMARY KEY,
+            status TEXT NOT NULL,  -- queued, running, finished or failed
+            max_applications INTEGER NOT NULL,
+            total INTEGER,
+            completed INTEGER NOT NULL DEFAULT 0,
+            succeeded INTEGER NOT NULL DEFAULT 0,
+            worker TEXT,
+            error TEXT,
+            created_at INTEGER NOT NULL,
+            started_at INTEGER,
+            heartbeat_at INTEGER,
+            finished_at INTEGER
+        )
+        """,
+        "CREATE INDEX idx_automation_runs_status ON automation_runs (status, id)",
+        """
+        CREATE TABLE automation_run_items (
+            id INTEGER PRIMARY KEY,
+            run_id INTEGER NOT NULL REFERENCES automation_runs (id),
+            job_id INTEGER NOT NULL,
+            title TEXT,
+            url TEXT,
+            company TEXT,
+            status TEXT NOT NULL,
+            notes TEXT,
+            started_at INTEGER,
+            finished_at INTEGER,
+            duration_seconds REAL
+        )
+        """,
+        "CREATE INDEX idx_automation_run_items_run_id ON automation_run_items (run_id, job_id)",
+    ]),
+    ("events", [
+        # Outbox of progress events, tailed by the API for /events
+        """
+        CREATE TABLE events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            type TEXT NOT NULL,
+            payload TEXT NOT NULL,  -- JSON object
+            created_at INTEGER NOT NULL
+        )
+        """,
+    ]),
+    ("jobs change counter", [
+        # Bumped whenever a job is added, removed or changes title or status, so caches
+        # built from the jobs (matching.JobMatcher) can ignore commits to other tables
+        "INSERT INTO job_counters (name, value) VALUES ('jobs_version', 0)",
+        """
+        CREATE TRIGGER jobs_version_insert AFTER INSERT ON jobs BEGIN
+            UPDATE job_counters SET value = value + 1 WHERE name = 'jobs_version';
+        END
+        """,
+        """
+        CREATE TRIGGER jobs_version_delete AFTER DELETE ON jobs BEGIN
+            UPDATE job_counters SET value = value + 1 WHERE name = 'jobs_version';
+        END
+        """,
+        """
+        CREATE TRIGGER jobs_version_update AFTER UPDATE OF title, status ON jobs
+        WHEN old.title IS NOT new.title OR old.status IS NOT new.status
+        BEGIN
+            UPDATE job_counters SET value = value + 1 WHERE name = 'jobs_version';
+        END
+        """,
+    ]),
+    ("jobs.posted_at not null", [
+        # The (posted_at, id) page cursor compares NULL as unknown, so undated rows
+        # would end paging early. Rows whose date did not parse during normalization
+        # fall back to when they were last seen, else the epoch (the end of the listing).
+        "UPDATE jobs SET posted_at = COALESCE(checked_at, 0) WHERE posted_at IS NULL",
+        "UPDATE jobs_archive SET posted_at = COALESCE(checked_at, 0) WHERE posted_at IS NULL",
+        # NOT NULL without rebuilding jobs and its triggers
+        """
+        CREATE TRIGGER jobs_posted_at_insert BEFORE INSERT ON jobs WHEN new.posted_at IS NULL BEGIN
+            SELECT RAISE(ABORT, 'NOT NULL constraint failed: jobs.posted_at');
+        END
+        """,
+        """
+        CREATE TRIGGER jobs_posted_at_update BEFORE UPDATE OF posted_at ON jobs WHEN new.posted_at IS NULL BEGIN
+            SELECT RAISE(ABORT, 'NOT NULL constraint failed: jobs.posted_at');
+        END
+        """,
+    ]),
+    ("common-word skills", [_reindex_common_word_skills]),
+    ("job changes log", [
+        # Which jobs moved jobs_version, so matching.JobMatcher re-reads only those.
+        # Trimmed by retention to matching.JOB_CHANGE_HISTORY rows.
+        """
+        CREATE TABLE job_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id INTEGER NOT NULL
+        )
+        """,
+        """
+        CREATE TRIGGER job_changes_insert AFTER INSERT ON jobs BEGIN
+            INSERT INTO job_changes (job_id) VALUES (new.id);
+        END
+        """,
+        """
+        CREATE TRIGGER job_changes_delete AFTER DELETE ON jobs BEGIN
+            INSERT INTO job_changes (job_id) VALUES (old.id);
+        END
+        """,
+        """
+        CREATE TRIGGER job_changes_update AFTER UPDATE OF title, status ON jobs
+        WHEN old.title IS NOT new.title OR old.status IS NOT new.status
+        BEGIN
+            INSERT INTO job_changes (job_id) VALUES (new.id);
+        END
+        """,
+    ]),
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Apply pending migrations, each in its own transaction; returns the number applied"""
+    if schema_version(conn) >= SCHEMA_VERSION:
+        return 0
+
+    isolation_level = conn.isolation_level
+    # Manage transactions explicitly so DDL and the version bump commit together
+    conn.isolation_level = None
+    applied = 0
+    try:
+        while True:
+            # Take the write lock before reading the version so concurrent
+            # processes cannot apply the same migration twice
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                version = schema_version(conn)
+                if version >= SCHEMA_VERSION:
+                    conn.execute("COMMIT")
+                    break
+                _, steps = MIGRATIONS[version]
+                for step in steps:
+                    if callable(step):
+                        step(conn)
+                    else:
+                        conn.execute(step)
+                conn.execute(f"PRAGMA user_version = {version + 1}")
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            applied += 1
+        if applied:
+            # Refresh planner statistics for the new indexes. PRAGMA optimize only analyzes
+            # tables this connection has queried, which leaves applications without stats and
+            # its joins to jobs planned as a scan.
+            conn.execute("PRAGMA optimize")
+            conn.execute("ANALYZE applications")
+    finally:
+        conn.isolation_level = isolation_level
+    return applied
@@ -0,0 +1,39 @@
+import base64
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque cursor for the sort key of the last row on a page"""
+    raw = json.dumps(list(values), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Sort key stored in a cursor; ValueError if it is not one of ours"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError("Malformed cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Malformed cursor")
+    return values
+
+
+def page_size(limit: Optional[int]) -> int:
+    return max(1, min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+
+
+def split_page(rows: list, limit: int, key) -> Tuple[list, Optional[str]]:
+    """Trim a fetch of limit + 1 rows to one page and build the cursor for the next
+
+    key(row) returns the row's sort key, e.g. (posted_at, id).
+    """
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(key(rows[-1]))
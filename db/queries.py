@@ -0,0 +1,219 @@
+"""Data access for the API and automation
+
+Every function takes a connection as its first argument and blocks, so async
+callers run them through ConnectionPool.run() instead of on the event loop.
+SQL is kept as constant text where possible so each pooled connection
+compiles a statement once and reuses it.
+"""
+import json
+import sqlite3
+import time
+from typing import List, Optional, Sequence
+
+from db.migrations import STATUS_ACTIVE, STATUS_APPLIED
+from db.search import SEARCH_JOBS
+
+# Reads go through the job_listing view, which joins the lookup tables back
+# to names; filters and sorts use its raw columns so the jobs indexes apply
+SELECT_JOB = "SELECT * FROM job_listing WHERE id = ?"
+# Summed from the trigger-maintained counters: one row per company and status
+SELECT_COMPANY_COUNTS = """
+    SELECT c.name AS company, SUM(k.count) AS count
+    FROM company_job_counts k
+    JOIN companies c ON c.id = k.company_id
+    GROUP BY k.company_id
+    HAVING SUM(k.count) > 0
+    ORDER BY count DESC
+"""
+SELECT_PENDING_COUNT = "SELECT value FROM job_counters WHERE name = 'pending_applications'"
+SELECT_JOB_ID = "SELECT id FROM jobs WHERE id = ?"
+COMPANY_ID = "(SELECT id FROM companies WHERE name = ?)"
+STATUS_CODE = "(SELECT id FROM job_statuses WHERE name = ?)"
+# Jobs indexed under one skill: a single range of the job_skills primary key
+SKILL_JOB_IDS = "SELECT job_id FROM job_skills WHERE skill_id = (SELECT id FROM skills WHERE name = ?)"
+SELECT_APPLICATION_FOR_JOB = "SELECT id FROM applications WHERE job_id = ?"
+INSERT_APPLICATION = """
+    INSERT INTO applications (job_id, applied_date, status, notes)
+    VALUES (?, ?, 'applied', ?)
+"""
+MARK_JOB_APPLIED = f"UPDATE jobs SET status = {STATUS_APPLIED} WHERE id = ?"
+SELECT_APPLICATIONS = """
+    SELECT a.id, a.job_id, a.applied_date, a.status, a.notes, j.title, j.company
+    FROM applications a
+    JOIN job_listing j ON a.job_id = j.id
+"""
+# Hot and archived applications; archived ones always belong to archived jobs
+SELECT_ALL_APPLICATIONS = f"""
+    SELECT * FROM (
+        {SELECT_APPLICATIONS}
+        UNION ALL
+        SELECT a.id, a.job_id, a.applied_date, a.status, a.notes, j.title, j.company
+        FROM applications_archive a
+        JOIN archived_job_listing j ON a.job_id = j.id
+    ) a
+"""
+SELECT_ANY_JOB = "SELECT * FROM all_job_listing WHERE id = ?"
+SELECT_PENDING_APPLICATIONS = f"""
+    SELECT j.id, j.title, j.url, j.company
+    FROM job_listing j
+    LEFT JOIN applications a ON j.id = a.job_id
+    WHERE j.status_code = {STATUS_ACTIVE} AND a.id IS NULL
+    ORDER BY j.posted_at DESC
+    LIMIT ?
+"""
+INSERT_RESUME = """
+    INSERT INTO resumes (filename, skills, experience_years, text, uploaded_at)
+    VALUES (?, ?, ?, ?, ?)
+    RETURNING id
+"""
+SELECT_RESUME = "SELECT id, filename, skills, experience_years, text FROM resumes WHERE id = ?"
+UPDATE_APPLICATION_STATUS = """
+    UPDATE applications
+    SET status = ?, notes = ?
+    WHERE job_id = ?
+"""
+
+
+class JobNotFound(LookupError):
+    pass
+
+
+class AlreadyApplied(Exception):
+    pass
+
+
+def list_jobs(conn: sqlite3.Connection, company: Optional[str] = None, location_match: Optional[str] = None,
+              status: Optional[str] = None, after: Optional[Sequence] = None, limit: int = 50,
+              include_archived: bool = False, skills: Optional[Sequence[str]] = None,
+              match_all_skills: bool = True) -> List[sqlite3.Row]:
+    """Jobs newest first, starting after the (posted_at, id) key of the previous page
+
+    skills keeps jobs indexed under every one of them, or under any one with
+    match_all_skills=False. Archived jobs are only included when asked for.
+    They are not in the full-text or skill index, so location and skill
+    filters only match hot jobs.
+    """
+    query = f"SELECT * FROM {'all_job_listing' if include_archived else 'job_listing'} WHERE 1=1"
+    params: list = []
+
+    if company:
+        query += f" AND company_id = {COMPANY_ID}"
+        params.append(company)
+
+    if location_match:
+        # Served by the full-text index instead of a LIKE scan over every row
+        query += " AND id IN (SELECT rowid FROM jobs_fts WHERE jobs_fts MATCH ?)"
+        params.append(location_match)
+
+    if status:
+        query += f" AND status_code = {STATUS_CODE}"
+        params.append(status)
+
+    if skills:
+        if match_all_skills:
+            # Intersect the per-skill id ranges in SQL rather than filtering rows in Python
+            query += f" AND id IN ({' INTERSECT '.join([SKILL_JOB_IDS] * len(skills))})"
+        else:
+            query += (" AND id IN (SELECT job_id FROM job_skills WHERE skill_id IN "
+                      f"(SELECT id FROM skills WHERE name IN ({','.join('?' * len(skills))})))")
+        params.extend(skills)
+
+    if after:
+        # Keyset pagination: seek past the last row of the previous page
+        query += " AND (posted_at, id) < (?, ?)"
+        params.extend(after)
+
+    query += " ORDER BY posted_at DESC, id DESC LIMIT ?"
+    params.append(limit)
+    return conn.execute(query, params).fetchall()
+
+
+def search_jobs(conn: sqlite3.Connection, expression: str, company: Optional[str] = None,
+                status: Optional[str] = None, limit: int = 20) -> List[sqlite3.Row]:
+    query = SEARCH_JOBS
+    params: list = [expression]
+    if company:
+        query += f" AND j.company_id = {COMPANY_ID}"
+        params.append(company)
+    if status:
+        query += f" AND j.status_code = {STATUS_CODE}"
+        params.append(status)
+    query += " ORDER BY rank LIMIT ?"
+    params.append(limit)
+    return conn.execute(query, params).fetchall()
+
+
+def get_job(conn: sqlite3.Connection, job_id: int, include_archived: bool = False) -> Optional[sqlite3.Row]:
+    return conn.execute(SELECT_ANY_JOB if include_archived else SELECT_JOB, (job_id,)).fetchone()
+
+
+def company_counts(conn: sqlite3.Connection) -> List[sqlite3.Row]:
+    return conn.execute(SELECT_COMPANY_COUNTS).fetchall()
+
+
+def apply_to_job(conn: sqlite3.Connection, job_id: int, applied_date: str, notes: Optional[str] = None):
+    """Record an application and mark the job applied in one transaction"""
+    if not conn.execute(SELECT_JOB_ID, (job_id,)).fetchone():
+        raise JobNotFound(job_id)
+
+    if conn.execute(SELECT_APPLICATION_FOR_JOB, (job_id,)).fetchone():
+        raise AlreadyApplied(job_id)
+
+    try:
+        with conn:
+            conn.execute(INSERT_APPLICATION, (job_id, applied_date, notes))
+            conn.execute(MARK_JOB_APPLIED, (job_id,))
+    except sqlite3.IntegrityError:
+        # Another request applied between the check and the insert
+        raise AlreadyApplied(job_id)
+
+
+def list_applications(conn: sqlite3.Connection, after: Optional[Sequence] = None,
+                      limit: int = 50, include_archived: bool = False) -> List[sqlite3.Row]:
+    """Applications most recent first, starting after the (applied_date, id) key of the previous page"""
+    query = SELECT_ALL_APPLICATIONS if include_archived else SELECT_APPLICATIONS
+    params: list = []
+    if after:
+        query += " WHERE (a.applied_date, a.id) < (?, ?)"
+        params.extend(after)
+    query += " ORDER BY a.applied_date DESC, a.id DESC LIMIT ?"
+    params.append(limit)
+    return conn.execute(query, params).fetchall()
+
+
+def pending_applications(conn: sqlite3.Connection, limit: Optional[int] = None) -> List[sqlite3.Row]:
+    """Active jobs with no application yet, newest first, as (id, title, url, company) rows"""
+    return conn.execute(SELECT_PENDING_APPLICATIONS, (-1 if limit is None else limit,)).fetchall()
+
+
+def pending_count(conn: sqlite3.Connection) -> int:
+    row = conn.execute(SELECT_PENDING_COUNT).fetchone()
+    return row[0] if row else 0
+
+
+def update_application_status(conn: sqlite3.Connection, job_id: int, status: str, notes: str = ""):
+    with conn:
+        conn.execute(UPDATE_APPLICATION_STATUS, (status, notes, job_id))
+
+
+def jobs_by_id(conn: sqlite3.Connection, job_ids: Sequence[int]) -> List[sqlite3.Row]:
+    """job_listing rows for the given ids, in no particular order"""
+    if not job_ids:
+        return []
+    return conn.execute(f"SELECT * FROM job_listing WHERE id IN ({','.join('?' * len(job_ids))})",
+                        list(job_ids)).fetchall()
+
+
+def save_resume(conn: sqlite3.Connection, filename: str, skills: List[str],
+                experience_years: Optional[str] = None, text: Optional[str] = None) -> int:
+    with conn:
+        return conn.execute(INSERT_RESUME, (filename, json.dumps(skills),
+                                            int(experience_years) if experience_years else None,
+                                            text, int(time.time()))).fetchone()[0]
+
+
+def get_resume(conn: sqlite3.Connection, resume_id: int) -> Optional[dict]:
+    row = conn.execute(SELECT_RESUME, (resume_id,)).fetchone()
+    if row is None:
+        return None
+    return {**dict(row), "skills": json.loads(row["skills"])}
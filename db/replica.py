@@ -0,0 +1,145 @@
+"""Read-only snapshot of the primary database for the API's read endpoints
+
+Writers (scrapers, automation, POST endpoints) keep committing to the primary
+file. A background thread watches the primary's PRAGMA data_version and, when
+something has changed, copies it with the online backup API into a snapshot
+file that only readers open. Reads then never wait on a writer's lock or its
+checkpoints, at the cost of seeing data up to max_staleness seconds old.
+
+Two snapshot files are used alternately: the next copy is written into the
+file nobody is reading, and the read pool is swapped over once it is complete.
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, List, Optional, TypeVar
+
+from db.connection import POOL_SIZE, ConnectionPool, connect
+
+T = TypeVar("T")
+
+READ_REPLICA_ENABLED = os.getenv("DB_READ_REPLICA", "false").lower() in ("1", "true", "yes")
+# Upper bound on how far behind the primary the snapshot may be once it changes
+MAX_STALENESS_SECONDS = float(os.getenv("DB_REPLICA_MAX_STALENESS", "5"))
+POLL_SECONDS = float(os.getenv("DB_REPLICA_POLL", "0.5"))
+
+
+class SnapshotReplica:
+    """Keep a read-only copy of a database no more than max_staleness seconds out of date
+
+    Usage:
+        replica = SnapshotReplica("jobs.db").start()
+        rows = await replica.run(queries.list_jobs)
+        replica.stop()
+    """
+
+    def __init__(self, primary_path: str, snapshot_dir: Optional[str] = None,
+                 max_staleness: float = MAX_STALENESS_SECONDS, poll_interval: float = POLL_SECONDS,
+                 pool_size: int = POOL_SIZE):
+        self.primary_path = os.path.abspath(primary_path)
+        directory = snapshot_dir or os.path.dirname(self.primary_path)
+        stem = os.path.splitext(os.path.basename(self.primary_path))[0]
+        # Per process, so several uvicorn workers never write each other's snapshot
+        self.paths = [os.path.join(directory, f"{stem}.replica-{os.getpid()}-{n}.db") for n in (0, 1)]
+        self.max_staleness = max_staleness
+        self.poll_interval = min(poll_interval, max_staleness)
+        self.pool_size = pool_size
+        self.pool: Optional[ConnectionPool] = None
+        self.refreshed_at = 0.0
+        self.refreshes = 0
+        self._pools: List[Optional[ConnectionPool]] = [None, None]
+        self._active = 1
+        self._monitor: Optional[sqlite3.Connection] = None
+        self._seen_version: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _require_started(self) -> ConnectionPool:
+        """The current snapshot's pool; RuntimeError before start()"""
+        if self.pool is None:
+            raise RuntimeError("SnapshotReplica.start() has not been called")
+        return self.pool
+
+    def _data_version(self) -> int:
+        if self._monitor is None:
+            raise RuntimeError("SnapshotReplica.start() has not been called")
+        # Changes whenever another connection commits to the primary
+        return self._monitor.execute("PRAGMA data_version").fetchone()[0]
+
+    def refresh(self):
+        """Copy the primary into the idle snapshot file and point reads at it"""
+        target = 1 - self._active
+        # Readers left the idle file a whole refresh ago; retire its pool before overwriting it
+        retired = self._pools[target]
+        if retired is not None:
+            retired.close()
+            self._pools[target] = None
+
+        version = self._data_version()
+        source = connect(self.primary_path)
+        snapshot = sqlite3.connect(self.paths[target])
+        try:
+            # One step keeps a single read transaction on the primary; in WAL mode
+            # it does not block writers, and a stepped copy would restart on every commit
+            source.backup(snapshot)
+            # Readers of a file that never changes need no WAL or shared memory
+            snapshot.execute("PRAGMA journal_mode=DELETE")
+        finally:
+            snapshot.close()
+            source.close()
+
+        pool = ConnectionPool(self.paths[target], self.pool_size, read_only=True)
+        self._pools[target] = pool
+        self._active = target
+        self.pool = pool
+        self._seen_version = version
+        self.refreshed_at = time.monotonic()
+        self.refreshes += 1
+
+    def _loop(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                if self._data_version() == self._seen_version:
+                    continue
+                # Batch bursts of commits (a crawl) into one copy per staleness window
+                if time.monotonic() - self.refreshed_at >= self.max_staleness - self.poll_interval:
+                    self.refresh()
+            except Exception as e:
+                print(f"Replica refresh error: {str(e)}")
+
+    def start(self) -> "SnapshotReplica":
+        self._monitor = sqlite3.connect(self.primary_path, check_same_thread=False)
+        self.refresh()
+        self._thread = threading.Thread(target=self._loop, name="replica-refresh", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        for pool in self._pools:
+            if pool is not None:
+                pool.close()
+        if self._monitor is not None:
+            self._monitor.close()
+        for path in self.paths:
+            for suffix in ("", "-journal"):
+                try:
+                    os.remove(path + suffix)
+                except OSError:
+                    pass
+
+    @property
+    def staleness(self) -> float:
+        """Seconds since the snapshot was taken"""
+        return time.monotonic() - self.refreshed_at
+
+    def connection(self):
+        """Same as ConnectionPool.connection(), against the current snapshot"""
+        return self._require_started().connection()
+
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """Same as ConnectionPool.run(), against the current snapshot"""
+        return await self._require_started().run(fn, *args, **kwargs)
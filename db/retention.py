@@ -0,0 +1,180 @@
+"""Move finished, old jobs and their applications out of the hot tables
+
+Usage:
+    python -m db.retention [path/to/jobs.db] [--days 90] [--batch-size 500] [--dry-run]
+                           [--enable-incremental-vacuum]
+
+A job is archived once it is no longer active (closed by a scrape, or applied
+to), has not been rewritten by a scrape for RETENTION_DAYS, and its
+application, if any, is neither still pending nor recent. The job and its
+application are copied to jobs_archive / applications_archive and deleted from
+the hot tables in one transaction per batch, so the hot indexes only cover the
+working set. Freed pages are then handed back with an incremental vacuum.
+The events table is trimmed to its last EVENT_HISTORY rows in the same pass,
+and job_changes to its last JOB_CHANGE_HISTORY.
+Databases created before auto_vacuum=INCREMENTAL was the default need a
+one-off full VACUUM to switch over; that rewrites the whole file, so it only
+happens when asked for with --enable-incremental-vacuum.
+"""
+import argparse
+import os
+import sqlite3
+import time
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+import events
+import matching
+from db.init_db import create_tables
+from db.migrations import STATUS_ACTIVE
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "jobs.db")
+
+RETENTION_DAYS = int(os.getenv("RETENTION_DAYS", "90"))
+BATCH_SIZE = 500
+# Pages returned to the filesystem per retention run; 0 frees everything
+VACUUM_PAGES = int(os.getenv("RETENTION_VACUUM_PAGES", "0"))
+
+# Applications still being worked on keep their job in the hot table
+UNFINISHED_APPLICATION_STATUSES = ("pending",)
+
+SELECT_ARCHIVE_BATCH = f"""
+    SELECT j.id FROM jobs j
+    WHERE j.status > {STATUS_ACTIVE} AND j.checked_at < ?
+      AND NOT EXISTS (
+          SELECT 1 FROM applications a
+          WHERE a.job_id = j.id
+            AND (a.status IN ({",".join("?" * len(UNFINISHED_APPLICATION_STATUSES))}) OR a.applied_date >= ?)
+      )
+    LIMIT ?
+"""
+JOB_COLUMNS = "id, title, company_id, location_id, url, status, posted_at, checked_at, content_hash"
+APPLICATION_COLUMNS = "id, job_id, applied_date, status, notes"
+
+
+def _placeholders(ids: List[int]) -> str:
+    return ",".join("?" * len(ids))
+
+
+def archive_batch(conn: sqlite3.Connection, cutoff: int, batch_size: int = BATCH_SIZE,
+                  dry_run: bool = False) -> Tuple[int, int]:
+    """Archive up to batch_size jobs last written before `cutoff` (epoch seconds)
+
+    Returns (jobs, applications) moved. The candidates are chosen under the
+    write lock, so a job a scraper reactivates meanwhile is never archived.
+    """
+    cutoff_date = datetime.fromtimestamp(cutoff, timezone.utc).strftime("%Y-%m-%d")
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        ids = [row[0] for row in conn.execute(
+            SELECT_ARCHIVE_BATCH, (cutoff, *UNFINISHED_APPLICATION_STATUSES, cutoff_date, batch_size))]
+        if not ids:
+            conn.rollback()
+            return 0, 0
+
+        marks = _placeholders(ids)
+        applications = conn.execute(
+            f"SELECT COUNT(*) FROM applications WHERE job_id IN ({marks})", ids).fetchone()[0]
+        if dry_run:
+            conn.rollback()
+            return len(ids), applications
+
+        archived_at = int(time.time())
+        conn.execute(f"""
+            INSERT INTO jobs_archive ({JOB_COLUMNS}, archived_at)
+            SELECT {JOB_COLUMNS}, ? FROM jobs WHERE id IN ({marks})
+        """, (archived_at, *ids))
+        conn.execute(f"""
+            INSERT INTO applications_archive ({APPLICATION_COLUMNS}, archived_at)
+            SELECT {APPLICATION_COLUMNS}, ? FROM applications WHERE job_id IN ({marks})
+        """, (archived_at, *ids))
+        conn.execute(f"DELETE FROM applications WHERE job_id IN ({marks})", ids)
+        conn.execute(f"DELETE FROM jobs WHERE id IN ({marks})", ids)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return len(ids), applications
+
+
+def enable_incremental_vacuum(conn: sqlite3.Connection) -> bool:
+    """Switch an existing database to auto_vacuum=INCREMENTAL; True if a VACUUM was needed
+
+    The one-off VACUUM rewrites the whole file and blocks every writer while
+    it does, so run it by hand during a quiet period.
+    """
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+        return False
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("VACUUM")
+    return True
+
+
+def incremental_vacuum(conn: sqlite3.Connection, pages: int = VACUUM_PAGES) -> int:
+    """Return free pages to the filesystem; returns how many were freed
+
+    Does nothing unless the database uses auto_vacuum=INCREMENTAL; otherwise
+    free pages are reused by later writes instead.
+    """
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        return 0
+    free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    if free:
+        # incremental_vacuum without an argument frees every page; "()" is a syntax error
+        conn.execute(f"PRAGMA incremental_vacuum({pages})" if pages else "PRAGMA incremental_vacuum").fetchall()
+    return free
+
+
+def run_retention(conn: sqlite3.Connection, days: int = RETENTION_DAYS, batch_size: int = BATCH_SIZE,
+                  dry_run: bool = False, now: Optional[float] = None,
+                  enable_vacuum: bool = False) -> dict:
+    """Archive everything past retention in batches, prune old events, then vacuum the freed pages
+
+    enable_vacuum first converts the database to incremental vacuum if needed,
+    which is a full VACUUM; the API never asks for it.
+    """
+    cutoff = int((now if now is not None else time.time()) - days * 86400)
+    jobs = applications = 0
+    while True:
+        moved_jobs, moved_applications = archive_batch(conn, cutoff, batch_size, dry_run)
+        jobs += moved_jobs
+        applications += moved_applications
+        # A dry run would keep seeing the same batch
+        if moved_jobs < batch_size or dry_run:
+            break
+
+    freed = pruned = 0
+    if not dry_run:
+        pruned = events.prune_events(conn)
+        matching.prune_job_changes(conn)
+        if enable_vacuum:
+            enable_incremental_vacuum(conn)
+        freed = incremental_vacuum(conn)
+    return {"jobs": jobs, "applications": applications, "events": pruned, "freed_pages": freed}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archive closed and stale jobs out of the hot tables")
+    parser.add_argument("db_path", nargs="?", default=os.getenv("DB_PATH", DEFAULT_DB_PATH))
+    parser.add_argument("--days", type=int, default=RETENTION_DAYS,
+                        help=f"Archive finished jobs untouched for this many days (default {RETENTION_DAYS})")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Jobs moved per transaction")
+    parser.add_argument("--dry-run", action="store_true", help="Count the first batch without moving anything")
+    parser.add_argument("--enable-incremental-vacuum", action="store_true",
+                        help="Convert an older database to incremental vacuum first (a one-off full VACUUM)")
+    args = parser.parse_args(argv)
+
+    create_tables(args.db_path)
+    conn = sqlite3.connect(args.db_path, timeout=30)
+    try:
+        result = run_retention(conn, args.days, args.batch_size, args.dry_run,
+                               enable_vacuum=args.enable_incremental_vacuum)
+    finally:
+        conn.close()
+    verb = "Would archive" if args.dry_run else "Archived"
+    print(f"{verb} {result['jobs']} jobs and {result['applications']} applications; "
+          f"pruned {result['events']} events; freed {result['freed_pages']} pages")
+
+
+if __name__ == "__main__":
+    main()
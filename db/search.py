@@ -0,0 +1,36 @@
+import re
+from typing import Optional
+
+# Column weights for bm25(): a hit in the title matters most
+TITLE_WEIGHT = 10.0
+COMPANY_WEIGHT = 2.0
+LOCATION_WEIGHT = 1.0
+
+HIGHLIGHT_START = "**"
+HIGHLIGHT_END = "**"
+
+# rank is bm25() with the column weights above; smaller is a better match
+SEARCH_JOBS = f"""
+    SELECT j.*,
+           bm25(jobs_fts, {TITLE_WEIGHT}, {COMPANY_WEIGHT}, {LOCATION_WEIGHT}) AS rank,
+           highlight(jobs_fts, 0, '{HIGHLIGHT_START}', '{HIGHLIGHT_END}') AS title_highlight,
+           snippet(jobs_fts, -1, '{HIGHLIGHT_START}', '{HIGHLIGHT_END}', '...', 12) AS snippet
+    FROM jobs_fts
+    JOIN job_listing j ON j.id = jobs_fts.rowid
+    WHERE jobs_fts MATCH ?
+"""
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def match_expression(text: str, column: Optional[str] = None) -> Optional[str]:
+    """Turn free text into an FTS5 query where every word must match as a prefix
+
+    Words are quoted, so user input can never be read as FTS5 syntax
+    ("c++", "AND", unbalanced quotes). Returns None if there are no words.
+    """
+    tokens = _TOKEN_RE.findall(text or "")
+    if not tokens:
+        return None
+    expression = " ".join(f'"{token}"*' for token in tokens)
+    return f"{column} : ({expression})" if column else expression
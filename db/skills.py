@@ -0,0 +1,44 @@
+"""Writes to the lookup tables and the job_skills inverted index
+
+Shared by the scrapers, bulk imports and the migrations. Skills are extracted
+from titles by the caller (scrapers.classifier.extract_skills); this module
+only stores what was found.
+"""
+import sqlite3
+from typing import Dict, Iterable, Mapping, Sequence
+
+# Stay well under SQLite's bound-parameter limit
+CHUNK_SIZE = 500
+
+
+def lookup_ids(conn: sqlite3.Connection, table: str, names: Iterable[str]) -> Dict[str, int]:
+    """Ids of names in a companies/locations/skills lookup table, adding the missing ones"""
+    names = list(set(names))
+    conn.executemany(f"INSERT OR IGNORE INTO {table} (name) VALUES (?)", [(name,) for name in names])
+    ids = {}
+    for start in range(0, len(names), CHUNK_SIZE):
+        chunk = names[start:start + CHUNK_SIZE]
+        placeholders = ",".join("?" * len(chunk))
+        ids.update(conn.execute(f"SELECT name, id FROM {table} WHERE name IN ({placeholders})", chunk))
+    return ids
+
+
+def job_ids(conn: sqlite3.Connection, urls: Sequence[str]) -> Dict[str, int]:
+    """Ids of the jobs stored at the given URLs"""
+    ids = {}
+    for start in range(0, len(urls), CHUNK_SIZE):
+        chunk = urls[start:start + CHUNK_SIZE]
+        placeholders = ",".join("?" * len(chunk))
+        ids.update(conn.execute(f"SELECT url, id FROM jobs WHERE url IN ({placeholders})", chunk))
+    return ids
+
+
+def index_skills(conn: sqlite3.Connection, skills: Mapping[int, Sequence[str]]):
+    """Replace the job_skills rows of each job_id with the given skill names"""
+    if not skills:
+        return
+    skill_ids = lookup_ids(conn, "skills", (name for names in skills.values() for name in names))
+    conn.executemany("DELETE FROM job_skills WHERE job_id = ?", [(job_id,) for job_id in skills])
+    conn.executemany("INSERT OR IGNORE INTO job_skills (skill_id, job_id) VALUES (?, ?)", [
+        (skill_ids[name], job_id) for job_id, names in skills.items() for name in names
+    ])
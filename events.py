@@ -0,0 +1,124 @@
+"""Progress events from the scrapers and automation, fanned out to /events subscribers
+
+Publishers in any process (scrapers, automation.worker, the API) append rows
+to the `events` table, inside the same transaction as the write they describe
+where there is one. The API tails that table with one cheap primary-key range
+query and hands new rows to an in-process EventBus, which every open /events
+stream subscribes to. Clients therefore get sub-second updates without each
+of them polling the database, and while no stream is open nothing polls it.
+Old rows are pruned by db.retention.
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Set
+
+# Seconds between checks of the events table for rows from other processes
+EVENT_POLL_SECONDS = float(os.getenv("EVENT_POLL_SECONDS", "0.25"))
+# Most recent events kept for clients that reconnect with Last-Event-ID
+EVENT_HISTORY = int(os.getenv("EVENT_HISTORY", "10000"))
+# Events a slow subscriber may fall behind by before the oldest are dropped
+SUBSCRIBER_QUEUE_SIZE = 1000
+RELAY_BATCH_SIZE = 500
+
+INSERT_EVENT = "INSERT INTO events (type, payload, created_at) VALUES (?, ?, ?)"
+SELECT_EVENTS_AFTER = "SELECT id, type, payload, created_at FROM events WHERE id > ? ORDER BY id LIMIT ?"
+SELECT_LATEST_EVENT_ID = "SELECT COALESCE(MAX(id), 0) FROM events"
+PRUNE_EVENTS = "DELETE FROM events WHERE id <= (SELECT MAX(id) FROM events) - ?"
+
+
+class Event(NamedTuple):
+    id: int
+    type: str
+    payload: Dict[str, Any]
+    created_at: int
+
+    def to_sse(self) -> str:
+        """The event as a server-sent events message"""
+        data = json.dumps({"type": self.type, "created_at": self.created_at, **self.payload})
+        return f"id: {self.id}\nevent: {self.type}\ndata: {data}\n\n"
+
+
+def publish(conn: sqlite3.Connection, type: str, payload: Optional[Dict[str, Any]] = None):
+    """Append an event; it commits with the caller's transaction, or on its own outside one"""
+    row = (type, json.dumps(payload or {}), int(time.time()))
+    if conn.in_transaction:
+        conn.execute(INSERT_EVENT, row)
+    else:
+        with conn:
+            conn.execute(INSERT_EVENT, row)
+
+
+def emit(db_path: str, type: str, payload: Optional[Dict[str, Any]] = None):
+    """publish() from code that holds no connection to the database"""
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        publish(conn, type, payload)
+    finally:
+        conn.close()
+
+
+def publish_many(conn: sqlite3.Connection, type: str, payloads: List[Dict[str, Any]]):
+    """publish() for a batch of events of one type, e.g. every job a scrape inserted"""
+    now = int(time.time())
+    conn.executemany(INSERT_EVENT, [(type, json.dumps(payload), now) for payload in payloads])
+
+
+def events_after(conn: sqlite3.Connection, last_id: int, limit: int = RELAY_BATCH_SIZE) -> List[Event]:
+    return [Event(id, type, json.loads(payload), created_at)
+            for id, type, payload, created_at in conn.execute(SELECT_EVENTS_AFTER, (last_id, limit))]
+
+
+def latest_event_id(conn: sqlite3.Connection) -> int:
+    return conn.execute(SELECT_LATEST_EVENT_ID).fetchone()[0]
+
+
+def prune_events(conn: sqlite3.Connection, keep: int = EVENT_HISTORY) -> int:
+    with conn:
+        return conn.execute(PRUNE_EVENTS, (keep,)).rowcount
+
+
+class EventBus:
+    """In-process pub/sub: each subscriber gets its own bounded asyncio queue
+
+    Only used from the event loop. A subscriber that stops reading loses its
+    oldest events rather than holding up everyone else.
+    """
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        # The newest event relayed so far; the relay reads on from here
+        self.last_id = 0
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._active = asyncio.Event()
+
+    def subscribe(self, after: int) -> asyncio.Queue:
+        """A queue of the events with ids above `after`"""
+        if not self._subscribers:
+            # The relay stopped reading while nobody was listening; resume where this subscriber starts
+            self.last_id = after
+        queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        self._subscribers.add(queue)
+        self._active.set()
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+        if not self._subscribers:
+            self._active.clear()
+
+    async def wait_for_subscribers(self):
+        await self._active.wait()
+
+    def publish(self, event: Event):
+        self.last_id = max(self.last_id, event.id)
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
@@ -18,6 +18,42 @@ st.set_page_config(
     layout="wide"
 )
 
+# Responses remembered per session for ETag revalidation
+MAX_CACHED_RESPONSES = 50
+
+def api_get(path, params=None):
+    """GET from the API, reusing the last response for the same URL when it answers 304 Not Modified"""
+    cache = st.session_state.setdefault("api_responses", {})
+    key = (path, repr(sorted((params or {}).items())))
+    cached = cache.get(key)
+    headers = {"If-None-Match": cached.headers["ETag"]} if cached is not None else None
+    response = requests.get(f"{API_BASE}{path}", params=params, headers=headers)
+    if response.status_code == 304 and cached is not None:
+        return cached
+    if response.status_code == 200 and "ETag" in response.headers:
+        cache.pop(key, None)
+        cache[key] = response
+        while len(cache) > MAX_CACHED_RESPONSES:
+            cache.pop(next(iter(cache)))
+    return response
+
+def current_cursor(key):
+    """Cursor for the page of a paginated list that is being shown"""
+    return st.session_state.get(f"{key}_cursors", [None])[-1]
+
+def page_controls(key, next_cursor):
+    """Previous/next buttons that walk a stack of API cursors kept in session state"""
+    cursors = st.session_state.setdefault(f"{key}_cursors", [None])
+    col1, col2 = st.columns(2)
+    with col1:
+        if len(cursors) > 1 and st.button("← Previous page", key=f"{key}_prev"):
+            cursors.pop()
+            st.rerun()
+    with col2:
+        if next_cursor and st.button("Next page →", key=f"{key}_next"):
+            cursors.append(next_cursor)
+            st.rerun()
+
 st.title("💻 Tech Job Automation Dashboard")
 
 # Sidebar for navigation
@@ -27,11 +63,32 @@ if page == "Jobs":
     st.header("💻 Tech Job Listings")
     st.info("🔍 Showing only tech jobs (Software Engineer, Developer, Data Scientist, etc.)")
     
-    # Fetch jobs from API
+    search_query = st.text_input("Search jobs", placeholder="e.g. backend engineer seattle")
+    skill_col, mode_col = st.columns([3, 1])
+    with skill_col:
+        skills = [s.strip() for s in st.text_input("Skills", placeholder="e.g. python, aws").split(",") if s.strip()]
+    with mode_col:
+        skills_mode = st.radio("Match", ["all", "any"], horizontal=True)
+    # Each filter combination keeps its own page history
+    jobs_key = f"jobs:{','.join(skills)}:{skills_mode}"
+    
+    # Fetch jobs from API; searches are ranked by the server's full-text index
     try:
-        response = requests.get(f"{API_BASE}/jobs")
+        next_cursor = None
+        if search_query.strip():
+            response = api_get("/jobs/search", params={"q": search_query, "limit": 50})
+        else:
+            cursor = current_cursor(jobs_key)
+            params = {"skills": skills, "skills_mode": skills_mode} if skills else {}
+            if cursor:
+                params["cursor"] = cursor
+            response = api_get("/jobs", params=params)
         if response.status_code == 200:
-            jobs = response.json()
+            if search_query.strip():
+                jobs = response.json()
+            else:
+                jobs = response.json()["items"]
+                next_cursor = response.json()["next_cursor"]
             
             if jobs:
                 # Create DataFrame for better display
@@ -62,7 +119,7 @@ if page == "Jobs":
 
                 # Display jobs
                 for job in filtered_jobs:
-                    with st.expander(f"{job['title']} - {job['company']}"):
+                    with st.expander(f"{job.get('title_highlight') or job['title']} - {job['company']}"):
                         col1, col2 = st.columns([3, 1])
                         with col1:
                             st.write(f"**Location:** {job['location']}")
@@ -80,8 +137,13 @@ if page == "Jobs":
                                         st.error(f"Error: {apply_response.json().get('detail', 'Unknown error')}")
                                 except Exception as e:
                                     st.error(f"Error applying: {str(e)}")
+            elif search_query.strip():
+                st.info("No jobs match your search.")
             else:
                 st.info("No tech jobs found. Run the scrapers to collect tech job data.")
+            
+            if not search_query.strip():
+                page_controls(jobs_key, next_cursor)
         else:
             st.error(f"Error fetching jobs: {response.status_code}")
     except Exception as e:
@@ -91,15 +153,22 @@ elif page == "Applications":
     st.header("📝 Applications")
     
     try:
-        response = requests.get(f"{API_BASE}/applications")
+        include_archived = st.checkbox("Include archived applications")
+        cursor = current_cursor("applications")
+        params = {"include_archived": include_archived}
+        if cursor:
+            params["cursor"] = cursor
+        response = api_get("/applications", params=params)
         if response.status_code == 200:
-            applications = response.json()
+            applications = response.json()["items"]
             
             if applications:
                 df = pd.DataFrame(applications)
                 st.dataframe(df, use_container_width=True)
             else:
                 st.info("No applications found.")
+            
+            page_controls("applications", response.json()["next_cursor"])
         else:
             st.error(f"Error fetching applications: {response.status_code}")
     except Exception as e:
@@ -156,6 +225,14 @@ elif page == "Resume Upload":
                         st.subheader("Contact Information")
                         for key, value in parsed_data['contact'].items():
                             st.write(f"**{key.title()}:** {value}")
+                    
+                    # Rank active jobs against the stored resume
+                    match_response = requests.post(f"{API_BASE}/match", json={"resume_id": result['resume_id'], "limit": 10})
+                    if match_response.status_code == 200 and match_response.json():
+                        st.subheader("Best Matching Jobs")
+                        for match in match_response.json():
+                            skills = f" ({', '.join(match['matched_skills'])})" if match['matched_skills'] else ""
+                            st.write(f"• [{match['title']}]({match['url']}) - {match['company']} · {match['score']:.2f}{skills}")
                 
                 else:
                     st.error(f"Error parsing resume: {response.json().get('detail', 'Unknown error')}")
@@ -167,7 +244,7 @@ elif page == "Companies":
     st.header("🏢 Companies")
     
     try:
-        response = requests.get(f"{API_BASE}/companies")
+        response = api_get("/companies")
         if response.status_code == 200:
             companies = response.json()
             
@@ -190,7 +267,7 @@ elif page == "Automation":
     
     # Get automation status
     try:
-        status_response = requests.get(f"{API_BASE}/automation/status")
+        status_response = api_get("/automation/status")
         if status_response.status_code == 200:
             status_data = status_response.json()
             
@@ -204,15 +281,33 @@ elif page == "Automation":
                     with st.spinner("Running automation..."):
                         try:
                             run_response = requests.post(f"{API_BASE}/automation/run", params={"max_applications": 3})
-                            if run_response.status_code == 200:
+                            if run_response.status_code in (200, 202):
                                 result = run_response.json()
                                 st.success(result['message'])
-                                st.rerun()
+                                if result.get('run_id'):
+                                    st.session_state["automation_run_id"] = result['run_id']
                             else:
                                 st.error(f"Error: {run_response.json().get('detail', 'Unknown error')}")
                         except Exception as e:
                             st.error(f"Error running automation: {str(e)}")
             
+            # Progress of the last run queued from this session, executed by automation.worker
+            run_id = st.session_state.get("automation_run_id")
+            if run_id:
+                run_response = requests.get(f"{API_BASE}/automation/runs/{run_id}")
+                if run_response.status_code == 200:
+                    run = run_response.json()
+                    st.subheader(f"Run {run_id}: {run['status']}")
+                    if run['total']:
+                        st.progress(run['completed'] / run['total'],
+                                    text=f"{run['completed']}/{run['total']} jobs, {run['succeeded']} successful")
+                    if run['items']:
+                        st.dataframe(pd.DataFrame(run['items'])[["title", "company", "status", "notes", "duration_seconds"]],
+                                     use_container_width=True)
+                    if run['error']:
+                        st.error(run['error'])
+                    st.button("Refresh progress")
+            
             # Show pending jobs
             if status_data['jobs']:
                 st.subheader("Pending Applications")
@@ -0,0 +1,235 @@
+"""Rank active jobs against a resume by cosine similarity of skill and title terms
+
+Every active job is a sparse row of skill features (from the same extractor as
+the job_skills index) and title word features. Job rows and the resume are
+both idf-weighted before they are normalized, so the score is a true cosine
+in tf-idf space. The rows are kept in memory as CSR arrays, so scoring a
+resume against all jobs is one sparse matrix-vector product plus a partial
+sort.
+
+Nothing is reread while the trigger-kept jobs_version counter stays put. When
+it moves, only the jobs logged in job_changes since the last refresh are
+re-vectorized: their old rows are blanked in place and the new ones appended,
+and the arrays are compacted once blanked rows pile up.
+"""
+import math
+import re
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from db.migrations import STATUS_ACTIVE
+from scrapers.classifier import extract_skills, normalize_skill
+
+SELECT_ACTIVE_JOBS = f"SELECT id, title FROM jobs WHERE status = {STATUS_ACTIVE}"
+SELECT_JOBS_VERSION = "SELECT value FROM job_counters WHERE name = 'jobs_version'"
+SELECT_LAST_CHANGE = "SELECT COALESCE(MAX(seq), 0) FROM job_changes"
+SELECT_FIRST_CHANGE = "SELECT MIN(seq) FROM job_changes"
+SELECT_CHANGED_JOBS = f"""
+    SELECT c.job_id, j.title, j.status = {STATUS_ACTIVE}
+    FROM (SELECT DISTINCT job_id FROM job_changes WHERE seq > ? AND seq <= ?) c
+    LEFT JOIN jobs j ON j.id = c.job_id
+"""
+PRUNE_JOB_CHANGES = "DELETE FROM job_changes WHERE seq <= (SELECT MAX(seq) FROM job_changes) - ?"
+
+# Changes kept for matchers that fall behind; one further back rescans every job
+JOB_CHANGE_HISTORY = 100_000
+# Compact the arrays once this share of their rows belongs to removed or retitled jobs
+MAX_DEAD_FRACTION = 0.25
+
+# A shared skill counts for twice as much as a shared title word
+SKILL_WEIGHT = 2.0
+TITLE_WEIGHT = 1.0
+DEFAULT_TOP_K = 20
+MAX_TOP_K = 100
+
+TITLE_STOPWORDS = frozenset((
+    "a", "an", "and", "at", "for", "i", "ii", "iii", "in", "iv", "of", "on", "or", "the", "to", "with",
+))
+_WORDS = re.compile(r"[a-z][a-z0-9+#.]*").findall
+
+
+def title_terms(text: str) -> List[str]:
+    """Distinct lower-cased words of a title or resume, without stopwords"""
+    words = (word.rstrip(".") for word in _WORDS(text.lower())) if text else ()
+    return list(dict.fromkeys(word for word in words if word and word not in TITLE_STOPWORDS))
+
+
+def job_features(title: str) -> List[Tuple[str, float]]:
+    """(feature, weight) pairs for one job title"""
+    return ([("skill:" + skill, SKILL_WEIGHT) for skill in extract_skills(title)]
+            + [("title:" + term, TITLE_WEIGHT) for term in title_terms(title)])
+
+
+def prune_job_changes(conn: sqlite3.Connection, keep: int = JOB_CHANGE_HISTORY) -> int:
+    with conn:
+        return conn.execute(PRUNE_JOB_CHANGES, (keep,)).rowcount
+
+
+class JobMatcher:
+    """In-memory CSR matrix of active job vectors, refreshed when the jobs change
+
+    Usage:
+        matcher = JobMatcher()
+        matcher.refresh(conn)
+        matches = matcher.top_k(["python", "aws"], resume_text, k=20)
+    """
+
+    def __init__(self):
+        self.version: Optional[int] = None
+        # Newest job_changes row applied so far
+        self.last_change = 0
+        self.vocabulary: Dict[str, int] = {}
+        # Per job: (title, its row in the arrays)
+        self._rows: Dict[int, Tuple[str, int]] = {}
+        # CSR arrays of raw feature weights; rows of removed jobs have job id -1 and no weight
+        self.job_ids = np.zeros(0, dtype=np.int64)
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.indices = np.zeros(0, dtype=np.int64)
+        self.weights = np.zeros(0, dtype=np.float64)
+        self._row_of_entry = np.zeros(0, dtype=np.int64)
+        self._document_frequency = np.zeros(0, dtype=np.int64)
+        self.idf = np.zeros(0, dtype=np.float64)
+        # weights times idf, divided by each row's norm: what a query is scored against
+        self.data = np.zeros(0, dtype=np.float64)
+        self._lock = threading.Lock()
+
+    def _vectorize(self, title: str) -> Tuple[np.ndarray, np.ndarray]:
+        features = job_features(title)
+        columns = np.fromiter((self.vocabulary.setdefault(name, len(self.vocabulary)) for name, _ in features),
+                              dtype=np.int64, count=len(features))
+        weights = np.fromiter((weight for _, weight in features), dtype=np.float64, count=len(features))
+        return columns, weights
+
+    def refresh(self, conn: sqlite3.Connection) -> int:
+        """Bring the matrix up to date with conn; returns how many jobs were re-vectorized
+
+        Costs one counter lookup while no job has been added, removed or changed.
+        """
+        with self._lock:
+            version = conn.execute(SELECT_JOBS_VERSION).fetchone()[0]
+            if version == self.version:
+                return 0
+
+            last_change = conn.execute(SELECT_LAST_CHANGE).fetchone()[0]
+            first_change = conn.execute(SELECT_FIRST_CHANGE).fetchone()[0]
+            if self.version is None or (first_change is not None and first_change > self.last_change + 1):
+                # First load, or the changes since the last refresh were pruned
+                changes = [(job_id, title, True) for job_id, title in conn.execute(SELECT_ACTIVE_JOBS)]
+                gone = set(self._rows).difference(job_id for job_id, _, _ in changes)
+                changes += [(job_id, None, False) for job_id in gone]
+            else:
+                changes = conn.execute(SELECT_CHANGED_JOBS, (self.last_change, last_change)).fetchall()
+
+            changed = self._apply(changes)
+            self.version = version
+            self.last_change = last_change
+            return changed
+
+    def _apply(self, changes) -> int:
+        """Blank the old rows of changed jobs and append rows for their current titles"""
+        dead = []
+        added: List[Tuple[int, str, np.ndarray, np.ndarray]] = []
+        for job_id, title, active in changes:
+            current = self._rows.get(job_id)
+            if active and current is not None and current[0] == title:
+                continue
+            if current is not None:
+                dead.append(current[1])
+                del self._rows[job_id]
+            if active:
+                added.append((job_id, title, *self._vectorize(title)))
+
+        for row in dead:
+            start, end = self.indptr[row], self.indptr[row + 1]
+            self._document_frequency[self.indices[start:end]] -= 1
+            self.weights[start:end] = 0.0
+            self.job_ids[row] = -1
+        if added:
+            self._append(added)
+        if dead or added:
+            if np.count_nonzero(self.job_ids < 0) > MAX_DEAD_FRACTION * len(self.job_ids):
+                self._compact()
+            self._reweight()
+        return len(added)
+
+    def _append(self, added: List[Tuple[int, str, np.ndarray, np.ndarray]]):
+        first_row = len(self.job_ids)
+        lengths = np.fromiter((len(columns) for _, _, columns, _ in added), dtype=np.int64, count=len(added))
+        columns = np.concatenate([columns for _, _, columns, _ in added])
+        self.indptr = np.concatenate((self.indptr, self.indptr[-1] + np.cumsum(lengths)))
+        self.indices = np.concatenate((self.indices, columns))
+        self.weights = np.concatenate([self.weights] + [weights for _, _, _, weights in added])
+        self._row_of_entry = np.concatenate((self._row_of_entry,
+                                             np.repeat(np.arange(first_row, first_row + len(added)), lengths)))
+        self.job_ids = np.concatenate((self.job_ids, [job_id for job_id, _, _, _ in added]))
+        for offset, (job_id, title, _, _) in enumerate(added):
+            self._rows[job_id] = (title, first_row + offset)
+        self._document_frequency = np.concatenate((
+            self._document_frequency,
+            np.zeros(len(self.vocabulary) - len(self._document_frequency), dtype=np.int64)))
+        self._document_frequency += np.bincount(columns, minlength=len(self.vocabulary))
+
+    def _compact(self):
+        """Drop blanked rows and features no live job uses, renumbering both densely"""
+        live = self.job_ids >= 0
+        keep_entry = live[self._row_of_entry]
+        used = self._document_frequency > 0
+        renumber_columns = np.cumsum(used) - 1
+        renumber_rows = np.cumsum(live) - 1
+        lengths = np.diff(self.indptr)[live]
+
+        self.vocabulary = {name: int(renumber_columns[column])
+                           for name, column in self.vocabulary.items() if used[column]}
+        self._document_frequency = self._document_frequency[used]
+        self.indices = renumber_columns[self.indices[keep_entry]]
+        self.weights = self.weights[keep_entry]
+        self._row_of_entry = renumber_rows[self._row_of_entry[keep_entry]]
+        self.indptr = np.concatenate(([0], np.cumsum(lengths)))
+        self.job_ids = self.job_ids[live]
+        self._rows = {job_id: (title, int(renumber_rows[row])) for job_id, (title, row) in self._rows.items()}
+
+    def _reweight(self):
+        """Recompute idf over the live jobs and the normalized tf-idf entries"""
+        # Rare terms say more about a match than "engineer" does
+        live_jobs = len(self._rows)
+        self.idf = np.log((1 + live_jobs) / (1 + self._document_frequency)) + 1.0
+        weighted = self.weights * self.idf[self.indices]
+        norms = np.sqrt(np.bincount(self._row_of_entry, weights=weighted * weighted, minlength=len(self.job_ids)))
+        norms[norms == 0] = 1.0
+        self.data = weighted / norms[self._row_of_entry]
+
+    def query_vector(self, skills: Iterable[str], text: Optional[str] = None) -> np.ndarray:
+        """Resume vector over the job vocabulary, idf-weighted and normalized"""
+        vector = np.zeros(len(self.vocabulary), dtype=np.float64)
+        for skill in skills:
+            column = self.vocabulary.get("skill:" + normalize_skill(skill))
+            if column is not None:
+                vector[column] = SKILL_WEIGHT
+        for term in title_terms(text or ""):
+            column = self.vocabulary.get("title:" + term)
+            if column is not None:
+                vector[column] = max(vector[column], TITLE_WEIGHT)
+        vector[:len(self.idf)] *= self.idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def top_k(self, skills: Iterable[str], text: Optional[str] = None,
+              k: int = DEFAULT_TOP_K) -> List[Tuple[int, float]]:
+        """(job_id, score) of the k best matching jobs, best first; jobs sharing nothing are left out"""
+        with self._lock:
+            vector = self.query_vector(skills, text)
+            if not vector.any() or not len(self.job_ids):
+                return []
+            # Sparse matrix-vector product: every stored entry times its column's query weight,
+            # summed per row
+            scores = np.bincount(self._row_of_entry, weights=self.data * vector[self.indices],
+                                 minlength=len(self.job_ids))
+            k = min(k, int(np.count_nonzero(scores)))
+            if k <= 0:
+                return []
+            best = np.argpartition(-scores, k - 1)[:k]
+            best = best[np.argsort(-scores[best], kind="stable")]
+            return [(int(self.job_ids[row]), float(scores[row])) for row in best]
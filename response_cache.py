@@ -0,0 +1,74 @@
+"""Serialized API responses kept until the database they were read from changes"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Hashable, List, NamedTuple, Optional, Sequence, Tuple
+
+# Responses kept across all cached endpoints; 0 turns caching off
+RESPONSE_CACHE_ENTRIES = int(os.getenv("RESPONSE_CACHE_ENTRIES", "512"))
+
+
+class CachedResponse(NamedTuple):
+    version: Hashable
+    etag: str
+    body: bytes
+    media_type: str
+    # Raw (name, value) headers the handler set, replayed on hits and 304s
+    headers: List[Tuple[bytes, bytes]]
+
+
+def make_etag(body: bytes) -> str:
+    """Strong validator for a response body"""
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header covers etag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison, as RFC 9110 asks for If-None-Match
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+class ResponseCache:
+    """LRU of response bodies, each tagged with the database version it was read at
+
+    An entry is only served while the version it was stored with is still
+    current, so any commit to the database invalidates everything at once
+    without the write paths having to know about the cache.
+    """
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, version: Hashable) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.version != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Hashable, version: Hashable, body: bytes, media_type: str,
+            headers: Sequence[Tuple[bytes, bytes]] = ()) -> CachedResponse:
+        entry = CachedResponse(version, make_etag(body), body, media_type, list(headers))
+        if self.max_entries <= 0:
+            return entry
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
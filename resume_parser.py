@@ -8,19 +8,12 @@ except ImportError:
     Document = None
 import PyPDF2
 import io
+from scrapers.classifier import SKILL_KEYWORDS
 
 class ResumeParser:
     def __init__(self):
-        self.skills_keywords = [
-            'python', 'javascript', 'java', 'c++', 'c#', 'go', 'rust', 'php', 'ruby',
-            'react', 'angular', 'vue', 'node.js', 'django', 'flask', 'fastapi',
-            'sql', 'postgresql', 'mysql', 'mongodb', 'redis',
-            'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'terraform',
-            'git', 'github', 'gitlab', 'jenkins', 'ci/cd',
-            'machine learning', 'ai', 'data science', 'pandas', 'numpy', 'tensorflow', 'pytorch',
-            'html', 'css', 'bootstrap', 'tailwind', 'sass', 'less',
-            'rest api', 'graphql', 'microservices', 'agile', 'scrum'
-        ]
+        # Shared with the job skill index, so parsed skills can be used as /jobs filters
+        self.skills_keywords = list(SKILL_KEYWORDS)
         
         self.experience_keywords = [
             'years', 'experience', 'senior', 'junior', 'lead', 'manager', 'director',
@@ -138,6 +131,7 @@ class ResumeParser:
                 'education': education,
                 'contact': contact,
                 'text_length': len(text),
+                'text': text,
                 'status': 'success'
             }
             
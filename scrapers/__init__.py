@@ -0,0 +1 @@
+# Scrapers package
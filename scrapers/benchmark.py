@@ -0,0 +1,210 @@
+import argparse
+import asyncio
+import dataclasses
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from db.init_db import create_tables
+from scrapers.engine import navigate, scrape_site
+from scrapers.fixture_server import DEFAULT_FIXTURE_DIR, FixtureServer, page_file
+from scrapers.http_fetch import create_session
+from scrapers.job_sink import JobSink
+from scrapers.metrics import PhaseTimer
+from scrapers.orchestrator import LazyBrowser
+from scrapers.sites import SITES
+from scrapers.throttle import HostLimiter
+
+PHASES = ("launch", "navigate", "extract", "classify", "persist")
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident memory of this process plus finished children (the browser), in MB"""
+    if resource is None:
+        return None
+    self_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    child_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes elsewhere
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round((self_rss + child_rss) / scale, 1)
+
+
+async def bench_site(name: str, server: FixtureServer, browser, session, db_path: str, tier: str) -> Dict:
+    config = server.localize(name, SITES[name])
+    # Politeness limits only matter against real sites
+    config = dataclasses.replace(config, requests_per_second=1000.0, burst=1000)
+
+    timer = PhaseTimer()
+    sink = JobSink(config.company, db_path=db_path)
+    started = time.perf_counter()
+    crawl = await scrape_site(browser, config, sink, HostLimiter(), session, timer,
+                              tier=None if tier == "auto" else tier)
+    with timer.phase("persist"):
+        sink.close()
+    seconds = time.perf_counter() - started
+
+    return {
+        "company": config.company,
+        "tier": crawl.tier,
+        "pages": crawl.pages,
+        "listings": crawl.listings,
+        "saved": sink.inserted + sink.updated + sink.unchanged,
+        "seconds": round(seconds, 4),
+        "jobs_per_sec": round(crawl.listings / seconds, 1) if seconds else 0.0,
+        "phases": {phase: round(timer.totals.get(phase, 0.0), 4) for phase in PHASES if phase != "launch"},
+    }
+
+
+async def run_benchmark(names: List[str], fixture_dir: str = DEFAULT_FIXTURE_DIR,
+                        repeat: int = 3, tier: str = "auto") -> Dict:
+    """Scrape every fixture `repeat` times into a scratch database and keep the median run per site"""
+    runs: Dict[str, List[Dict]] = {name: [] for name in names}
+    launch = PhaseTimer()
+    browser = LazyBrowser(timer=launch)
+    session = create_session()
+    started = time.perf_counter()
+
+    try:
+        with FixtureServer(fixture_dir) as server:
+            for _ in range(repeat):
+                with tempfile.TemporaryDirectory() as scratch:
+                    db_path = os.path.join(scratch, "bench.db")
+                    create_tables(db_path)
+                    for name in names:
+                        runs[name].append(await bench_site(name, server, browser, session, db_path, tier))
+    finally:
+        await browser.close()
+        session.close()
+
+    sites = {}
+    for name, results in runs.items():
+        ordered = sorted(results, key=lambda r: r["seconds"])
+        sites[name] = ordered[len(ordered) // 2]
+
+    listings = sum(r["listings"] for r in sites.values())
+    seconds = sum(r["seconds"] for r in sites.values())
+    return {
+        "python": platform.python_version(),
+        "repeat": repeat,
+        "tier": tier,
+        "sites": sites,
+        "total": {
+            "listings": listings,
+            "seconds": round(seconds, 4),
+            "jobs_per_sec": round(listings / seconds, 1) if seconds else 0.0,
+            "launch_seconds": round(launch.totals.get("launch", 0.0), 4),
+            "wall_seconds": round(time.perf_counter() - started, 4),
+        },
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def print_report(report: Dict):
+    header = f"{'site':<12} {'tier':<7} {'pages':>5} {'jobs':>5} {'jobs/s':>8}  " + " ".join(
+        f"{p:>9}" for p in PHASES[1:])
+    print(header)
+    for name, r in report["sites"].items():
+        phases = " ".join(f"{r['phases'][p] * 1000:8.1f}m" for p in PHASES[1:])
+        print(f"{name:<12} {r['tier']:<7} {r['pages']:>5} {r['listings']:>5} {r['jobs_per_sec']:>8.1f}  {phases}")
+    total = report["total"]
+    print(f"{'total':<12} {'':<7} {'':>5} {total['listings']:>5} {total['jobs_per_sec']:>8.1f}")
+    print(f"browser launch: {total['launch_seconds']:.2f}s  peak RSS: {report['peak_rss_mb']} MB")
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float) -> bool:
+    """Print throughput against a saved baseline; False if any site regressed beyond tolerance"""
+    ok = True
+    print(f"\n{'site':<12} {'baseline':>10} {'now':>10} {'change':>8}")
+    rows = list(report["sites"].items()) + [("total", report["total"])]
+    for name, current in rows:
+        before = (baseline["sites"].get(name) if name != "total" else baseline.get("total")) or {}
+        if not before.get("jobs_per_sec"):
+            print(f"{name:<12} {'-':>10} {current['jobs_per_sec']:>10.1f}")
+            continue
+        change = current["jobs_per_sec"] / before["jobs_per_sec"] - 1
+        flag = ""
+        if change < -tolerance:
+            flag = "  REGRESSION"
+            ok = False
+        print(f"{name:<12} {before['jobs_per_sec']:>10.1f} {current['jobs_per_sec']:>10.1f} {change:>+7.1%}{flag}")
+    return ok
+
+
+async def record(names: List[str], fixture_dir: str, pages: int):
+    """Save rendered listing pages from the live sites as fixtures"""
+    browser = LazyBrowser()
+    try:
+        for name in names:
+            config = SITES[name]
+            if config.page_url_template:
+                urls = [config.page_url_template.format(page=n, offset=(n - 1) * config.page_size)
+                        for n in range(1, pages + 1)]
+            else:
+                urls = [config.start_url]
+
+            context = await browser.new_context()
+            try:
+                page = await context.new_page()
+                for url in urls:
+                    await navigate(page, config, url)
+                    target = page_file(os.path.join(fixture_dir, f"{name}.html"), urlsplit(url).query)
+                    with open(target, "w", encoding="utf-8") as f:
+                        f.write(await page.content())
+                    print(f"recorded {url} -> {target}")
+            finally:
+                await context.close()
+    finally:
+        await browser.close()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers against saved career pages")
+    parser.add_argument("companies", nargs="*", help=f"Sites to run (default: all of {', '.join(SITES)})")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURE_DIR, help="Directory of saved listing pages")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per site; the median is reported")
+    parser.add_argument("--tier", choices=("auto", "http", "browser"), default="auto",
+                        help="Force the HTTP or browser path instead of each site's default")
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Write the report as the new baseline")
+    parser.add_argument("--compare", metavar="PATH", help="Compare jobs/sec against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Allowed jobs/sec drop before --compare fails (default 0.10)")
+    parser.add_argument("--record", action="store_true", help="Re-record fixtures from the live sites")
+    parser.add_argument("--record-pages", type=int, default=2, help="Pages to record for paginated sites")
+    args = parser.parse_args(argv)
+
+    names = args.companies or list(SITES)
+    unknown = [n for n in names if n not in SITES]
+    if unknown:
+        parser.error(f"unknown companies: {', '.join(unknown)}")
+
+    if args.record:
+        asyncio.run(record(names, args.fixtures, args.record_pages))
+        return
+
+    report = asyncio.run(run_benchmark(names, args.fixtures, args.repeat, args.tier))
+    print_report(report)
+
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if not compare(report, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
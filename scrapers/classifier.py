@@ -0,0 +1,101 @@
+import re
+from typing import Iterable, List, Optional
+
+TECH_KEYWORDS = (
+    'software', 'engineer', 'developer', 'programmer', 'architect', 'data scientist',
+    'machine learning', 'ai', 'backend', 'frontend', 'full stack', 'devops',
+    'cloud', 'aws', 'azure', 'python', 'java', 'javascript', 'react', 'node',
+    'mobile', 'ios', 'android', 'web', 'api', 'database', 'sql', 'analytics',
+    'security', 'cyber', 'infrastructure', 'platform', 'system', 'tech lead',
+    'senior', 'staff', 'principal', 'director', 'manager', 'head of engineering',
+)
+
+# Skills indexed per job for /jobs?skills=...; resumes are matched against the same list
+SKILL_KEYWORDS = (
+    'python', 'javascript', 'java', 'c++', 'c#', 'go', 'rust', 'php', 'ruby',
+    'react', 'angular', 'vue', 'node.js', 'django', 'flask', 'fastapi',
+    'sql', 'postgresql', 'mysql', 'mongodb', 'redis',
+    'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'terraform',
+    'git', 'github', 'gitlab', 'jenkins', 'ci/cd',
+    'machine learning', 'ai', 'data science', 'pandas', 'numpy', 'tensorflow', 'pytorch',
+    'html', 'css', 'bootstrap', 'tailwind', 'sass', 'less',
+    'rest api', 'graphql', 'microservices', 'agile', 'scrum',
+)
+
+# Skills that are also everyday English words. Joined to another word by a hyphen
+# they are that word ("Go-to-market", "less-than-truckload"), not the skill.
+COMMON_WORD_SKILLS = frozenset(('go', 'less', 'rust'))
+
+
+def _trie_regex(keywords: Iterable[str]) -> str:
+    """Alternation with shared prefixes factored out, so the regex engine
+    walks a trie instead of retrying every keyword at each position"""
+    trie: dict = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = []
+        for ch, child in sorted(node.items()):
+            if ch:
+                # Multi-word keywords also match "full-stack" and repeated spaces
+                branches.append((r"[\s-]+" if ch == " " else re.escape(ch)) + build(child))
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+def compile_keywords(keywords: Iterable[str]) -> "re.Pattern[str]":
+    """Match any keyword as whole words in lower-cased text
+
+    The trie is greedy, so "javascript" is reported rather than "java". A
+    trailing "s" is allowed for plurals ("engineers").
+    """
+    return re.compile(rf"\b({_trie_regex(sorted(set(k.lower() for k in keywords)))})s?\b")
+
+
+_TECH_SEARCH = compile_keywords(TECH_KEYWORDS).search
+# Lookarounds instead of \b, which never matches after "c++" or "c#"
+_SKILL_FINDITER = re.compile(rf"(?<!\w)({_trie_regex(sorted(set(SKILL_KEYWORDS)))})(?!\w)").finditer
+
+
+def normalize_skill(name: str) -> str:
+    """Canonical form of a skill name, as stored in the skills table"""
+    return " ".join(re.split(r"[\s-]+", name.strip().lower()))
+
+
+def classify(title: str) -> Optional[str]:
+    """Return the tech keyword found in a job title, or None"""
+    match = _TECH_SEARCH(title.lower()) if title else None
+    return " ".join(re.split(r"[\s-]+", match.group(1))) if match else None
+
+
+def is_tech_job(title: str) -> bool:
+    """Check if job title contains tech-related keywords"""
+    return classify(title) is not None
+
+
+def classify_many(titles: List[str]) -> List[Optional[str]]:
+    """classify() for a whole page or crawl worth of titles"""
+    return [classify(title) for title in titles]
+
+
+def extract_skills(title: str) -> List[str]:
+    """Distinct SKILL_KEYWORDS mentioned in a job title, in order of appearance"""
+    if not title:
+        return []
+    text = title.lower()
+    skills = []
+    for match in _SKILL_FINDITER(text):
+        skill = match.group(1)
+        start, end = match.span(1)
+        if skill in COMMON_WORD_SKILLS and "-" in (text[start - 1:start], text[end:end + 1]):
+            continue
+        skills.append(normalize_skill(skill))
+    return list(dict.fromkeys(skills))
@@ -0,0 +1,460 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+import requests
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from scrapers.classifier import classify_many
+from scrapers.http_fetch import ListingPage, create_session, fetch_page
+from scrapers.metrics import NULL_TIMER, PhaseTimer
+from scrapers.throttle import HostLimiter, with_retries
+
+logger = logging.getLogger(__name__)
+
+# Listing pages only need the document, scripts and XHR/fetch data
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet", "texttrack", "eventsource", "manifest"}
+BLOCKED_HOSTS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "facebook.net",
+    "connect.facebook.com",
+    "hotjar.com",
+    "segment.io",
+    "segment.com",
+    "optimizely.com",
+    "newrelic.com",
+    "nr-data.net",
+    "mixpanel.com",
+    "fullstory.com",
+    "clarity.ms",
+    "linkedin.com",
+    "bing.com",
+    "onetrust.com",
+    "cookielaw.org",
+)
+
+DEFAULT_LOCATION_SELECTOR = (
+    "[class*='location' i], [data-automation-id*='location' i], "
+    "[data-testid*='location' i], [itemprop='jobLocation']"
+)
+
+# Runs inside the page: walks the selector fallback chain and returns a compact
+# [title, href, location] list so extraction costs one IPC call regardless of job count.
+# Links in navigation and footers are never listings.
+EXTRACT_JOBS_JS = """
+({selectors, locationSelector, maxJobs}) => {
+    const clean = (text) => (text || "").replace(/\\s+/g, " ").trim();
+    const inChrome = (el) => el.closest("nav, footer, [role='navigation']") !== null;
+    const locationFor = (el) => {
+        const own = el.querySelector(locationSelector);
+        if (own) return clean(own.innerText);
+        const card = el.closest("li, tr, article, [role='listitem'], [role='row']") || el.parentElement;
+        const near = card && card.querySelector(locationSelector);
+        return near ? clean(near.innerText) : null;
+    };
+    for (const selector of selectors) {
+        let elements;
+        try {
+            elements = Array.from(document.querySelectorAll(selector)).filter((el) => !inChrome(el));
+        } catch (e) {
+            continue;
+        }
+        if (!elements.length) continue;
+        const picked = maxJobs == null ? elements : elements.slice(0, maxJobs);
+        return {
+            selector,
+            total: elements.length,
+            jobs: picked.map((el) => [clean(el.innerText), el.getAttribute("href"), locationFor(el)]),
+        };
+    }
+    return {selector: null, total: 0, jobs: []};
+}
+"""
+
+# Resolves once the first job link differs from the one shown before paging
+LISTING_CHANGED_JS = """
+({selectors, previousHref}) => {
+    for (const selector of selectors) {
+        let first;
+        try {
+            first = document.querySelector(selector);
+        } catch (e) {
+            continue;
+        }
+        if (first) return first.getAttribute("href") !== previousHref;
+    }
+    return false;
+}
+"""
+
+# (title, href, location) as read from the page, and (title, url, location) once normalized
+Anchor = Tuple[str, Optional[str], Optional[str]]
+Job = Tuple[str, str, str]
+
+
+@dataclass(frozen=True)
+class SiteConfig:
+    """Everything that differs between company career sites"""
+    company: str
+    start_url: str
+    base_url: str
+    # Tried in order; the first selector that matches anything wins
+    selectors: Tuple[str, ...]
+    # Budget per crawl: stop after this many listings or pages
+    max_jobs: Optional[int] = None
+    max_pages: int = 25
+    # Pagination: a URL with {page} (1-based) or {offset} placeholders, or a "next" control to click
+    page_url_template: Optional[str] = None
+    page_size: int = 20
+    next_selector: Optional[str] = None
+    # Politeness per host: pages open at once, request rate and timeout retries
+    page_concurrency: int = 3
+    requests_per_second: float = 1.0
+    burst: int = 2
+    retries: int = 2
+    # Link texts that are site navigation rather than job titles
+    skip_titles: Tuple[str, ...] = ()
+    # Drop images, fonts, stylesheets and analytics while loading
+    block_resources: bool = True
+    # Selector that signals the listing has rendered (defaults to the first selector)
+    wait_selector: Optional[str] = None
+    wait_timeout_ms: int = 15000
+    # CSS for a location element inside or near each job link
+    location_selector: Optional[str] = None
+    # Skip the plain-HTTP tier for sites whose listings only exist after JavaScript runs
+    needs_js: bool = False
+
+
+@dataclass
+class CrawlResult:
+    # True when the crawl saw the site's whole listing, so jobs missing from it can be closed
+    complete: bool
+    # "http" or "browser"
+    tier: str
+    pages: int
+    listings: int
+
+
+def _is_blocked_host(url: str) -> bool:
+    host = urlparse(url).hostname or ""
+    return any(host == blocked or host.endswith("." + blocked) for blocked in BLOCKED_HOSTS)
+
+
+async def _filter_request(route):
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or _is_blocked_host(request.url):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def block_resources(context):
+    """Abort non-essential resource types and third-party analytics for every page in the context"""
+    await context.route("**/*", _filter_request)
+
+
+async def navigate(page, config: SiteConfig, url: Optional[str] = None) -> bool:
+    """Open a listing page and wait until job links render; False if they never did"""
+    await page.goto(url or config.start_url, wait_until="domcontentloaded", timeout=config.wait_timeout_ms * 2)
+    return await _wait_for_listing(page, config)
+
+
+async def _wait_for_listing(page, config: SiteConfig) -> bool:
+    try:
+        await page.wait_for_selector(config.wait_selector or config.selectors[0],
+                                     state="attached", timeout=config.wait_timeout_ms)
+        return True
+    except PlaywrightTimeoutError:
+        # The primary selector never showed up; let a fallback selector have a go
+        # once the page has stopped fetching
+        try:
+            await page.wait_for_load_state("networkidle", timeout=config.wait_timeout_ms)
+        except PlaywrightTimeoutError:
+            pass
+        return False
+
+
+async def extract(page, config: SiteConfig, limit: Optional[int] = None) -> List[Anchor]:
+    """Return (title, href, location) for the first selector that matches, in one browser round trip"""
+    result = await page.evaluate(EXTRACT_JOBS_JS, {
+        "selectors": list(config.selectors),
+        "locationSelector": config.location_selector or DEFAULT_LOCATION_SELECTOR,
+        "maxJobs": limit,
+    })
+
+    logger.info("%s: found %d jobs", config.company, result["total"])
+
+    return [tuple(job) for job in result["jobs"]]
+
+
+def normalize(config: SiteConfig, anchors: List[Anchor]) -> List[Job]:
+    """Drop navigation links and make relative URLs absolute"""
+    skip = {t.lower() for t in config.skip_titles}
+    jobs = []
+    for title, href, location in anchors:
+        if not title or not href or title.lower() in skip:
+            continue
+        jobs.append((title, urljoin(config.base_url, href), location or "N/A"))
+    return jobs
+
+
+def classify(jobs: List[Job]) -> List[Job]:
+    """Keep only tech jobs"""
+    keywords = classify_many([title for title, _, _ in jobs])
+    return [job for job, keyword in zip(jobs, keywords) if keyword]
+
+
+class _Crawl:
+    """Listings seen so far in one company crawl, and whether it got to the end"""
+
+    def __init__(self, config: SiteConfig, sink, timer: PhaseTimer):
+        self.config = config
+        self.sink = sink
+        self.timer = timer
+        self.seen = set()
+        self.truncated = False
+        self.reached_end = False
+        # A listing page that never rendered may have hidden jobs that are still open
+        self.timed_out = False
+        # The HTTP tier found the listing itself, not just links that look like jobs
+        self.listed = False
+        self.pages = 0
+
+    @property
+    def remaining(self) -> Optional[int]:
+        if self.config.max_jobs is None:
+            return None
+        return max(0, self.config.max_jobs - len(self.seen))
+
+    @property
+    def stopped(self) -> bool:
+        return self.truncated or self.reached_end
+
+    def take(self, anchors: List[Anchor]) -> int:
+        """Send new listings to the sink and return how many were new"""
+        self.pages += 1
+        fresh = []
+        with self.timer.phase("extract"):
+            jobs = normalize(self.config, anchors)
+        for job in jobs:
+            if job[1] in self.seen:
+                continue
+            if self.remaining == 0:
+                self.truncated = True
+                break
+            self.seen.add(job[1])
+            fresh.append(job)
+
+        # Hitting the budget exactly still means there may be more listings
+        if self.remaining == 0:
+            self.truncated = True
+
+        with self.timer.phase("classify"):
+            tech_jobs = classify(fresh)
+        with self.timer.phase("persist"):
+            for title, url, location in tech_jobs:
+                self.sink.add(title, location, url)
+        return len(fresh)
+
+    def result(self, tier: str) -> "CrawlResult":
+        complete = self.reached_end and not self.truncated and not self.timed_out
+        # Plain HTTP cannot see listings that a script-rendered site only adds later
+        if tier == "http" and self.config.needs_js:
+            complete = False
+        return CrawlResult(complete, tier, self.pages, len(self.seen))
+
+
+def _page_url(template: str, number: int, page_size: int) -> str:
+    return template.format(page=number, offset=(number - 1) * page_size)
+
+
+async def _load(page, config: SiteConfig, limiter: HostLimiter, url: str, crawl: _Crawl):
+    async def attempt():
+        await limiter.wait(url, config.requests_per_second, config.burst)
+        return await navigate(page, config, url)
+
+    if not await with_retries(attempt, config.retries):
+        crawl.timed_out = True
+
+
+async def _turn_page(page, config: SiteConfig, limiter: HostLimiter, previous_href: Optional[str]) -> bool:
+    """Click the "next" control and wait for new listings; False when there is no next page"""
+    control = await page.query_selector(config.next_selector)
+    if control is None or await control.is_disabled() or await control.get_attribute("aria-disabled") == "true":
+        return False
+
+    async def attempt():
+        await limiter.wait(page.url, config.requests_per_second, config.burst)
+        await page.click(config.next_selector, timeout=config.wait_timeout_ms)
+        await page.wait_for_function(LISTING_CHANGED_JS,
+                                     arg={"selectors": list(config.selectors), "previousHref": previous_href},
+                                     timeout=config.wait_timeout_ms)
+
+    await with_retries(attempt, config.retries)
+    return True
+
+
+async def _crawl_numbered_pages(context, config: SiteConfig, template: str, crawl: _Crawl,
+                                limiter: HostLimiter):
+    """Fetch page-number URLs with a small pool of pages until one comes back empty"""
+    numbers = iter(range(1, config.max_pages + 1))
+    last_page = config.max_pages
+
+    async def worker():
+        nonlocal last_page
+        page = await context.new_page()
+        try:
+            # The iterator is shared, so every page number is fetched by exactly one worker
+            for number in numbers:
+                if crawl.truncated or number > last_page:
+                    return
+                url = _page_url(template, number, config.page_size)
+                async with limiter.pool(url, config.page_concurrency):
+                    with crawl.timer.phase("navigate"):
+                        await _load(page, config, limiter, url, crawl)
+                    with crawl.timer.phase("extract"):
+                        anchors = await extract(page, config, crawl.remaining)
+                if not crawl.take(anchors):
+                    # Past the end of the catalog; later pages will be empty too
+                    last_page = min(last_page, number)
+                    crawl.reached_end = True
+        finally:
+            await page.close()
+
+    await asyncio.gather(*(worker() for _ in range(max(1, config.page_concurrency))))
+
+
+async def _crawl_next_links(context, config: SiteConfig, crawl: _Crawl, limiter: HostLimiter):
+    """Follow the "next" control one page at a time"""
+    page = await context.new_page()
+    try:
+        async with limiter.pool(config.start_url, config.page_concurrency):
+            with crawl.timer.phase("navigate"):
+                await _load(page, config, limiter, config.start_url, crawl)
+            for number in range(1, config.max_pages + 1):
+                with crawl.timer.phase("extract"):
+                    anchors = await extract(page, config, crawl.remaining)
+                if not crawl.take(anchors):
+                    crawl.reached_end = True
+                if crawl.stopped or number == config.max_pages:
+                    return
+                previous_href = anchors[0][1] if anchors else None
+                with crawl.timer.phase("navigate"):
+                    turned = await _turn_page(page, config, limiter, previous_href)
+                if not turned:
+                    crawl.reached_end = True
+                    return
+    finally:
+        await page.close()
+
+
+async def _crawl_single_page(context, config: SiteConfig, crawl: _Crawl, limiter: HostLimiter):
+    page = await context.new_page()
+    try:
+        async with limiter.pool(config.start_url, config.page_concurrency):
+            with crawl.timer.phase("navigate"):
+                await _load(page, config, limiter, config.start_url, crawl)
+            with crawl.timer.phase("extract"):
+                anchors = await extract(page, config, crawl.remaining)
+    finally:
+        await page.close()
+
+    crawl.take(anchors)
+    crawl.reached_end = True
+
+
+def _parse_listing(html: str, config: SiteConfig, limit: Optional[int]):
+    listing = ListingPage(html)
+    next_href = listing.next_href(config.next_selector) if config.next_selector else None
+    anchors = listing.jobs(config.selectors, config.location_selector or DEFAULT_LOCATION_SELECTOR, limit)
+    # Same signal the browser waits for; broad fallback selectors alone also match
+    # stray links on a page whose listing is rendered by scripts
+    listed = bool(listing.listing_nodes(config.wait_selector or config.selectors[0]) or listing.json_jobs())
+    return anchors, next_href, listed
+
+
+async def _crawl_http(session, config: SiteConfig, crawl: _Crawl, limiter: HostLimiter):
+    """Cheap tier: plain GETs on the pooled session, parsed without a browser"""
+    template = config.page_url_template
+    url = _page_url(template, 1, config.page_size) if template else config.start_url
+    for number in range(1, config.max_pages + 1):
+        async def attempt():
+            await limiter.wait(url, config.requests_per_second, config.burst)
+            # Fetching and parsing both block, so keep them off the event loop
+            return await asyncio.to_thread(fetch_page, session, url, config.wait_timeout_ms / 1000)
+
+        try:
+            with crawl.timer.phase("navigate"):
+                html = await with_retries(
+                    attempt, config.retries, retry_on=(requests.Timeout, requests.ConnectionError))
+        except requests.HTTPError as e:
+            # Asking for a page past the last one
+            if number > 1 and e.response is not None and e.response.status_code == 404:
+                crawl.reached_end = True
+                return
+            raise
+        with crawl.timer.phase("extract"):
+            anchors, next_href, listed = await asyncio.to_thread(_parse_listing, html, config, crawl.remaining)
+        if number == 1 and not listed:
+            return
+        crawl.listed = True
+        if not crawl.take(anchors):
+            crawl.reached_end = True
+        if crawl.stopped:
+            return
+
+        if template:
+            url = _page_url(template, number + 1, config.page_size)
+        elif next_href:
+            url = urljoin(url, next_href)
+        else:
+            crawl.reached_end = True
+            return
+
+
+async def _crawl_browser(browser, config: SiteConfig, crawl: _Crawl, limiter: HostLimiter):
+    context = await browser.new_context()
+    try:
+        if config.block_resources:
+            await block_resources(context)
+        if config.page_url_template:
+            await _crawl_numbered_pages(context, config, config.page_url_template, crawl, limiter)
+        elif config.next_selector:
+            await _crawl_next_links(context, config, crawl, limiter)
+        else:
+            await _crawl_single_page(context, config, crawl, limiter)
+    finally:
+        await context.close()
+
+
+async def scrape_site(browser, config: SiteConfig, sink, limiter: Optional[HostLimiter] = None,
+                      session: Optional[requests.Session] = None,
+                      timer: PhaseTimer = NULL_TIMER, tier: Optional[str] = None) -> CrawlResult:
+    """Run the shared fetch, extract, normalize, classify, sink pipeline for one site
+
+    Sites that do not need JavaScript are tried over plain HTTP first; the
+    browser (anything with an async new_context()) is only used when the first
+    page does not match the listing selector. Pass tier="http" or "browser" to
+    force one tier.
+    """
+    limiter = limiter or HostLimiter()
+    tier = tier or ("browser" if config.needs_js else "auto")
+
+    if tier != "browser":
+        crawl = _Crawl(config, sink, timer)
+        try:
+            await _crawl_http(session or create_session(), config, crawl, limiter)
+        except requests.RequestException as e:
+            logger.warning("%s: HTTP fetch failed (%s)", config.company, e)
+        if crawl.listed or tier == "http":
+            return crawl.result("http")
+        logger.info("%s: no listing over HTTP, falling back to the browser", config.company)
+
+    crawl = _Crawl(config, sink, timer)
+    await _crawl_browser(browser, config, crawl, limiter)
+    return crawl.result("browser")
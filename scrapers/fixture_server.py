@@ -0,0 +1,93 @@
+import argparse
+import dataclasses
+import os
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from scrapers.engine import SiteConfig
+
+# Hand-written stand-ins for the career sites until real pages are captured with
+# python -m scrapers.benchmark --record
+DEFAULT_FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+# Query parameters that select a listing page; page N of google.html is google.page<N>.html
+PAGE_PARAMS = ("page", "pg", "from", "offset")
+
+
+def page_file(path: str, query: str) -> str:
+    """Fixture file holding the listing page a paging query string asks for"""
+    for name, value in parse_qsl(query):
+        if name in PAGE_PARAMS and value not in ("0", "1"):
+            stem, ext = os.path.splitext(path)
+            return f"{stem}.{name}{value}{ext}"
+    return path
+
+
+class _FixtureHandler(SimpleHTTPRequestHandler):
+    """Static file handler that maps paging query strings onto per-page fixture files"""
+
+    def translate_path(self, path):
+        split = urlsplit(path)
+        return page_file(super().translate_path(split.path), split.query)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer:
+    """Serve a directory of saved listing pages on a local port
+
+    Usage:
+        with FixtureServer() as server:
+            config = server.localize("google", SITES["google"])
+    """
+
+    def __init__(self, directory: str = DEFAULT_FIXTURE_DIR, host: str = "127.0.0.1", port: int = 0):
+        handler = partial(_FixtureHandler, directory=directory)
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, name: str) -> str:
+        return f"{self.base_url}/{name}"
+
+    def localize(self, name: str, config: SiteConfig) -> SiteConfig:
+        """Point a site config at <name>.html on this server, keeping its paging scheme"""
+        page_url_template = None
+        if config.page_url_template:
+            query = urlsplit(config.page_url_template).query
+            page_url_template = self.url(f"{name}.html") + (f"?{query}" if query else "")
+        return dataclasses.replace(
+            config,
+            start_url=self.url(f"{name}.html"),
+            base_url=self.base_url,
+            page_url_template=page_url_template,
+        )
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve saved career-site pages for offline scraping")
+    parser.add_argument("directory", nargs="?", default=DEFAULT_FIXTURE_DIR)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    with FixtureServer(args.directory, port=args.port) as server:
+        print(f"Serving {args.directory} at {server.base_url}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
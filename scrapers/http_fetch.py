@@ -0,0 +1,348 @@
+import json
+import re
+from html.parser import HTMLParser
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/json;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+
+# Elements whose text the browser separates from its neighbours
+BREAKING_TAGS = {
+    "br", "p", "div", "li", "ul", "ol", "tr", "td", "th", "table", "section", "article",
+    "header", "footer", "h1", "h2", "h3", "h4", "h5", "h6", "dd", "dt", "dl",
+}
+
+# Containers that usually hold one job card, mirroring the in-browser extractor
+CARD_TAGS = {"li", "tr", "article"}
+CARD_ROLES = {"listitem", "row"}
+
+# Site chrome whose links are navigation, never job listings
+CHROME_TAGS = {"nav", "footer"}
+CHROME_ROLES = {"navigation"}
+
+# Keys that hold a job's link in embedded JSON listings
+JSON_URL_KEYS = ("url", "absolute_url", "applyUrl", "apply_url", "externalPath", "canonicalUrl", "href")
+JSON_LOCATION_KEYS = ("location", "locationsText", "jobLocation", "city")
+
+
+def create_session(pool_size: int = 10) -> requests.Session:
+    """Keep-alive session whose connection pool is shared by every cheap fetch in a run"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
+
+def fetch_page(session: requests.Session, url: str, timeout: float = 15) -> str:
+    response = session.get(url, timeout=timeout)
+    response.raise_for_status()
+    return response.text
+
+
+class Node:
+    __slots__ = ("tag", "attrs", "parent", "children", "text")
+
+    def __init__(self, tag: str, attrs: Dict[str, str], parent: Optional["Node"]):
+        self.tag = tag
+        self.attrs = attrs
+        self.parent = parent
+        self.children: List["Node"] = []
+        # Text chunks and child nodes in document order
+        self.text: List[object] = []
+
+    def inner_text(self) -> str:
+        """Whitespace-collapsed text, close to the browser's innerText"""
+        parts = []
+        for chunk in self.text:
+            if not isinstance(chunk, Node):
+                parts.append(chunk)
+            elif chunk.tag in BREAKING_TAGS:
+                parts.append(f" {chunk.inner_text()} ")
+            else:
+                parts.append(chunk.inner_text())
+        return " ".join("".join(parts).split())
+
+    def descendants(self) -> Iterator["Node"]:
+        for child in self.children:
+            yield child
+            yield from child.descendants()
+
+    def ancestors(self) -> Iterator["Node"]:
+        node = self.parent
+        while node is not None:
+            yield node
+            node = node.parent
+
+    def in_chrome(self) -> bool:
+        return any(a.tag in CHROME_TAGS or a.attrs.get("role") in CHROME_ROLES for a in self.ancestors())
+
+
+class _TreeBuilder(HTMLParser):
+    """Forgiving HTML to Node tree, plus the bodies of JSON script tags"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node("#document", {}, None)
+        self._stack = [self.root]
+        self.json_blobs: List[str] = []
+        self._script_type: Optional[str] = None
+        self._script_text: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        parent = self._stack[-1]
+        node = Node(tag, {k: v or "" for k, v in attrs}, parent)
+        parent.children.append(node)
+        parent.text.append(node)
+        if tag == "script":
+            attr = node.attrs
+            is_json = "json" in attr.get("type", "") or attr.get("id") == "__NEXT_DATA__"
+            self._script_type = "json" if is_json else "code"
+            self._script_text = []
+        if tag not in VOID_TAGS:
+            self._stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self._stack.pop()
+
+    def handle_endtag(self, tag):
+        if tag == "script" and self._script_type == "json":
+            self.json_blobs.append("".join(self._script_text))
+        if tag == "script":
+            self._script_type = None
+        # Close up to the matching open tag, tolerating unclosed children
+        for i in range(len(self._stack) - 1, 0, -1):
+            if self._stack[i].tag == tag:
+                del self._stack[i:]
+                break
+
+    def handle_data(self, data):
+        if self._script_type is not None:
+            self._script_text.append(data)
+        elif self._stack[-1].tag != "style":
+            self._stack[-1].text.append(data)
+
+
+# One compound selector: optional tag, then #id, .class and [attr op 'value' i] parts
+_COMPOUND_RE = re.compile(r"^([a-zA-Z][\w-]*|\*)?((?:#[\w-]+|\.[\w-]+|\[[^\]]+\])*)$")
+_PART_RE = re.compile(r"#([\w-]+)|\.([\w-]+)|\[([^\]]+)\]")
+_ATTR_RE = re.compile(r"""^\s*([\w:-]+)\s*(?:([*^$~|]?=)\s*(?:'([^']*)'|"([^"]*)"|([^\s'"]+))\s*(i)?)?\s*$""")
+
+
+class UnsupportedSelector(ValueError):
+    pass
+
+
+def _parse_compound(text: str):
+    match = _COMPOUND_RE.match(text)
+    if not match:
+        raise UnsupportedSelector(text)
+    tag = match.group(1)
+    checks = []
+    for part in _PART_RE.finditer(match.group(2) or ""):
+        if part.group(1):
+            checks.append(("id", "=", part.group(1), False))
+        elif part.group(2):
+            checks.append(("class", "~=", part.group(2), False))
+        else:
+            attr = _ATTR_RE.match(part.group(3))
+            if not attr:
+                raise UnsupportedSelector(text)
+            value = next((v for v in attr.group(3, 4, 5) if v is not None), None)
+            checks.append((attr.group(1), attr.group(2), value, bool(attr.group(6))))
+    return (None if tag in (None, "*") else tag.lower()), checks
+
+
+def _split_top_level(text: str, is_separator) -> List[str]:
+    """Split on separator characters that are outside [...] and quotes"""
+    parts, current, depth, quote = [], [], 0, None
+    for ch in text:
+        if quote:
+            quote = None if ch == quote else quote
+        elif ch in "'\"":
+            quote = ch
+        elif ch == "[":
+            depth += 1
+        elif ch == "]":
+            depth -= 1
+        elif depth == 0 and is_separator(ch):
+            parts.append("".join(current))
+            current = []
+            continue
+        current.append(ch)
+    parts.append("".join(current))
+    return [p for p in (part.strip() for part in parts) if p]
+
+
+def _parse_selector(selector: str):
+    """Parse a comma list of descendant selectors into [[compound, ...], ...]"""
+    return [[_parse_compound(c) for c in _split_top_level(group, str.isspace)]
+            for group in _split_top_level(selector, lambda ch: ch == ",")]
+
+
+def _attr_matches(node: Node, name: str, op: Optional[str], expected: Optional[str], ignore_case: bool) -> bool:
+    if name not in node.attrs:
+        return False
+    if op is None:
+        return True
+    actual = node.attrs[name]
+    if ignore_case:
+        actual, expected = actual.lower(), (expected or "").lower()
+    expected = expected or ""
+    if op == "=":
+        return actual == expected
+    if op == "*=":
+        return bool(expected) and expected in actual
+    if op == "^=":
+        return bool(expected) and actual.startswith(expected)
+    if op == "$=":
+        return bool(expected) and actual.endswith(expected)
+    if op == "~=":
+        return expected in actual.split()
+    if op == "|=":
+        return actual == expected or actual.startswith(expected + "-")
+    return False
+
+
+def _compound_matches(node: Node, compound) -> bool:
+    tag, checks = compound
+    if tag is not None and node.tag != tag:
+        return False
+    return all(_attr_matches(node, *check) for check in checks)
+
+
+def _matches(node: Node, chain) -> bool:
+    if not _compound_matches(node, chain[-1]):
+        return False
+    # Descendant combinators: match the rest of the chain right to left against ancestors
+    remaining = len(chain) - 2
+    for ancestor in node.ancestors():
+        if remaining < 0:
+            break
+        if _compound_matches(ancestor, chain[remaining]):
+            remaining -= 1
+    return remaining < 0
+
+
+def select(root: Node, selector: str) -> List[Node]:
+    """querySelectorAll for the CSS subset the site configs use"""
+    groups = _parse_selector(selector)
+    return [node for node in root.descendants() if any(_matches(node, chain) for chain in groups)]
+
+
+def _location_for(node: Node, location_groups) -> Optional[str]:
+    def first_match(scope: Node) -> Optional[str]:
+        for candidate in scope.descendants():
+            if any(_matches(candidate, chain) for chain in location_groups):
+                return candidate.inner_text()
+        return None
+
+    own = first_match(node)
+    if own:
+        return own
+    card = next((a for a in node.ancestors()
+                 if a.tag in CARD_TAGS or a.attrs.get("role") in CARD_ROLES), node.parent)
+    return first_match(card) if card is not None else None
+
+
+def _json_jobs(value) -> Iterator[Tuple[str, str, Optional[str]]]:
+    """Walk embedded JSON for objects that look like job postings"""
+    if isinstance(value, list):
+        for item in value:
+            yield from _json_jobs(item)
+    elif isinstance(value, dict):
+        title = value.get("title") or value.get("name") if value.get("@type") == "JobPosting" else value.get("title")
+        url = next((value[k] for k in JSON_URL_KEYS if isinstance(value.get(k), str)), None)
+        if isinstance(title, str) and url:
+            location = next((value[k] for k in JSON_LOCATION_KEYS if k in value), None)
+            yield title.strip(), url, _json_location(location)
+        else:
+            for item in value.values():
+                yield from _json_jobs(item)
+
+
+def _json_location(value) -> Optional[str]:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, list) and value:
+        return _json_location(value[0])
+    if isinstance(value, dict):
+        address = value.get("address", value)
+        if isinstance(address, dict):
+            parts = [address.get(k) for k in ("addressLocality", "city", "addressRegion", "state",
+                                              "addressCountry", "country")]
+            text = ", ".join(p for p in parts if isinstance(p, str))
+            return text or address.get("name")
+    return None
+
+
+class ListingPage:
+    """A fetched listing page, parsed once for both job and pagination lookups"""
+
+    def __init__(self, html: str):
+        builder = _TreeBuilder()
+        builder.feed(html)
+        builder.close()
+        self.root = builder.root
+        self.json_blobs = builder.json_blobs
+
+    def jobs(self, selectors, location_selector: str,
+             limit: Optional[int] = None) -> List[Tuple[str, Optional[str], Optional[str]]]:
+        """Return (title, href, location) from job links, falling back to embedded JSON listings"""
+        location_groups = _parse_selector(location_selector)
+        anchors = []
+        for selector in selectors:
+            nodes = self.listing_nodes(selector)
+            if nodes:
+                anchors = [(n.inner_text(), n.attrs.get("href"), _location_for(n, location_groups))
+                           for n in nodes]
+                break
+
+        if not anchors:
+            anchors = self.json_jobs()
+
+        return anchors if limit is None else anchors[:limit]
+
+    def listing_nodes(self, selector: str) -> List[Node]:
+        """Elements matching a job selector, leaving out navigation and footer links"""
+        try:
+            return [n for n in select(self.root, selector) if not n.in_chrome()]
+        except UnsupportedSelector:
+            return []
+
+    def json_jobs(self) -> List[Tuple[str, Optional[str], Optional[str]]]:
+        anchors = []
+        for blob in self.json_blobs:
+            try:
+                anchors.extend(_json_jobs(json.loads(blob)))
+            except ValueError:
+                continue
+        return anchors
+
+    def next_href(self, next_selector: str) -> Optional[str]:
+        """href of the "next page" link, if the page has a plain one"""
+        try:
+            nodes = select(self.root, next_selector)
+        except UnsupportedSelector:
+            return None
+        for node in nodes:
+            if node.attrs.get("href") and node.attrs.get("aria-disabled") != "true":
+                return node.attrs["href"]
+        return None
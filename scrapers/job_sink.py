@@ -0,0 +1,189 @@
+import hashlib
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional, Tuple
+
+from db.connection import connect
+from db.init_db import create_tables
+from db.migrations import STATUS_ACTIVE, STATUS_CLOSED
+from db.skills import CHUNK_SIZE, index_skills, job_ids, lookup_ids
+from events import publish, publish_many
+from scrapers.classifier import extract_skills
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "jobs.db")
+DEFAULT_BATCH_SIZE = 500
+
+UPSERT_JOB = f"""
+    INSERT INTO jobs (title, location_id, company_id, url, status, posted_at, checked_at, content_hash)
+    VALUES (?, ?, ?, ?, {STATUS_ACTIVE}, ?, ?, ?)
+    ON CONFLICT(url) DO UPDATE SET
+        title=excluded.title,
+        location_id=excluded.location_id,
+        company_id=excluded.company_id,
+        status={STATUS_ACTIVE},
+        checked_at=excluded.checked_at,
+        content_hash=excluded.content_hash
+"""
+
+TOUCH_JOB = "UPDATE jobs SET checked_at = ? WHERE url = ?"
+
+# One set-based pass over the company's jobs at the end of a complete crawl
+CLOSE_UNSEEN_JOBS = f"""
+    UPDATE jobs SET status = {STATUS_CLOSED}, checked_at = ?
+    WHERE company_id = ? AND status = {STATUS_ACTIVE}
+      AND url NOT IN (SELECT url FROM temp.seen_urls)
+"""
+
+def content_hash(title: str, location: str, company: str) -> str:
+    """Fingerprint the scraped fields of a listing"""
+    return hashlib.sha1(f"{title}\x1f{location}\x1f{company}".encode("utf-8")).hexdigest()
+
+
+class JobSink:
+    """Buffer scraped jobs and write them to SQLite in batched transactions
+
+    In incremental mode listings whose content hash is unchanged are not
+    rewritten, and every URL seen during the crawl is remembered so that
+    close_unseen() can retire the ones that have disappeared from the site.
+    """
+
+    def __init__(self, company: str, db_path: Optional[str] = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE, incremental: bool = True):
+        self.company = company
+        self.db_path = db_path or os.getenv("DB_PATH", DEFAULT_DB_PATH)
+        self.batch_size = batch_size
+        self.incremental = incremental
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.closed = 0
+        self._buffer: Dict[str, Tuple[str, str]] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._company_id: Optional[int] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            create_tables(self.db_path)
+            self._conn = connect(self.db_path)
+            self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS seen_urls (url TEXT PRIMARY KEY)")
+        return self._conn
+
+    def add(self, title: str, location: str, url: str):
+        """Queue a job for writing, flushing once the batch is full"""
+        # Later sightings of the same URL within a batch win
+        self._buffer[url] = (title, location)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write all buffered jobs in a single transaction"""
+        if not self._buffer:
+            return
+
+        rows = self._buffer
+        self._buffer = {}
+        conn = self._connection()
+        now = int(time.time())
+
+        with conn:
+            existing = self._existing(conn, list(rows))
+            writes = []
+            seen_unchanged = []
+            for url, (title, location) in rows.items():
+                digest = content_hash(title, location, self.company)
+                current = existing.get(url)
+                if current is None:
+                    self.inserted += 1
+                elif current == (digest, STATUS_ACTIVE):
+                    self.unchanged += 1
+                    if self.incremental:
+                        seen_unchanged.append(url)
+                        continue
+                else:
+                    self.updated += 1
+                writes.append((title, location, url, digest))
+
+            if writes:
+                company_id = self._company(conn)
+                location_ids = lookup_ids(conn, "locations", (w[1] for w in writes if w[1] is not None))
+                conn.executemany(UPSERT_JOB, [
+                    (title, location_ids.get(location), company_id, url, now, now, digest)
+                    for title, location, url, digest in writes
+                ])
+                ids = job_ids(conn, [url for _, _, url, _ in writes])
+                index_skills(conn, {ids[url]: extract_skills(title) for title, _, url, _ in writes})
+                # Committed with the rows, so subscribers never hear of a job that was rolled back
+                publish_many(conn, "job.inserted", [
+                    {"id": ids[url], "title": title, "company": self.company, "location": location, "url": url}
+                    for title, location, url, _ in writes if url not in existing
+                ])
+            if seen_unchanged:
+                # Still listed: only the freshness column moves, the row is not rewritten
+                conn.executemany(TOUCH_JOB, [(now, url) for url in seen_unchanged])
+            conn.executemany("INSERT OR IGNORE INTO temp.seen_urls (url) VALUES (?)",
+                             [(url,) for url in rows])
+
+    def _company(self, conn: sqlite3.Connection) -> int:
+        if self._company_id is None:
+            self._company_id = lookup_ids(conn, "companies", [self.company])[self.company]
+        return self._company_id
+
+    def _existing(self, conn: sqlite3.Connection, urls: List[str]) -> Dict[str, tuple]:
+        """Look up the stored hash and status for the given URLs"""
+        existing = {}
+        for start in range(0, len(urls), CHUNK_SIZE):
+            chunk = urls[start:start + CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            for row in conn.execute(
+                f"SELECT url, content_hash, status FROM jobs WHERE url IN ({placeholders})",
+                chunk,
+            ):
+                existing[row[0]] = (row[1], row[2])
+        return existing
+
+    def publish(self, type: str, payload: Optional[dict] = None):
+        """Record a progress event for /events subscribers"""
+        publish(self._connection(), type, payload)
+
+    def close_unseen(self) -> int:
+        """Mark this company's active jobs that were not seen in the crawl as closed
+
+        Only call this after a crawl that covered the whole listing; a partial
+        crawl would close jobs that are still open.
+        """
+        self.flush()
+        conn = self._connection()
+        seen = conn.execute("SELECT COUNT(*) FROM temp.seen_urls").fetchone()[0]
+        # An empty crawl is far more likely a broken page than a company with no jobs
+        if not seen:
+            return 0
+
+        with conn:
+            cursor = conn.execute(CLOSE_UNSEEN_JOBS, (int(time.time()), self._company(conn)))
+        self.closed += cursor.rowcount
+        return cursor.rowcount
+
+    def close(self):
+        """Flush remaining jobs and release the connection"""
+        try:
+            self.flush()
+        finally:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        return {
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "closed": self.closed,
+        }
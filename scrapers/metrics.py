@@ -0,0 +1,29 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict
+
+
+class PhaseTimer:
+    """Accumulate wall-clock seconds per pipeline phase (launch, navigate, extract, classify, persist)"""
+
+    def __init__(self):
+        self.totals: Dict[str, float] = defaultdict(float)
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.totals[name] += time.perf_counter() - started
+
+
+class _NullTimer(PhaseTimer):
+    @contextmanager
+    def phase(self, name: str):
+        yield
+
+
+# Default for normal runs, so the pipeline never branches on whether it is being measured
+NULL_TIMER = _NullTimer()
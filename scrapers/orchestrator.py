@@ -0,0 +1,170 @@
+import argparse
+import asyncio
+import logging
+import os
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+from playwright.async_api import async_playwright
+
+from events import emit
+from scrapers.engine import scrape_site
+from scrapers.http_fetch import create_session
+from scrapers.job_sink import JobSink
+from scrapers.metrics import NULL_TIMER, PhaseTimer
+from scrapers.sites import SITES
+from scrapers.throttle import HostLimiter
+
+if sys.platform == "win32":
+    asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+DEFAULT_CONCURRENCY = int(os.getenv("SCRAPER_CONCURRENCY", "5"))
+
+
+@dataclass
+class ScrapeResult:
+    company: str
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    closed: int = 0
+    seconds: float = 0.0
+    tier: str = ""
+    pages: int = 0
+    error: Optional[str] = None
+
+    @property
+    def rows(self) -> int:
+        return self.inserted + self.updated + self.unchanged
+
+
+class LazyBrowser:
+    """Starts Playwright and Chromium the first time a site actually needs a browser"""
+
+    def __init__(self, headless: bool = True, timer: PhaseTimer = NULL_TIMER):
+        self.headless = headless
+        self.timer = timer
+        self._playwright = None
+        self._browser = None
+        self._lock = asyncio.Lock()
+
+    async def new_context(self):
+        async with self._lock:
+            if self._browser is None:
+                with self.timer.phase("launch"):
+                    self._playwright = await async_playwright().start()
+                    self._browser = await self._playwright.chromium.launch(headless=self.headless)
+        return await self._browser.new_context()
+
+    async def close(self):
+        if self._browser is not None:
+            await self._browser.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+        self._browser = self._playwright = None
+
+
+async def _run_company(browser, company, semaphore, limiter, session, db_path=None, incremental=True):
+    """Scrape one company, in its own browser context if it needs one"""
+    async with semaphore:
+        result = ScrapeResult(company=company)
+        started = time.perf_counter()
+        config = SITES[company]
+        sink = JobSink(config.company, db_path=db_path, incremental=incremental)
+        try:
+            sink.publish("scrape.started", {"company": company})
+            crawl = await scrape_site(browser, config, sink, limiter, session)
+            result.tier = crawl.tier
+            result.pages = crawl.pages
+            if crawl.complete:
+                sink.close_unseen()
+        except Exception as e:
+            result.error = str(e)
+        finally:
+            # Whatever was scraped before a failure is still written
+            try:
+                sink.close()
+            except Exception as e:
+                result.error = result.error or f"write failed: {e}"
+            result.inserted = sink.inserted
+            result.updated = sink.updated
+            result.unchanged = sink.unchanged
+            result.closed = sink.closed
+            result.seconds = time.perf_counter() - started
+        try:
+            emit(sink.db_path, "scrape.finished", {
+                "company": company, "inserted": result.inserted, "updated": result.updated,
+                "unchanged": result.unchanged, "closed": result.closed, "pages": result.pages,
+                "seconds": round(result.seconds, 2), "error": result.error,
+            })
+        except sqlite3.Error as e:
+            print(f"Could not publish scrape.finished for {company}: {e}")
+        return result
+
+
+async def run_scrapers(companies: Optional[List[str]] = None,
+                       concurrency: int = DEFAULT_CONCURRENCY,
+                       headless: bool = True,
+                       db_path: Optional[str] = None,
+                       incremental: bool = True) -> List[ScrapeResult]:
+    """Scrape several companies in parallel, sharing one HTTP session and at most one browser"""
+    companies = companies or list(SITES)
+    unknown = [c for c in companies if c not in SITES]
+    if unknown:
+        raise ValueError(f"Unknown companies: {', '.join(unknown)}")
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    # Shared so that companies hosted on the same domain share its rate limit
+    limiter = HostLimiter()
+    started = time.perf_counter()
+
+    browser = LazyBrowser(headless)
+    session = create_session(pool_size=max(10, concurrency * 2))
+    try:
+        results = await asyncio.gather(
+            *(_run_company(browser, company, semaphore, limiter, session, db_path, incremental)
+              for company in companies)
+        )
+    finally:
+        await browser.close()
+        session.close()
+
+    print_report(results, time.perf_counter() - started)
+    return list(results)
+
+
+def print_report(results: List[ScrapeResult], total_seconds: float):
+    """Print per-company timing and row counts"""
+    for r in results:
+        counts = f"{r.inserted} new, {r.updated} updated, {r.unchanged} unchanged, {r.closed} closed"
+        status = f"{counts}  error: {r.error}" if r.error else counts
+        print(f"{r.company:<12} {r.seconds:7.1f}s  {r.tier or '-':<7} {r.pages:3d}p  {status}")
+    print(f"{'total':<12} {total_seconds:7.1f}s  {'':<7} {sum(r.pages for r in results):3d}p  "
+          f"{sum(r.rows for r in results)} rows")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Scrape company career sites concurrently")
+    parser.add_argument("companies", nargs="*",
+                        help=f"Companies to scrape (default: all of {', '.join(SITES)})")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="Maximum number of companies scraped at once")
+    parser.add_argument("--no-incremental", action="store_true",
+                        help="Rewrite every listing even when its content is unchanged")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    unknown = [c for c in args.companies if c not in SITES]
+    if unknown:
+        parser.error(f"unknown companies: {', '.join(unknown)}")
+
+    headless_setting = os.getenv("PLAYWRIGHT_HEADLESS", "true").lower()
+    headless = headless_setting not in ("false", "0", "no")
+    asyncio.run(run_scrapers(args.companies, args.concurrency, headless,
+                             incremental=not args.no_incremental))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+from scrapers.engine import SiteConfig
+
+# Adding a company only needs a new entry here
+SITES = {
+    "google": SiteConfig(
+        company="Google",
+        start_url="https://careers.google.com/jobs/results/",
+        base_url="https://careers.google.com",
+        selectors=(
+            "a[href*='/jobs/results/']",
+            "a[data-testid*='job']",
+            "a[href*='job']",
+        ),
+        page_url_template="https://careers.google.com/jobs/results/?page={page}",
+        skip_titles=("search", "filter", "sort"),
+    ),
+    "uber": SiteConfig(
+        company="Uber",
+        start_url="https://www.uber.com/us/en/careers/list/",
+        base_url="https://www.uber.com",
+        selectors=("a[href*='/careers/list/']",),
+        skip_titles=("job search",),
+    ),
+    "microsoft": SiteConfig(
+        company="Microsoft",
+        start_url="https://careers.microsoft.com/us/en/search-results",
+        base_url="https://careers.microsoft.com",
+        selectors=(
+            "a[href*='/jobs/']",
+            "a[data-testid*='job']",
+            "a[href*='job']",
+        ),
+        page_url_template="https://careers.microsoft.com/us/en/search-results?from={offset}&s=1",
+        page_size=20,
+        skip_titles=("search", "filter", "sort"),
+        # Search results are rendered client-side
+        needs_js=True,
+    ),
+    "autodesk": SiteConfig(
+        company="AutoDesk",
+        start_url="https://www.autodesk.com/careers/search-jobs",
+        base_url="https://www.autodesk.com",
+        selectors=(
+            "a[href*='/careers/']",
+            "a.job-title-link",
+            "a[data-testid*='job']",
+            "a[href*='job']",
+        ),
+        next_selector="a[rel='next'], a[aria-label*='next' i]",
+    ),
+    "morningstar": SiteConfig(
+        company="Morningstar",
+        start_url="https://morningstar.wd5.myworkdayjobs.com/en-US/Mstar",
+        base_url="https://morningstar.wd5.myworkdayjobs.com",
+        selectors=(
+            "ul[role='list'] li a",
+            "a[data-automation-id*='job']",
+            "a[href*='/job']",
+            "a[data-automation-id*='link']",
+        ),
+        next_selector="button[aria-label='next']",
+        # Workday renders the listing client-side
+        needs_js=True,
+    ),
+}
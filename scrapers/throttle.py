@@ -0,0 +1,66 @@
+import asyncio
+import random
+import time
+from typing import Dict, Tuple, Type
+from urllib.parse import urlparse
+
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+
+class TokenBucket:
+    """Allow `rate` requests per second on average with bursts of up to `burst`"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class HostLimiter:
+    """Per-host token buckets and page pools shared by every crawl in a run
+
+    The first caller for a host decides its rate and pool size.
+    """
+
+    def __init__(self):
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._pools: Dict[str, asyncio.Semaphore] = {}
+
+    def pool(self, url: str, size: int) -> asyncio.Semaphore:
+        """Semaphore bounding how many pages are open against the URL's host"""
+        host = urlparse(url).hostname or ""
+        if host not in self._pools:
+            self._pools[host] = asyncio.Semaphore(max(1, size))
+        return self._pools[host]
+
+    async def wait(self, url: str, rate: float, burst: int = 1):
+        """Block until the URL's host has a request token available"""
+        host = urlparse(url).hostname or ""
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(rate, burst)
+        await self._buckets[host].acquire()
+
+
+async def with_retries(action, retries: int = 2, backoff: float = 1.0,
+                       retry_on: Tuple[Type[BaseException], ...] = (PlaywrightTimeoutError,)):
+    """Await `action()` again with exponential backoff when it times out"""
+    for attempt in range(retries + 1):
+        try:
+            return await action()
+        except retry_on:
+            if attempt == retries:
+                raise
+            await asyncio.sleep(backoff * (2 ** attempt) * (1 + random.random() / 2))
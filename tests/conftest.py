@@ -0,0 +1,77 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+# Run from anywhere: the packages live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.check_plans import seed  # noqa: E402
+from db.connection import connect  # noqa: E402
+from db.init_db import create_tables  # noqa: E402
+from db.migrations import MIGRATIONS  # noqa: E402
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    create_tables(path)
+    return path
+
+
+@pytest.fixture
+def conn(db_path):
+    conn = connect(db_path)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def seeded(conn):
+    """A migrated database holding check_plans' representative rows"""
+    seed(conn, jobs=400)
+    return conn
+
+
+@pytest.fixture
+def old_db(tmp_path):
+    """Open a database upgraded only as far as the migration before the named one"""
+    conns = []
+
+    def open_before(name):
+        conn = sqlite3.connect(str(tmp_path / "old.db"))
+        conn.row_factory = sqlite3.Row
+        conns.append(conn)
+        for version, (migration, steps) in enumerate(MIGRATIONS):
+            if migration == name:
+                return conn
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            conn.execute(f"PRAGMA user_version = {version + 1}")
+        raise KeyError(name)
+
+    yield open_before
+    for conn in conns:
+        conn.close()
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    """The api module, freshly imported against a throwaway database"""
+    monkeypatch.setenv("DB_PATH", str(tmp_path / "api.db"))
+    monkeypatch.setenv("RETENTION_INTERVAL_HOURS", "0")
+    monkeypatch.delitem(sys.modules, "api", raising=False)
+    import api
+    yield api
+    sys.modules.pop("api", None)
+
+
+@pytest.fixture
+def client(api):
+    from fastapi.testclient import TestClient
+    with TestClient(api.app) as client:
+        yield client
@@ -0,0 +1,71 @@
+import csv
+import io
+import json
+
+from db import bulk
+from db.connection import connect
+from db.init_db import create_tables
+
+
+def export(conn, fmt="ndjson", **filters):
+    return b"".join(bulk.export_jobs(conn, fmt, chunk_rows=7, **filters)).decode("utf-8")
+
+
+def without_ids(ndjson):
+    records = [json.loads(line) for line in ndjson.splitlines()]
+    for record in records:
+        del record["id"]
+    return sorted(records, key=lambda record: record["url"])
+
+
+def test_export_round_trip(seeded, tmp_path):
+    exported = export(seeded)
+    assert len(exported.splitlines()) == seeded.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    create_tables(str(tmp_path / "copy.db"))
+    copy = connect(str(tmp_path / "copy.db"))
+    try:
+        jobs = [bulk.parse_job(json.loads(line)) for line in exported.splitlines()]
+        assert bulk.import_jobs(copy, jobs) == len(jobs)
+        assert without_ids(export(copy)) == without_ids(exported)
+
+        # Importing again upserts by URL and keeps the ids
+        ids = copy.execute("SELECT id, url FROM jobs ORDER BY id").fetchall()
+        bulk.import_jobs(copy, jobs)
+        assert copy.execute("SELECT id, url FROM jobs ORDER BY id").fetchall() == ids
+    finally:
+        copy.close()
+
+
+def test_csv_export_matches_ndjson(seeded):
+    rows = list(csv.reader(io.StringIO(export(seeded, "csv", company="Google"))))
+    records = [json.loads(line) for line in export(seeded, company="Google").splitlines()]
+    assert rows[0] == list(bulk.EXPORT_COLUMNS)
+    assert rows[1:] == [[str(record[c]) for c in bulk.EXPORT_COLUMNS] for record in records]
+    assert records and {record["company"] for record in records} == {"Google"}
+
+
+def test_import_reports_bad_lines(client):
+    good = {"title": "Python Developer", "company": "Acme", "url": "https://acme.test/1", "date_posted": "2025-01-02"}
+    lines = [
+        json.dumps(good),
+        "{not json",
+        json.dumps({"title": "No URL", "company": "Acme"}),
+        json.dumps({**good, "url": "https://acme.test/2", "status": "sleeping"}),
+        "",
+        json.dumps({**good, "url": "https://acme.test/3", "date_posted": "02/01/2025"}),
+        json.dumps([1, 2]),
+        json.dumps({**good, "url": "https://acme.test/4", "location": "Remote"}),
+    ]
+    response = client.post("/jobs/import", content="\n".join(lines).encode(),
+                           headers={"Content-Type": "application/x-ndjson"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["imported"], body["skipped"]) == (2, 5)
+    assert [error["line"] for error in body["errors"]] == [2, 3, 4, 6, 7]
+    assert body["errors"][1]["error"] == "Missing url"
+
+    exported = [json.loads(line) for line in client.get("/jobs/export").text.splitlines()]
+    assert [(job["url"], job["location"], job["date_posted"]) for job in exported] == [
+        ("https://acme.test/1", "N/A", "2025-01-02"), ("https://acme.test/4", "Remote", "2025-01-02")]
@@ -0,0 +1,22 @@
+import pytest
+
+from db import check_plans
+
+
+def test_hot_queries_use_indexes_on_a_seeded_database(seeded):
+    assert check_plans.check(seeded)
+
+
+def test_plan_problems():
+    assert check_plans.plan_problems("jobs by status", "SCAN jobs") == ["full table scan"]
+    assert check_plans.plan_problems("jobs by status", "SCAN j USING INDEX idx_jobs_posted_at") == []
+    assert check_plans.plan_problems("jobs by status", "USE TEMP B-TREE FOR ORDER BY") == ["sort without an index"]
+    assert check_plans.plan_problems("job search", "USE TEMP B-TREE FOR ORDER BY") == []
+    assert check_plans.plan_problems("company counts", "SCAN k") == []
+
+
+def test_main_seeds_a_fresh_database(capsys):
+    with pytest.raises(SystemExit) as exit:
+        check_plans.main([])
+    assert exit.value.code == 0
+    assert "[FAIL]" not in capsys.readouterr().out
@@ -0,0 +1,45 @@
+import pytest
+
+from scrapers.classifier import classify, classify_many, extract_skills, is_tech_job
+
+
+@pytest.mark.parametrize("title, keyword", [
+    ("JavaScript Developer", "javascript"),
+    ("Java Developer", "java"),
+    ("Full-Stack Developer", "full stack"),
+    ("Machine   Learning Researcher", "machine learning"),
+    ("Software Engineers", "software"),
+    ("AI Researcher", "ai"),
+    ("Maintenance Technician", None),
+    ("Retail Associate", None),
+    ("Chef", None),
+    ("", None),
+])
+def test_classify_matches_whole_words(title, keyword):
+    assert classify(title) == keyword
+    assert is_tech_job(title) is (keyword is not None)
+
+
+def test_classify_many():
+    assert classify_many(["Data Scientist", "Barista"]) == ["data scientist", None]
+
+
+@pytest.mark.parametrize("title, skills", [
+    ("JavaScript Developer", ["javascript"]),
+    ("Java and JavaScript Engineer", ["java", "javascript"]),
+    ("C++ / C# Engineer", ["c++", "c#"]),
+    ("Full-Stack Engineer (Node.js, React, PostgreSQL)", ["node.js", "react", "postgresql"]),
+    ("Senior Go Developer", ["go"]),
+    ("Go-to-market Lead", []),
+    ("Less-than-truckload Dispatcher", []),
+    ("Sales Lead, Go-Live Support", []),
+    ("Rust-proofing Technician", []),
+    ("Rust Engineer", ["rust"]),
+    ("LESS/Sass Front-end Developer", ["less", "sass"]),
+    ("Django Django Developer", ["django"]),
+    ("Machine-Learning Engineer", ["machine learning"]),
+    ("Maintenance Manager", []),
+    ("Retail Associate", []),
+])
+def test_extract_skills(title, skills):
+    assert extract_skills(title) == skills
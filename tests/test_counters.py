@@ -0,0 +1,47 @@
+from db import queries
+from db.bulk import import_jobs
+from db.counters import PENDING_APPLICATIONS, drift, rebuild
+from db.migrations import STATUS_ACTIVE, STATUS_CLOSED
+from db.retention import run_retention
+
+
+def pending_counter(conn):
+    return conn.execute("SELECT value FROM job_counters WHERE name = ?", (PENDING_APPLICATIONS,)).fetchone()[0]
+
+
+def test_seeded_counters_match_the_tables(seeded):
+    assert drift(seeded) == {}
+    assert pending_counter(seeded) == queries.pending_count(seeded)
+
+
+def test_counters_follow_writes(seeded):
+    job_id = seeded.execute(f"SELECT id FROM jobs WHERE status = {STATUS_ACTIVE} AND id % 4 != 0").fetchone()[0]
+    pending = pending_counter(seeded)
+
+    queries.apply_to_job(seeded, job_id, "2025-06-01")
+    assert pending_counter(seeded) == pending - 1
+    with seeded:
+        seeded.execute(f"UPDATE jobs SET status = {STATUS_CLOSED} WHERE id % 7 = 0")
+        seeded.execute("DELETE FROM applications WHERE job_id % 8 = 0")
+    import_jobs(seeded, [("Rust Engineer", "Remote", "Newco", "https://jobs.example.com/new", "active", 0, 0),
+                         ("Data Scientist 3", "Remote", "Newco", "https://jobs.example.com/3", "closed", 0, 0)])
+    assert drift(seeded) == {}
+
+
+def test_counters_survive_retention(seeded):
+    before = seeded.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+    result = run_retention(seeded, days=0)
+    assert result["jobs"] > 0
+    assert result["freed_pages"] > 0
+    assert seeded.execute("SELECT COUNT(*) FROM jobs").fetchone()[0] == before - result["jobs"]
+    assert drift(seeded) == {}
+
+
+def test_rebuild_repairs_drift(seeded):
+    with seeded:
+        seeded.execute("UPDATE company_job_counts SET count = count + 5")
+        seeded.execute("UPDATE job_counters SET value = -1 WHERE name = ?", (PENDING_APPLICATIONS,))
+    assert (PENDING_APPLICATIONS,) in drift(seeded)
+    with seeded:
+        rebuild(seeded)
+    assert drift(seeded) == {}
@@ -0,0 +1,105 @@
+import asyncio
+
+from starlette.requests import Request
+
+import events
+from db.retention import run_retention
+
+
+def test_events_after_and_prune(conn):
+    for n in range(5):
+        events.publish(conn, "scrape.started", {"n": n})
+    assert events.latest_event_id(conn) == 5
+    assert [event.payload["n"] for event in events.events_after(conn, 2)] == [2, 3, 4]
+    assert [event.id for event in events.events_after(conn, 0, limit=2)] == [1, 2]
+
+    assert events.prune_events(conn, keep=2) == 3
+    assert [event.id for event in events.events_after(conn, 0)] == [4, 5]
+
+
+def test_retention_keeps_the_last_event_history(conn):
+    with conn:
+        events.publish_many(conn, "job.inserted", [{"n": n} for n in range(events.EVENT_HISTORY + 3)])
+    assert run_retention(conn)["events"] == 3
+    assert tuple(conn.execute("SELECT MIN(id), COUNT(*) FROM events").fetchone()) == (4, events.EVENT_HISTORY)
+
+
+def event(event_id, type="scrape.started"):
+    return events.Event(event_id, type, {}, 0)
+
+
+def test_event_bus_fans_out_and_drops_the_oldest():
+    async def scenario():
+        bus = events.EventBus(queue_size=2)
+        first = bus.subscribe(after=7)
+        assert bus.last_id == 7
+        second = bus.subscribe(after=0)
+        # Only the first subscriber decides where the relay resumes
+        assert bus.last_id == 7
+        await asyncio.wait_for(bus.wait_for_subscribers(), 1)
+
+        for n in (8, 9, 10):
+            bus.publish(event(n))
+        assert [first.get_nowait().id for _ in range(first.qsize())] == [9, 10]
+        assert second.qsize() == 2 and bus.last_id == 10
+
+        bus.unsubscribe(first)
+        bus.unsubscribe(second)
+        assert bus.subscribers == 0
+        waiting = asyncio.ensure_future(bus.wait_for_subscribers())
+        await asyncio.sleep(0)
+        assert not waiting.done()
+        waiting.cancel()
+
+    asyncio.run(scenario())
+
+
+def sse_request(last_event_id=None):
+    headers = [(b"last-event-id", last_event_id.encode())] if last_event_id else []
+    return Request({"type": "http", "method": "GET", "path": "/events", "headers": headers, "query_string": b""})
+
+
+def ids(messages):
+    return [int(message.split("\n")[0][len("id: "):]) for message in messages]
+
+
+def test_sse_replays_from_last_event_id(api):
+    conn = api.connect(api.DB_PATH)
+    for type in ("scrape.started", "automation.step", "scrape.finished", "scrape.started"):
+        events.publish(conn, type, {})
+    conn.close()
+
+    async def scenario():
+        response = await api.stream_events(sse_request("1"), types="scrape")
+        stream = response.body_iterator
+        replayed = [await stream.__anext__(), await stream.__anext__()]
+        assert api.event_bus.subscribers == 1
+
+        # Already replayed, then filtered out, then new
+        for event_id, type in ((4, "scrape.started"), (5, "automation.step"), (6, "scrape.finished")):
+            api.event_bus.publish(event(event_id, type))
+        live = await asyncio.wait_for(stream.__anext__(), 1)
+        await stream.aclose()
+        return replayed, live
+
+    replayed, live = asyncio.run(scenario())
+    assert ids(replayed) == [3, 4]
+    assert "event: scrape.finished" in replayed[0]
+    assert ids([live]) == [6]
+    assert api.event_bus.subscribers == 0
+
+
+def test_sse_without_last_event_id_streams_only_new_events(api):
+    conn = api.connect(api.DB_PATH)
+    events.publish(conn, "scrape.started", {})
+    conn.close()
+
+    async def scenario():
+        response = await api.stream_events(sse_request(), types=None)
+        stream = response.body_iterator
+        api.event_bus.publish(event(2))
+        first = await asyncio.wait_for(stream.__anext__(), 1)
+        await stream.aclose()
+        return first
+
+    assert ids([asyncio.run(scenario())]) == [2]
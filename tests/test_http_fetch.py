@@ -0,0 +1,166 @@
+import asyncio
+import dataclasses
+
+import pytest
+import requests
+
+from scrapers.engine import scrape_site
+from scrapers.fixture_server import FixtureServer, page_file
+from scrapers.http_fetch import ListingPage, UnsupportedSelector, create_session, fetch_page, select
+from scrapers.sites import SITES
+from scrapers.throttle import HostLimiter
+
+PAGE = """
+<html><body>
+<nav role="navigation"><a href="/jobs/search">Search</a></nav>
+<ul id="results" class="list jobs">
+  <li class="card"><a class="title" data-testid="Job-Link" href="/jobs/1">Python <b>Developer</b></a>
+      <span class="job-location">Remote</span></li>
+  <li class="card"><a class="title" href="/jobs/2" aria-disabled="true">Data Engineer</a>
+      <div><p>Berlin</p><span class="job-location">Berlin, DE</span></div></li>
+</ul>
+<a class="pager" href="?page=1" aria-disabled="true">Next</a>
+<a class="pager" href="?page=3">Next</a>
+<footer><a href="/jobs/privacy">Privacy</a></footer>
+</body></html>
+"""
+
+
+class FakeSink:
+    def __init__(self):
+        self.added = []
+
+    def add(self, title, location, url):
+        self.added.append(url)
+
+
+class FakeBrowser:
+    """Stands in for Playwright; records that the browser tier was reached"""
+
+    def __init__(self):
+        self.used = False
+
+    async def new_context(self):
+        self.used = True
+        raise RuntimeError("no browser in tests")
+
+
+def hrefs(nodes):
+    return [n.attrs.get("href") for n in nodes]
+
+
+@pytest.fixture
+def page():
+    return ListingPage(PAGE)
+
+
+@pytest.mark.parametrize("selector, expected", [
+    ("a.title", ["/jobs/1", "/jobs/2"]),
+    ("ul#results a", ["/jobs/1", "/jobs/2"]),
+    ("ul.jobs li.card a[href$='/2']", ["/jobs/2"]),
+    ("a[data-testid*='job' i]", ["/jobs/1"]),
+    ("a[data-testid*='job']", []),
+    ("a[href^='/jobs/'][aria-disabled]", ["/jobs/2"]),
+    ("a[class~='pager']", ["?page=1", "?page=3"]),
+    ("nav a, footer a", ["/jobs/search", "/jobs/privacy"]),
+    ("*[href='/jobs/1']", ["/jobs/1"]),
+])
+def test_select_supports_the_config_css_subset(page, selector, expected):
+    assert hrefs(select(page.root, selector)) == expected
+
+
+def test_unsupported_selector_is_rejected_and_skipped(page):
+    with pytest.raises(UnsupportedSelector):
+        select(page.root, "li > a")
+    jobs = page.jobs(("li > a", "a.title"), "[class*='location' i]")
+    assert [href for _, href, _ in jobs] == ["/jobs/1", "/jobs/2"]
+
+
+def test_jobs_read_text_and_nearby_location(page):
+    assert page.jobs(("a.title",), "[class*='location' i]") == [
+        ("Python Developer", "/jobs/1", "Remote"),
+        ("Data Engineer", "/jobs/2", "Berlin, DE"),
+    ]
+    assert len(page.jobs(("a.title",), "[class*='location' i]", limit=1)) == 1
+
+
+def test_navigation_and_footer_links_are_not_listings(page):
+    assert hrefs(page.listing_nodes("a[href*='/jobs/']")) == ["/jobs/1", "/jobs/2"]
+    assert page.listing_nodes("nav a") == []
+
+
+def test_next_href_skips_disabled_links(page):
+    assert page.next_href("a.pager") == "?page=3"
+    assert page.next_href("button.next") is None
+
+
+def test_embedded_json_is_the_fallback():
+    listing = ListingPage("""<html><body><div id="app"></div>
+        <script type="application/ld+json">
+        {"@graph": [{"@type": "JobPosting", "title": " SRE ", "url": "/jobs/9",
+                     "jobLocation": {"address": {"addressLocality": "Austin", "addressRegion": "TX"}}}]}
+        </script></body></html>""")
+    assert listing.jobs(("a.title",), "[class*='location' i]") == [("SRE", "/jobs/9", "Austin, TX")]
+
+
+def test_page_file_maps_paging_queries():
+    assert page_file("/f/google.html", "page=2") == "/f/google.page2.html"
+    assert page_file("/f/microsoft.html", "from=20&s=1") == "/f/microsoft.from20.html"
+    assert page_file("/f/google.html", "page=1") == "/f/google.html"
+    assert page_file("/f/google.html", "") == "/f/google.html"
+
+
+def test_fetch_page_against_fixture_server():
+    session = create_session()
+    with FixtureServer() as server:
+        config = server.localize("google", SITES["google"])
+        first = ListingPage(fetch_page(session, config.start_url))
+        second = ListingPage(fetch_page(session, f"{config.start_url}?page=2"))
+        with pytest.raises(requests.HTTPError):
+            fetch_page(session, f"{config.start_url}?page=99")
+
+    first_jobs = first.jobs(config.selectors, "[class*='location' i]")
+    second_jobs = second.jobs(config.selectors, "[class*='location' i]")
+    assert first_jobs and second_jobs
+    assert not {href for _, href, _ in first_jobs} & {href for _, href, _ in second_jobs}
+    # The nav links on the fixture page match the first selector but are not listings
+    assert all(title not in ("Search", "Sort") for title, _, _ in first_jobs)
+
+
+def crawl(server, name, tier=None):
+    config = dataclasses.replace(server.localize(name, SITES[name]), requests_per_second=1000.0, burst=1000)
+    browser, sink = FakeBrowser(), FakeSink()
+    result = asyncio.run(scrape_site(browser, config, sink, HostLimiter(), create_session(), tier=tier))
+    return result, browser, sink
+
+
+def test_http_tier_crawls_fixture_site_to_the_end():
+    with FixtureServer() as server:
+        result, browser, sink = crawl(server, "google")
+    assert (result.tier, result.complete, result.pages) == ("http", True, 3)
+    assert not browser.used
+    assert sink.added
+
+
+def test_stray_links_do_not_satisfy_the_http_tier(tmp_path):
+    (tmp_path / "shell.html").write_text(
+        '<html><body><nav><a href="/jobs/results/">Jobs</a></nav>'
+        '<div id="root"></div><a href="/about/jobs">Working here</a></body></html>')
+    config = dataclasses.replace(SITES["google"], page_url_template=None)
+    sink = FakeSink()
+    with FixtureServer(str(tmp_path)) as server:
+        config = dataclasses.replace(config, start_url=server.url("shell.html"), base_url=server.base_url)
+        browser = FakeBrowser()
+        with pytest.raises(RuntimeError):
+            asyncio.run(scrape_site(browser, config, sink, HostLimiter(), create_session()))
+    # "a[href*='job']" matched a link outside the listing, but the listing selector did not
+    assert browser.used
+    assert sink.added == []
+
+
+def test_http_crawl_of_a_script_rendered_site_is_never_complete():
+    with FixtureServer() as server:
+        result, browser, _ = crawl(server, "microsoft", tier="http")
+    assert result.tier == "http" and result.listings
+    assert not result.complete
+    assert not browser.used
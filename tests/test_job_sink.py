@@ -0,0 +1,71 @@
+import asyncio
+
+from db.connection import connect
+from db.migrations import STATUS_ACTIVE, STATUS_CLOSED
+from scrapers import orchestrator
+from scrapers.engine import CrawlResult
+from scrapers.job_sink import JobSink
+from scrapers.sites import SITES
+
+COMPANY = next(iter(SITES))
+COMPANY_NAME = SITES[COMPANY].company
+
+
+def job(conn, url):
+    return conn.execute("SELECT title, status, checked_at, content_hash FROM jobs WHERE url = ?", (url,)).fetchone()
+
+
+def scrape(db_path, listings):
+    with JobSink(COMPANY_NAME, db_path=db_path) as sink:
+        for title, location, url in listings:
+            sink.add(title, location, url)
+    return sink
+
+
+def test_unchanged_listing_is_only_touched(db_path, conn):
+    scrape(db_path, [("Python Developer", "Remote", "https://jobs.example.com/1")])
+    with conn:
+        conn.execute("UPDATE jobs SET checked_at = 0")
+    before = job(conn, "https://jobs.example.com/1")
+
+    sink = scrape(db_path, [("Python Developer", "Remote", "https://jobs.example.com/1")])
+    after = job(conn, "https://jobs.example.com/1")
+    assert sink.counts == {"inserted": 0, "updated": 0, "unchanged": 1, "closed": 0}
+    assert after["checked_at"] > 0
+    assert (after["title"], after["content_hash"]) == (before["title"], before["content_hash"])
+
+
+def test_changed_listing_is_updated(db_path, conn):
+    scrape(db_path, [("Python Developer", "Remote", "https://jobs.example.com/1")])
+    before = job(conn, "https://jobs.example.com/1")
+
+    sink = scrape(db_path, [("Senior Python Developer", "Remote", "https://jobs.example.com/1")])
+    after = job(conn, "https://jobs.example.com/1")
+    assert sink.updated == 1
+    assert after["title"] == "Senior Python Developer"
+    assert after["content_hash"] != before["content_hash"]
+
+
+def run_company(db_path, monkeypatch, complete):
+    async def fake_scrape_site(browser, config, sink, limiter, session):
+        sink.add("Python Developer", "Remote", "https://jobs.example.com/1")
+        return CrawlResult(complete, "http", 1, 1)
+
+    monkeypatch.setattr(orchestrator, "scrape_site", fake_scrape_site)
+    return asyncio.run(orchestrator._run_company(None, COMPANY, asyncio.Semaphore(1), None, None, db_path))
+
+
+def test_incomplete_crawl_closes_nothing(db_path, monkeypatch):
+    scrape(db_path, [("Python Developer", "Remote", "https://jobs.example.com/1"),
+                     ("Data Engineer", "Remote", "https://jobs.example.com/2")])
+
+    result = run_company(db_path, monkeypatch, complete=False)
+    conn = connect(db_path)
+    assert result.closed == 0
+    assert job(conn, "https://jobs.example.com/2")["status"] == STATUS_ACTIVE
+
+    result = run_company(db_path, monkeypatch, complete=True)
+    assert result.closed == 1
+    assert job(conn, "https://jobs.example.com/2")["status"] == STATUS_CLOSED
+    assert job(conn, "https://jobs.example.com/1")["status"] == STATUS_ACTIVE
+    conn.close()
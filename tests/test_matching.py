@@ -0,0 +1,118 @@
+import numpy as np
+import pytest
+
+from db.migrations import STATUS_ACTIVE, STATUS_CLOSED
+from matching import JobMatcher, job_features, prune_job_changes
+
+TITLES = {
+    1: "Senior Python Developer",
+    2: "Python Data Engineer (AWS, SQL)",
+    3: "Frontend Engineer React",
+    4: "Java Backend Engineer",
+    5: "Office Manager",
+}
+
+
+@pytest.fixture
+def jobs(conn):
+    with conn:
+        conn.execute("INSERT INTO companies (id, name) VALUES (1, 'Acme')")
+        conn.executemany("INSERT INTO jobs (id, title, company_id, url, status, posted_at) VALUES (?, ?, 1, ?, ?, 0)",
+                         [(job_id, title, f"https://a/{job_id}", STATUS_ACTIVE) for job_id, title in TITLES.items()])
+    return conn
+
+
+def brute_force(titles, skills, text):
+    """Cosine of idf-weighted dense vectors, computed from scratch"""
+    features = {job_id: dict(job_features(title)) for job_id, title in titles.items()}
+    vocabulary = sorted({name for row in features.values() for name in row})
+    df = np.array([sum(name in row for row in features.values()) for name in vocabulary])
+    idf = np.log((1 + len(titles)) / (1 + df)) + 1.0
+    query = JobMatcher()
+    query.vocabulary = {name: column for column, name in enumerate(vocabulary)}
+    query.idf = idf
+    q = query.query_vector(skills, text)
+    scores = {}
+    for job_id, row in features.items():
+        d = np.array([row.get(name, 0.0) for name in vocabulary]) * idf
+        score = float(d @ q / np.linalg.norm(d))
+        if score:
+            scores[job_id] = score
+    return sorted(scores.items(), key=lambda item: -item[1])
+
+
+def assert_ranking(actual, expected):
+    assert [job_id for job_id, _ in actual] == [job_id for job_id, _ in expected]
+    assert [score for _, score in actual] == pytest.approx([score for _, score in expected])
+
+
+def test_top_k_is_a_tfidf_cosine(jobs):
+    matcher = JobMatcher()
+    matcher.refresh(jobs)
+    ranked = matcher.top_k(["python", "aws"], "data engineer")
+    assert_ranking(ranked, brute_force(TITLES, ["python", "aws"], "data engineer"))
+    assert ranked[0][0] == 2
+    assert all(0 < score <= 1 for _, score in ranked)
+    # A job whose title is exactly the query scores 1
+    assert matcher.top_k([], "office manager")[0] == (5, pytest.approx(1.0))
+
+
+def test_top_k_limits_and_skips_unrelated_jobs(jobs):
+    matcher = JobMatcher()
+    matcher.refresh(jobs)
+    assert len(matcher.top_k([], "engineer", k=2)) == 2
+    assert {job_id for job_id, _ in matcher.top_k([], "engineer")} == {2, 3, 4}
+    assert matcher.top_k(["cobol"], "underwater basket weaving") == []
+    assert JobMatcher().top_k(["python"]) == []
+
+
+def test_refresh_only_rereads_changed_jobs(jobs):
+    matcher = JobMatcher()
+    assert matcher.refresh(jobs) == len(TITLES)
+    assert matcher.refresh(jobs) == 0
+
+    # Commits that leave titles and statuses alone do not move jobs_version
+    with jobs:
+        jobs.execute("UPDATE jobs SET checked_at = 1")
+    assert matcher.refresh(jobs) == 0
+
+    with jobs:
+        jobs.execute("UPDATE jobs SET title = 'Rust Systems Engineer' WHERE id = 4")
+        jobs.execute(f"UPDATE jobs SET status = {STATUS_CLOSED} WHERE id = 1")
+        jobs.execute("DELETE FROM jobs WHERE id = 5")
+        jobs.execute("INSERT INTO jobs (id, title, company_id, url, posted_at) VALUES (6, 'Go Developer', 1, 'u6', 0)")
+    assert matcher.refresh(jobs) == 2
+
+    titles = {**TITLES, 4: "Rust Systems Engineer", 6: "Go Developer"}
+    del titles[1], titles[5]
+    assert_ranking(matcher.top_k(["python", "rust", "go"], "developer engineer"),
+                   brute_force(titles, ["python", "rust", "go"], "developer engineer"))
+    assert matcher.top_k([], "java") == []
+
+
+def test_refresh_compacts_and_matches_a_fresh_matrix(jobs):
+    matcher = JobMatcher()
+    matcher.refresh(jobs)
+    for n in range(6):
+        with jobs:
+            jobs.executemany("UPDATE jobs SET title = ? WHERE id = ?",
+                             [(f"{title} {n}", job_id) for job_id, title in TITLES.items()])
+        matcher.refresh(jobs)
+        assert len(matcher.job_ids) <= 2 * len(TITLES)
+
+    fresh = JobMatcher()
+    fresh.refresh(jobs)
+    assert_ranking(matcher.top_k(["python"], "engineer 5"), fresh.top_k(["python"], "engineer 5"))
+    assert set(matcher.vocabulary) == set(fresh.vocabulary)
+
+
+def test_refresh_rescans_when_its_changes_were_pruned(jobs):
+    matcher = JobMatcher()
+    matcher.refresh(jobs)
+    with jobs:
+        jobs.execute("UPDATE jobs SET title = 'Python Developer' WHERE id = 3")
+        jobs.execute("UPDATE jobs SET title = 'Staff Python Developer' WHERE id = 4")
+    prune_job_changes(jobs, keep=1)
+
+    assert matcher.refresh(jobs) == 2
+    assert {job_id for job_id, _ in matcher.top_k(["python"])} == {1, 2, 3, 4}
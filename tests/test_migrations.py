@@ -0,0 +1,38 @@
+import logging
+
+from db.migrations import SCHEMA_VERSION, migrate, schema_version
+
+
+def test_duplicate_applications_are_set_aside(old_db, caplog):
+    conn = old_db("application indexes")
+    conn.execute("INSERT INTO jobs (id, title, company, url) VALUES (1, 'Dev', 'Acme', 'https://a/1')")
+    conn.executemany("INSERT INTO applications (id, job_id, applied_date, notes) VALUES (?, 1, '2024-01-01', ?)",
+                     [(1, "first"), (2, "again"), (3, "and again")])
+    conn.commit()
+
+    with caplog.at_level(logging.WARNING, logger="db.migrations"):
+        migrate(conn)
+
+    assert schema_version(conn) == SCHEMA_VERSION
+    assert [tuple(row) for row in conn.execute("SELECT id, notes FROM applications")] == [(1, "first")]
+    assert [tuple(row) for row in conn.execute("SELECT id, notes FROM applications_duplicates ORDER BY id")] == [
+        (2, "again"), (3, "and again")]
+    assert "Moved 2 duplicate applications" in caplog.text
+
+
+def test_no_duplicates_table_without_duplicates(conn):
+    assert conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'applications_duplicates'").fetchone() is None
+
+
+def test_hyphenated_common_words_are_unindexed(old_db):
+    conn = old_db("common-word skills")
+    conn.execute("INSERT INTO companies (id, name) VALUES (1, 'Acme')")
+    conn.executemany("INSERT INTO jobs (id, title, company_id, url, posted_at) VALUES (?, ?, 1, ?, 0)",
+                     [(1, "Go-to-market Lead", "https://a/1"), (2, "Go Developer", "https://a/2")])
+    conn.executemany("INSERT INTO skills (id, name) VALUES (?, ?)", [(1, "go"), (2, "sql")])
+    conn.executemany("INSERT INTO job_skills (skill_id, job_id) VALUES (?, ?)", [(1, 1), (2, 1), (1, 2)])
+    conn.commit()
+
+    migrate(conn)
+
+    assert [tuple(row) for row in conn.execute("SELECT job_id, skill_id FROM job_skills ORDER BY job_id")] == [(2, 1)]
@@ -0,0 +1,87 @@
+import sqlite3
+
+import pytest
+
+from db import queries
+from db.migrations import migrate
+from db.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, encode_cursor, page_size, split_page
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor((1735689600, 42))
+    assert "=" not in cursor
+    assert decode_cursor(cursor, 2) == [1735689600, 42]
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", encode_cursor([1]), encode_cursor([1, 2, 3]),
+                                    "eyJhIjoxfQ"])
+def test_decode_rejects_foreign_cursors(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, 2)
+
+
+def test_page_size_is_clamped():
+    assert page_size(None) == DEFAULT_PAGE_SIZE
+    assert page_size(0) == DEFAULT_PAGE_SIZE
+    assert page_size(-5) == 1
+    assert page_size(10) == 10
+    assert page_size(MAX_PAGE_SIZE + 1) == MAX_PAGE_SIZE
+
+
+def test_split_page():
+    rows = [(5, 3), (5, 2), (4, 1)]
+    assert split_page(rows, 3, lambda row: row) == (rows, None)
+    page, cursor = split_page(rows, 2, lambda row: row)
+    assert page == rows[:2]
+    assert cursor is not None and decode_cursor(cursor, 2) == [5, 2]
+
+
+def test_cursors_walk_every_job_once(seeded):
+    # The seed gives many jobs the same posted_at, so the id tie-break matters
+    expected = [row["id"] for row in seeded.execute("SELECT id FROM jobs ORDER BY posted_at DESC, id DESC")]
+    seen, cursor = [], None
+    while True:
+        after = decode_cursor(cursor, 2) if cursor else None
+        rows = queries.list_jobs(seeded, after=after, limit=31 + 1)
+        rows, cursor = split_page(rows, 31, lambda row: (row["posted_at"], row["id"]))
+        seen.extend(row["id"] for row in rows)
+        if cursor is None:
+            break
+    assert seen == expected
+
+
+def test_cursors_respect_filters(seeded):
+    cursor = None
+    companies = set()
+    for _ in range(3):
+        after = decode_cursor(cursor, 2) if cursor else None
+        rows, cursor = split_page(queries.list_jobs(seeded, company="Google", after=after, limit=11),
+                                  10, lambda row: (row["posted_at"], row["id"]))
+        companies.update(row["company"] for row in rows)
+    assert companies == {"Google"}
+
+
+def test_undated_jobs_are_backfilled_and_paged(old_db):
+    conn = old_db("jobs.posted_at not null")
+    conn.execute("INSERT INTO companies (id, name) VALUES (1, 'Acme')")
+    conn.executemany("INSERT INTO jobs (id, title, company_id, url, posted_at, checked_at) VALUES (?, 'Dev', 1, ?, ?, ?)",
+                     [(i, f"https://a/{i}", 1735689600 - i if i % 3 else None, 1735000000 if i % 2 else None)
+                      for i in range(1, 31)])
+    conn.commit()
+    migrate(conn)
+
+    assert conn.execute("SELECT COUNT(*) FROM jobs WHERE posted_at IS NULL").fetchone()[0] == 0
+    seen, cursor = [], None
+    while True:
+        after = decode_cursor(cursor, 2) if cursor else None
+        rows, cursor = split_page(queries.list_jobs(conn, after=after, limit=5),
+                                  4, lambda row: (row["posted_at"], row["id"]))
+        seen.extend(row["id"] for row in rows)
+        if cursor is None:
+            break
+    assert sorted(seen) == list(range(1, 31))
+
+    with pytest.raises(sqlite3.IntegrityError):
+        conn.execute("INSERT INTO jobs (title, company_id, url) VALUES ('Dev', 1, 'https://a/new')")
+    with pytest.raises(sqlite3.IntegrityError):
+        conn.execute("UPDATE jobs SET posted_at = NULL WHERE id = 1")
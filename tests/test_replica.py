@@ -0,0 +1,49 @@
+import os
+import time
+
+from db.replica import SnapshotReplica
+
+
+def count_jobs(replica):
+    with replica.connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def add_job(conn, n):
+    with conn:
+        conn.execute("INSERT INTO companies (name) VALUES ('Acme') ON CONFLICT DO NOTHING")
+        conn.execute("INSERT INTO jobs (title, company_id, url, posted_at, checked_at) "
+                     "SELECT 'Dev', id, ?, 0, 0 FROM companies WHERE name = 'Acme'", (f"https://a/{n}",))
+
+
+def test_snapshot_refreshes_when_the_primary_changes(db_path, conn, tmp_path):
+    replica = SnapshotReplica(db_path, snapshot_dir=str(tmp_path), max_staleness=0.2, poll_interval=0.02).start()
+    try:
+        assert replica.refreshes == 1 and count_jobs(replica) == 0
+
+        # An idle primary keeps its data_version, so the snapshot is not copied again
+        time.sleep(0.3)
+        assert replica.refreshes == 1
+
+        add_job(conn, 1)
+        assert wait_for(lambda: count_jobs(replica) == 1)
+        assert replica.refreshes == 2
+
+        # A burst of commits within one staleness window costs a single copy
+        for n in range(2, 6):
+            add_job(conn, n)
+        assert wait_for(lambda: count_jobs(replica) == 5)
+        assert replica.refreshes == 3
+    finally:
+        replica.stop()
+
+    assert not any(os.path.exists(path) for path in replica.paths)
@@ -0,0 +1,47 @@
+from fastapi import Response
+
+ORIGIN = {"Origin": "http://example.com"}
+
+
+def warm_up(client):
+    # The first pooled connection switches the fresh database to WAL, which moves data_version
+    client.get("/companies")
+    client.get("/companies")
+
+
+def test_cors_headers_survive_the_cache(client):
+    warm_up(client)
+    miss = client.get("/jobs", headers=ORIGIN)
+    hit = client.get("/jobs", headers=ORIGIN)
+    revalidated = client.get("/jobs", headers={**ORIGIN, "If-None-Match": hit.headers["etag"]})
+
+    assert [r.headers["x-cache"] for r in (miss, hit, revalidated)] == ["miss", "hit", "hit"]
+    assert revalidated.status_code == 304
+    for response in (miss, hit, revalidated):
+        assert response.headers["access-control-allow-origin"] in ("*", "http://example.com")
+        assert response.headers["access-control-allow-credentials"] == "true"
+
+
+def test_cors_headers_follow_the_request_not_the_cache(client):
+    warm_up(client)
+    client.get("/companies", headers=ORIGIN)
+    hit = client.get("/companies")
+    assert hit.headers["x-cache"] == "hit"
+    assert "access-control-allow-origin" not in hit.headers
+
+
+def test_handler_headers_are_replayed(api, client, monkeypatch):
+    @api.app.get("/cached-with-headers")
+    async def cached_with_headers(response: Response):
+        response.headers["X-Total-Count"] = "3"
+        return {"ok": True}
+
+    monkeypatch.setattr(api, "CACHED_PATHS", api.CACHED_PATHS | {"/cached-with-headers"})
+    miss = client.get("/cached-with-headers")
+    hit = client.get("/cached-with-headers")
+    revalidated = client.get("/cached-with-headers", headers={"If-None-Match": hit.headers["etag"]})
+
+    assert [r.headers["x-cache"] for r in (miss, hit, revalidated)] == ["miss", "hit", "hit"]
+    for response in (miss, hit, revalidated):
+        assert response.headers["x-total-count"] == "3"
+    assert hit.json() == {"ok": True}
@@ -0,0 +1,81 @@
+import os
+import subprocess
+import sys
+import threading
+
+from automation import runs
+from db.connection import connect
+
+HOST = "worker-host"
+
+
+def run_status(conn, run_id):
+    return tuple(conn.execute("SELECT status, worker FROM automation_runs WHERE id = ?", (run_id,)).fetchone())
+
+
+def test_each_run_is_claimed_once(db_path, conn):
+    queued = [runs.enqueue_run(conn, 5) for _ in range(3)]
+    claimed = []
+    start = threading.Barrier(8)
+
+    def worker(n):
+        own = connect(db_path)
+        try:
+            start.wait()
+            run = runs.claim_run(own, f"{HOST}:{n}")
+            if run is not None:
+                claimed.append(run["id"])
+        finally:
+            own.close()
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(claimed) == queued
+    assert runs.claim_run(conn, f"{HOST}:99") is None
+
+
+def test_stale_runs_go_back_on_the_queue(conn):
+    run_id = runs.enqueue_run(conn, 5)
+    claimed = runs.claim_run(conn, f"{HOST}:1")
+    assert claimed is not None and claimed["id"] == run_id
+
+    # Still reporting: another worker cannot take it
+    assert runs.claim_run(conn, f"{HOST}:2") is None
+    assert run_status(conn, run_id) == (runs.RUN_RUNNING, f"{HOST}:1")
+
+    with conn:
+        conn.execute("UPDATE automation_runs SET heartbeat_at = heartbeat_at - ? WHERE id = ?",
+                      (runs.STALE_RUN_SECONDS + 1, run_id))
+    reclaimed = runs.claim_run(conn, f"{HOST}:2")
+    assert reclaimed is not None and reclaimed["id"] == run_id
+    assert run_status(conn, run_id) == (runs.RUN_RUNNING, f"{HOST}:2")
+
+
+def test_requeue_orphaned_runs(conn, monkeypatch):
+    ids = {}
+    for name in ("own", "dead", "alive", "elsewhere", "unnamed"):
+        ids[name] = runs.enqueue_run(conn, 5)
+    workers = {"own": f"{HOST}:100", "dead": f"{HOST}:200", "alive": f"{HOST}:300",
+               "elsewhere": "other-host:200", "unnamed": None}
+    with conn:
+        conn.executemany(f"UPDATE automation_runs SET status = '{runs.RUN_RUNNING}', worker = ?, heartbeat_at = "
+                         "strftime('%s') WHERE id = ?", [(workers[name], ids[name]) for name in ids])
+    monkeypatch.setattr(runs, "_process_alive", lambda pid: pid != 200)
+
+    assert runs.requeue_orphaned_runs(conn, f"{HOST}:100") == 2
+    assert {name: run_status(conn, run_id)[0] for name, run_id in ids.items()} == {
+        "own": runs.RUN_QUEUED, "dead": runs.RUN_QUEUED, "alive": runs.RUN_RUNNING,
+        "elsewhere": runs.RUN_RUNNING, "unnamed": runs.RUN_RUNNING,
+    }
+    assert run_status(conn, ids["dead"])[1] is None
+
+
+def test_process_alive():
+    finished = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"],
+                              capture_output=True, text=True, check=True)
+    assert runs._process_alive(os.getpid())
+    assert not runs._process_alive(int(finished.stdout))